@@ -0,0 +1,213 @@
+"""
+Asyncio Scraper Core
+====================
+Async variants of IndeedScraperV3 and HumanBehaviorSimulator. WebDriver
+calls run in a thread pool executor while dwell time, page-load waits and
+rate-limit waits use asyncio.sleep, so one event loop can interleave many
+browser sessions that spend most of their time waiting.
+
+    scrapers = [AsyncIndeedScraper(url, 10, lease_db="proxy_leases.db", start_page=p)
+                for p in (1, 11, 21)]
+    results = run_scrapers(scrapers)
+
+Give concurrent scrapers a shared ``lease_db`` (and ideally one shared
+``rate_limiter``) so they never pick the same proxy at once.
+"""
+
+import asyncio
+import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from human_behavior import HumanBehaviorSimulator, Step
+from job_record import JobRecord
+from result_buffer import ResultBuffer
+from page_errors import PageFailed
+from scraper_v3 import IndeedScraperV3
+
+
+class AsyncHumanBehaviorSimulator:
+    """Runs a HumanBehaviorSimulator's plans without blocking the event loop."""
+    
+    def __init__(self, simulator: HumanBehaviorSimulator):
+        self.simulator = simulator
+    
+    async def run_plan(self, plan: List[Step]):
+        """Execute a plan: pauses on the loop, driver steps in the executor."""
+        loop = asyncio.get_running_loop()
+        for step in self.simulator.compile_plan(plan):
+            if step[0] == "pause":
+                await asyncio.sleep(step[1])
+            elif step[0] == "batch":
+                # Let the routine run in the page while the loop waits it out
+                await loop.run_in_executor(None, self.simulator.start_batch, step[1])
+                await asyncio.sleep(step[2])
+            elif step[0] == "actions":
+                # Spend the chain's pauses here, then send it without them
+                await asyncio.sleep(self.simulator.actions_delay(step[1]))
+                moves = [op for op in step[1] if op[0] != "pause"]
+                await loop.run_in_executor(None, self.simulator.execute_step, ("actions", moves))
+            else:
+                await loop.run_in_executor(None, self.simulator.execute_step, step)
+    
+    async def simulate_page_arrival(self):
+        await self.run_plan(self.simulator.plan_page_arrival())
+    
+    async def simulate_job_browsing(self, job_count: int) -> float:
+        start_time = asyncio.get_running_loop().time()
+        await self.run_plan(self.simulator.plan_job_browsing(job_count))
+        return asyncio.get_running_loop().time() - start_time
+    
+    async def simulate_job_browsing_fast(self, job_count: int) -> float:
+        start_time = asyncio.get_running_loop().time()
+        await self.run_plan(self.simulator.plan_job_browsing_fast(job_count))
+        return asyncio.get_running_loop().time() - start_time
+    
+    async def simulate_session_break(self):
+        await self.run_plan(self.simulator.plan_session_break())
+
+
+class AsyncIndeedScraper(IndeedScraperV3):
+    """IndeedScraperV3 driven from an asyncio event loop."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.async_behavior: Optional[AsyncHumanBehaviorSimulator] = None
+    
+    async def _run(self, func, *args):
+        """Run a blocking (WebDriver, SQLite) call in the executor."""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    async def _acquire_request_slot(self, url: str) -> float:
+        """Wait for the rate limiter without blocking the loop."""
+        waited = 0.0
+        while True:
+            # With a lease database the shared bucket is a SQLite transaction
+            wait = await self._run(self.session_manager.try_acquire_request_slot, url)
+            if wait <= 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+    
+    def _recycle_browser_and_report(self) -> bool:
+        """_recycle_browser_if_needed, returning whether the browser was replaced."""
+        driver = self.driver
+        self._recycle_browser_if_needed()
+        return self.driver is not driver
+    
+    async def _start_new_session_async(self):
+        await self._run(self._start_new_session)
+        self.async_behavior = AsyncHumanBehaviorSimulator(self.human_behavior) if self.human_behavior else None
+    
+    async def _scrape_page_async(self, page_number: int) -> List[JobRecord]:
+        """Async _scrape_page (same steps): raises PageFailed when the page must be retried."""
+        url = self._build_page_url(page_number)
+        
+        print(f"  📄 Scraping page {page_number}... ", end='', flush=True)
+        
+        try:
+            # Navigate to page once the proxy/domain/global budgets allow it
+            waited = await self._acquire_request_slot(url)
+            if waited > 0.5:
+                print(f"(paced {waited:.1f}s) ", end='', flush=True)
+            await self._run(self.driver.get, url)
+            
+            # Initial wait for page load (optimized)
+            await asyncio.sleep(random.uniform(1.5, 3.0))
+            await self._run(self._check_arrival, page_number, url)
+            
+            if self.async_behavior:
+                await self.async_behavior.simulate_page_arrival()
+            
+            html = await self._run(self._page_html, page_number)
+            job_count, jobs = await self._run(self._collect_page_jobs, page_number, html)
+            
+            if self.async_behavior:
+                prefetch = await self._run(self._start_prefetch)
+                browse_time = await self.async_behavior.simulate_job_browsing_fast(job_count)
+                print(f"   ⏱️ Browsed jobs for {browse_time:.1f} seconds")
+                await self._run(self._finish_prefetch, prefetch)
+            
+            await self._run(self._record_page_success)
+        
+        except PageFailed:
+            raise
+        except Exception as e:
+            raise await self._run(self._page_error, e) from e
+        finally:
+            # A parked (CAPTCHA) or crashed browser takes its simulator with it
+            if not self.driver:
+                self.async_behavior = None
+        
+        return jobs
+    
+    async def scrape_all_pages_async(self) -> ResultBuffer:
+        """Async scrape_all_pages with the same session rotation, page retries and dead letters."""
+        all_jobs = ResultBuffer()
+        pending_pages = self._pending_pages = deque(range(self.start_page, self.start_page + self.page_count))
+        page_attempts = self._page_attempts = {}
+        
+        try:
+            print("🚀 Starting session-based scraping (async)...")
+            
+            while not self._stop_requested.is_set() and (
+                    pending_pages or await self._run(self._await_extraction, all_jobs)):
+                if not self.current_session or self.session_manager.should_rotate_session():
+                    await self._start_new_session_async()
+                    
+                    if not self.current_session:
+                        print("❌ No healthy proxies available. Stopping.")
+                        break
+                
+                pages_remaining_in_session = self._pages_for_session(pending_pages)
+                backoff = None
+                
+                for session_page in range(pages_remaining_in_session):
+                    if self._stop_requested.is_set():
+                        break
+                    page_num = pending_pages.popleft()
+                    
+                    # Add session break between pages (except first page of session)
+                    if session_page > 0 and self.async_behavior:
+                        await self.async_behavior.simulate_session_break()
+                    
+                    if await self._run(self._recycle_browser_and_report):
+                        self.async_behavior = AsyncHumanBehaviorSimulator(self.human_behavior)
+                    self._upcoming_page = self._next_session_page(pending_pages, session_page, pages_remaining_in_session)
+                    try:
+                        jobs = await self._scrape_page_async(page_num)
+                    except PageFailed as failure:
+                        backoff = self._handle_failed_page(page_num, failure, pending_pages, page_attempts)
+                        break
+                    
+                    # Delivery runs page callbacks and extraction bookkeeping: off the loop
+                    if not await self._run(self._finish_page, page_num, jobs, all_jobs):
+                        break
+                
+                await self._run(self._end_session, backoff is None)
+                if backoff:
+                    await asyncio.sleep(backoff)
+            
+            await self._run(self._report_pool_status)
+        
+        except Exception as e:
+            print(f"\n❌ Error during scraping: {str(e)}")
+        finally:
+            await self._run(self._close_run, all_jobs)
+        
+        print(f"\n  📊 Total jobs scraped: {len(all_jobs)}")
+        return all_jobs
+
+
+async def scrape_concurrently(scrapers: List[AsyncIndeedScraper], max_threads: int = 64) -> List[ResultBuffer]:
+    """Run several async scrapers on the current loop; results in scraper order."""
+    loop = asyncio.get_running_loop()
+    # The default executor is sized for CPU work; WebDriver calls are I/O-bound
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="webdriver"))
+    return await asyncio.gather(*(scraper.scrape_all_pages_async() for scraper in scrapers))
+
+
+def run_scrapers(scrapers: List[AsyncIndeedScraper], max_threads: int = 64) -> List[ResultBuffer]:
+    """Blocking entry point for scrape_concurrently."""
+    return asyncio.run(scrape_concurrently(scrapers, max_threads))
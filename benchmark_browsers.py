@@ -0,0 +1,118 @@
+"""
+Browser Layout Benchmark
+========================
+Compares the cost of concurrent page streams against the local mock site
+(no proxies, no real Indeed traffic):
+
+    python benchmark_browsers.py --streams 4 --pages 3                     # browser per stream vs tabs
+    xvfb-run python benchmark_browsers.py --compare profiles --pages 10    # headed vs headless
+
+Every stream paginates its own query; the whole Chrome process tree is
+sampled after every round of page loads and the peak RSS, CPU seconds,
+pages/minute and streams per GB of RAM are reported. Headed runs need a
+display; on a headless node run them under Xvfb.
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+from chrome_driver_manager import get_driver
+from extraction import extract_jobs_from_html
+from mock_indeed import MockIndeedServer
+from process_metrics import driver_pids, tree_cpu_seconds, tree_rss_mb
+
+
+QUERIES = ["python", "golang", "rust", "java", "data engineer", "devops", "frontend", "sre"]
+
+
+def _paginate(server: MockIndeedServer, windows: List[tuple], pages: int, pids: List[int]) -> Dict:
+    """Load ``pages`` pages in every (driver, handle) window, round by round."""
+    peak_rss = 0.0
+    start = time.time()
+    
+    for page in range(pages):
+        for stream, (driver, handle) in enumerate(windows):
+            driver.switch_to.window(handle)
+            query = QUERIES[stream % len(QUERIES)]
+            driver.get(f"{server.search_url(query)}&start={page * 10}")
+            assert extract_jobs_from_html(driver.page_source), "mock page without jobs"
+        peak_rss = max(peak_rss, tree_rss_mb(pids))
+    
+    wall_seconds = time.time() - start
+    return {
+        "peak_rss_mb": peak_rss,
+        "cpu_seconds": tree_cpu_seconds(pids),
+        "wall_seconds": wall_seconds,
+        "pages_per_minute": len(windows) * pages * 60 / wall_seconds if wall_seconds else 0.0,
+    }
+
+
+def run_browsers_per_stream(server: MockIndeedServer, streams: int, pages: int,
+                            headless: bool = False) -> Dict:
+    """One browser (one tab) per stream."""
+    drivers = [get_driver(use_proxy=False, headless=headless) for _ in range(streams)]
+    try:
+        pids = [pid for driver in drivers for pid in driver_pids(driver)]
+        windows = [(driver, driver.current_window_handle) for driver in drivers]
+        return _paginate(server, windows, pages, pids)
+    finally:
+        for driver in drivers:
+            try:
+                driver.quit()
+            except:
+                pass
+
+
+def run_tabs_per_browser(server: MockIndeedServer, streams: int, pages: int,
+                         headless: bool = False) -> Dict:
+    """One browser with a tab per stream."""
+    driver = get_driver(use_proxy=False, headless=headless)
+    try:
+        windows = [(driver, driver.current_window_handle)]
+        for _ in range(streams - 1):
+            driver.switch_to.new_window('tab')
+            windows.append((driver, driver.current_window_handle))
+        return _paginate(server, windows, pages, driver_pids(driver))
+    finally:
+        try:
+            driver.quit()
+        except:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tabs-per-browser vs browsers-per-node benchmark")
+    parser.add_argument("--streams", type=int, default=4, help="concurrent page streams")
+    parser.add_argument("--pages", type=int, default=3, help="pages per stream")
+    parser.add_argument("--delay", type=float, default=0.0, help="mock server latency (seconds)")
+    parser.add_argument("--compare", choices=["layouts", "profiles"], default="layouts",
+                        help="browser per stream vs tabs, or headed vs headless")
+    parser.add_argument("--headless", action="store_true", help="use the headless profile for --compare layouts")
+    args = parser.parse_args()
+    
+    if args.compare == "layouts":
+        configurations = {
+            "browser per stream": (run_browsers_per_stream, args.headless),
+            "tabs in one browser": (run_tabs_per_browser, args.headless),
+        }
+    else:
+        configurations = {
+            "headed": (run_browsers_per_stream, False),
+            "headless": (run_browsers_per_stream, True),
+        }
+    
+    with MockIndeedServer(delay=args.delay) as server:
+        print(f"📊 {args.streams} streams x {args.pages} pages against {server.search_url('...')}\n")
+        print(f"{'configuration':<22}{'peak RSS':>12}{'MB/stream':>12}{'streams/GB':>12}"
+              f"{'CPU s':>9}{'pages/min':>11}")
+        for name, (run, headless) in configurations.items():
+            result = run(server, args.streams, args.pages, headless=headless)
+            per_stream = result["peak_rss_mb"] / args.streams
+            print(f"{name:<22}{result['peak_rss_mb']:>10.0f}MB{per_stream:>12.0f}"
+                  f"{1024 / per_stream if per_stream else 0:>12.1f}"
+                  f"{result['cpu_seconds']:>9.1f}{result['pages_per_minute']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
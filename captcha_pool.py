@@ -0,0 +1,167 @@
+"""
+CAPTCHA Attention Pool
+======================
+Challenged browsers are parked here instead of blocking the scrape. A
+background thread watches each parked window: if the challenge disappears
+(solved by hand, or by an optional automated solver) the browser is reported
+as solved and closed; if nobody solves it before the timeout it is closed.
+The scraper meanwhile requeues the page onto a fresh proxy.
+
+A solved browser is not handed back for scraping: its session has already
+been ended and its page requeued, so solving only clears the proxy's
+cooldown (through ``on_solved``) and lets it rejoin the rotation early.
+Headless browsers have no window to solve in, so without a solver they are
+closed instead of parked.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+
+@dataclass
+class ParkedBrowser:
+    """A browser window waiting on a challenge."""
+    driver: Any
+    proxy_key: str
+    page_number: int
+    url: str
+    parked_at: float = field(default_factory=time.time)
+    solved: bool = False
+    solver_tried: bool = False
+
+
+class CaptchaAttentionPool:
+    """Background "needs attention" pool for challenged browsers."""
+    
+    def __init__(self, is_challenged: Callable[[Any], bool], solve_timeout: float = 300.0,
+                 poll_interval: float = 5.0, max_parked: int = 3,
+                 solver: Optional[Callable[[Any], None]] = None,
+                 on_solved: Optional[Callable[[ParkedBrowser], None]] = None,
+                 close_driver: Optional[Callable[[Any], None]] = None,
+                 headless: bool = False):
+        self.is_challenged = is_challenged
+        self.solve_timeout = solve_timeout
+        self.poll_interval = poll_interval
+        self.max_parked = max_parked
+        self.solver = solver
+        self.on_solved = on_solved
+        self.close_driver = close_driver
+        self.headless = headless
+        
+        self.parked: List[ParkedBrowser] = []
+        self.solved_count = 0
+        self.expired_count = 0
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def park(self, driver, proxy_key: str, page_number: int, url: str) -> bool:
+        """
+        Hand a challenged browser to the pool.
+        
+        Returns False (and closes the browser) when the pool is full, so a
+        burst of challenges can't pile up Chrome processes, or when the
+        browser is headless and there is no solver to clear the challenge.
+        """
+        if self.headless and not self.solver:
+            print(f"   🅿️ Headless browser for page {page_number} has no window to solve in, closing it")
+            self._close(driver)
+            return False
+        
+        with self.lock:
+            if len(self.parked) >= self.max_parked:
+                full = True
+            else:
+                full = False
+                self.parked.append(ParkedBrowser(driver, proxy_key, page_number, url))
+                if not self._thread or not self._thread.is_alive():
+                    self._stop.clear()
+                    self._thread = threading.Thread(target=self._monitor, name="captcha-pool", daemon=True)
+                    self._thread.start()
+        
+        if full:
+            self._close(driver)
+            return False
+        
+        if self.headless:
+            print(f"   🅿️ Parked challenged browser for page {page_number} "
+                  f"(waiting up to {self.solve_timeout:.0f}s for the solver)")
+        else:
+            print(f"   🅿️ Parked challenged browser for page {page_number} "
+                  f"(solve it in its window within {self.solve_timeout:.0f}s)")
+        return True
+    
+    def _monitor(self):
+        """Poll parked browsers until the pool is empty or stopped."""
+        while not self._stop.is_set():
+            with self.lock:
+                entries = list(self.parked)
+                if not entries:
+                    # Under the lock, so park() starts a new monitor after this
+                    self._thread = None
+                    return
+            
+            for entry in entries:
+                self._check(entry)
+            
+            self._stop.wait(self.poll_interval)
+    
+    def _check(self, entry: ParkedBrowser):
+        """Try the solver once, then watch for the challenge to clear."""
+        try:
+            if self.solver and not entry.solver_tried:
+                entry.solver_tried = True
+                self.solver(entry.driver)
+            entry.solved = not self.is_challenged(entry.driver)
+        except Exception:
+            entry.solved = False
+        
+        expired = time.time() - entry.parked_at > self.solve_timeout
+        if not entry.solved and not expired:
+            return
+        
+        with self.lock:
+            if entry not in self.parked:
+                return
+            self.parked.remove(entry)
+            if entry.solved:
+                self.solved_count += 1
+            else:
+                self.expired_count += 1
+        
+        if entry.solved:
+            print(f"   ✓ Parked browser for page {entry.page_number} solved its challenge")
+            if self.on_solved:
+                try:
+                    self.on_solved(entry)
+                except Exception as e:
+                    print(f"   ⚠️ on_solved callback failed: {e}")
+        # Solved or not, the page was already requeued elsewhere
+        self._close(entry.driver)
+    
+    def _close(self, driver):
+        if self.close_driver:
+            self.close_driver(driver)
+            return
+        try:
+            driver.quit()
+        except:
+            pass
+    
+    def pending(self) -> List[ParkedBrowser]:
+        """Browsers still waiting for attention."""
+        with self.lock:
+            return list(self.parked)
+    
+    def shutdown(self):
+        """Stop monitoring and close every parked browser."""
+        self._stop.set()
+        thread = self._thread
+        if thread:
+            thread.join(timeout=self.poll_interval + 1)
+        with self.lock:
+            entries, self.parked = self.parked, []
+        for entry in entries:
+            self._close(entry.driver)
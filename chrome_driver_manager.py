@@ -16,6 +16,42 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 
 
+# Background tabs keep their timers and renderer priority, so multi-tab
+# dwell routines run on time in tabs that are not in front
+BACKGROUND_TAB_ARGUMENTS = [
+    '--disable-background-timer-throttling',
+    '--disable-renderer-backgrounding',
+    '--disable-backgrounding-occluded-windows',
+]
+
+# Lean renderer settings for the headless profile: no GPU process, no
+# images (jobs come from the embedded JSON), and unthrottled background tabs
+HEADLESS_ARGUMENTS = [
+    '--window-size=1920,1080',
+    '--disable-gpu',
+    '--mute-audio',
+    '--blink-settings=imagesEnabled=false',
+    '--renderer-process-limit=4',
+] + BACKGROUND_TAB_ARGUMENTS
+
+
+def _add_arguments(options, arguments):
+    for argument in arguments:
+        if argument not in options.arguments:
+            options.add_argument(argument)
+    return options
+
+
+def apply_headless_profile(options):
+    """Add the headless profile's renderer settings to Chrome options."""
+    return _add_arguments(options, HEADLESS_ARGUMENTS)
+
+
+def apply_background_tab_profile(options):
+    """Stop Chrome throttling background tabs (needed headed too, when scraping in several tabs)."""
+    return _add_arguments(options, BACKGROUND_TAB_ARGUMENTS)
+
+
 def detect_chrome_version() -> Optional[str]:
     """
     Detect installed Chrome version across Windows, Mac, and Linux.
@@ -140,7 +176,8 @@ def _detect_chrome_version_linux() -> Optional[str]:
     return None
 
 
-def get_driver(use_proxy: bool = False, proxy_config: Optional[dict] = None, proxy_auth_manager=None) -> uc.Chrome:
+def get_driver(use_proxy: bool = False, proxy_config: Optional[dict] = None, proxy_auth_manager=None,
+               headless: bool = False, background_tabs: bool = False) -> uc.Chrome:
     """
     Universal Chrome driver initialization with automatic version detection.
     
@@ -148,6 +185,9 @@ def get_driver(use_proxy: bool = False, proxy_config: Optional[dict] = None, pro
         use_proxy: Whether to use proxy
         proxy_config: Proxy configuration dict (optional)
         proxy_auth_manager: ProxyAuthManager instance for automatic authentication
+        headless: Use Chrome's new headless mode with lean renderer settings
+                  (no display server needed)
+        background_tabs: Keep background tabs unthrottled (multi-tab scraping)
     
     Returns:
         uc.Chrome: Working Chrome driver instance
@@ -160,7 +200,8 @@ def get_driver(use_proxy: bool = False, proxy_config: Optional[dict] = None, pro
     # If we have a proxy auth manager, use it directly
     if proxy_auth_manager and use_proxy:
         try:
-            driver = proxy_auth_manager.create_driver_with_proxy(proxy_config)
+            driver = proxy_auth_manager.create_driver_with_proxy(proxy_config, headless=headless,
+                                                                 background_tabs=background_tabs)
             print("✅ Success! Using ProxyAuthManager with automatic authentication")
             return driver
         except Exception as e:
@@ -181,6 +222,11 @@ def get_driver(use_proxy: bool = False, proxy_config: Optional[dict] = None, pro
     options.add_argument('--disable-features=IsolateOrigins,site-per-process')
     options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
     
+    if headless:
+        apply_headless_profile(options)
+    if background_tabs:
+        apply_background_tab_profile(options)
+    
     # Add proxy if specified (legacy method)
     if use_proxy and proxy_config and not proxy_auth_manager:
         proxy_server = proxy_config.get('server', '').replace('http://', '')
@@ -192,14 +238,14 @@ def get_driver(use_proxy: bool = False, proxy_config: Optional[dict] = None, pro
     if chrome_version:
         try:
             print(f"🔧 Attempting undetected-chromedriver with Chrome {chrome_version}...")
-            driver = uc.Chrome(options=options, version_main=int(chrome_version))
+            driver = uc.Chrome(options=options, version_main=int(chrome_version), headless=headless)
             driver.set_window_size(1920, 1080)
             
             # Quick test to ensure driver works
             driver.get("data:text/html,<html><body><h1>Driver Test</h1></body></html>")
             print(f"✅ Success! Using undetected-chromedriver with Chrome {chrome_version}")
             return driver
-            
+        
         except Exception as e:
             print(f"⚠️  undetected-chromedriver with version {chrome_version} failed: {e}")
             try:
@@ -210,14 +256,14 @@ def get_driver(use_proxy: bool = False, proxy_config: Optional[dict] = None, pro
     # Strategy 2: Try undetected-chromedriver without specific version (auto-detect)
     try:
         print("🔧 Attempting undetected-chromedriver with auto-detection...")
-        driver = uc.Chrome(options=options, version_main=None)
+        driver = uc.Chrome(options=options, version_main=None, headless=headless)
         driver.set_window_size(1920, 1080)
         
         # Quick test
         driver.get("data:text/html,<html><body><h1>Driver Test</h1></body></html>")
         print("✅ Success! Using undetected-chromedriver with auto-detection")
         return driver
-        
+    
     except Exception as e:
         print(f"⚠️  undetected-chromedriver auto-detection failed: {e}")
         try:
@@ -234,6 +280,8 @@ def get_driver(use_proxy: bool = False, proxy_config: Optional[dict] = None, pro
         standard_options = Options()
         for arg in options.arguments:
             standard_options.add_argument(arg)
+        if headless:
+            standard_options.add_argument('--headless=new')
         
         service = Service(ChromeDriverManager().install())
         driver = webdriver.Chrome(service=service, options=standard_options)
@@ -244,7 +292,7 @@ def get_driver(use_proxy: bool = False, proxy_config: Optional[dict] = None, pro
         print("✅ Success! Using webdriver-manager fallback")
         print("⚠️  Note: Using standard Selenium (may be detected by anti-bot systems)")
         return driver
-        
+    
     except Exception as e:
         print(f"❌ webdriver-manager fallback failed: {e}")
         try:
@@ -280,7 +328,7 @@ def test_driver_initialization():
         
         driver.quit()
         print("✅ Driver cleanup successful!")
-        
+    
     except Exception as e:
         print(f"❌ Driver test failed: {e}")
         raise
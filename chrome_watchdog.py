@@ -0,0 +1,224 @@
+"""
+Chrome Process Watchdog
+=======================
+Keeps long batch runs from slowly filling a node with Chrome processes.
+
+Every driver the scraper launches is registered: its browser and
+chromedriver pids go into a pidfile, WebDriver commands and page loads get
+timeouts (a hung renderer raises instead of blocking forever), and the
+process tree is checked between pages against RSS, CPU and age limits.
+
+    watchdog = ChromeWatchdog()
+    watchdog.kill_orphans()               # leftovers of crashed runs
+    watchdog.register(driver)
+    reason = watchdog.check(driver)       # e.g. "RSS 2100 MB > 1500 MB"
+    watchdog.quit(driver)                 # quit(), then kill what is left
+
+Pidfiles live in one directory per node, so a later process can clean up
+after a run that died without quitting its browsers.
+"""
+
+import os
+import signal
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from process_metrics import driver_pids, is_running, process_tree, tree_cpu_seconds, tree_rss_mb
+
+
+DEFAULT_PIDFILE_DIR = os.path.join(tempfile.gettempdir(), "indeed_scraper_chrome")
+
+
+@dataclass
+class DriverLimits:
+    """When a browser is recycled, and how long a single command may take."""
+    max_rss_mb: float = 1500.0
+    # Average CPU over the interval between two checks (100 = one full core)
+    max_cpu_percent: float = 150.0
+    max_age_seconds: float = 1800.0
+    command_timeout: float = 60.0
+    page_load_timeout: float = 45.0
+    quit_timeout: float = 10.0
+
+
+@dataclass
+class WatchedDriver:
+    """A registered driver's pids and last CPU sample."""
+    pids: List[int]
+    pidfile: str
+    started_at: float = field(default_factory=time.time)
+    last_check: float = field(default_factory=time.time)
+    last_cpu: float = 0.0
+
+
+def _is_chrome_process(pid: int) -> bool:
+    """Guard against pid reuse: only ever kill chrome/chromedriver processes."""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return b"chrom" in f.read().lower()
+    except OSError:
+        return False
+
+
+def kill_tree(pids: List[int], grace: float = 3.0):
+    """SIGTERM the Chrome processes under ``pids``, then SIGKILL any survivors."""
+    tree = [pid for pid in process_tree(pids) if _is_chrome_process(pid)]
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        for pid in tree:
+            try:
+                os.kill(pid, sig)
+            except (ProcessLookupError, PermissionError):
+                pass
+        deadline = time.time() + grace
+        while time.time() < deadline and any(is_running(pid) for pid in tree):
+            time.sleep(0.1)
+        tree = [pid for pid in tree if is_running(pid)]
+        if not tree:
+            return
+
+
+class ChromeWatchdog:
+    """Tracks, limits and cleans up the browsers of this process."""
+    
+    def __init__(self, limits: Optional[DriverLimits] = None, pidfile_dir: str = DEFAULT_PIDFILE_DIR):
+        self.limits = limits or DriverLimits()
+        self.pidfile_dir = pidfile_dir
+        self.watched: Dict[int, WatchedDriver] = {}
+        self.lock = threading.Lock()
+        os.makedirs(pidfile_dir, exist_ok=True)
+    
+    def register(self, driver) -> Optional[WatchedDriver]:
+        """Start watching a freshly launched driver and apply command timeouts."""
+        self._apply_timeouts(driver)
+        
+        pids = driver_pids(driver)
+        if not pids:
+            return None
+        
+        pidfile = os.path.join(self.pidfile_dir, f"{os.getpid()}-{id(driver)}.pids")
+        with open(pidfile, 'w') as f:
+            f.write("\n".join(str(pid) for pid in [os.getpid()] + pids))
+        
+        watched = WatchedDriver(pids, pidfile, last_cpu=tree_cpu_seconds(pids))
+        with self.lock:
+            self.watched[id(driver)] = watched
+        return watched
+    
+    def _apply_timeouts(self, driver):
+        # Per-driver HTTP timeout for every WebDriver command
+        client_config = getattr(getattr(driver, "command_executor", None), "_client_config", None)
+        if client_config is not None:
+            client_config.timeout = self.limits.command_timeout
+        try:
+            driver.set_page_load_timeout(self.limits.page_load_timeout)
+        except Exception:
+            pass
+    
+    def check(self, driver) -> Optional[str]:
+        """Why the driver's browser should be recycled, or None while it is within limits."""
+        with self.lock:
+            watched = self.watched.get(id(driver))
+        if not watched:
+            return None
+        
+        if not any(is_running(pid) for pid in watched.pids):
+            return "browser process exited"
+        
+        now = time.time()
+        age = now - watched.started_at
+        if age > self.limits.max_age_seconds:
+            return f"age {age / 60:.0f} min > {self.limits.max_age_seconds / 60:.0f} min"
+        
+        rss = tree_rss_mb(watched.pids)
+        if rss > self.limits.max_rss_mb:
+            return f"RSS {rss:.0f} MB > {self.limits.max_rss_mb:.0f} MB"
+        
+        cpu = tree_cpu_seconds(watched.pids)
+        interval = now - watched.last_check
+        cpu_percent = 100 * (cpu - watched.last_cpu) / interval if interval > 0 else 0.0
+        watched.last_check, watched.last_cpu = now, cpu
+        if cpu_percent > self.limits.max_cpu_percent:
+            return f"CPU {cpu_percent:.0f}% > {self.limits.max_cpu_percent:.0f}%"
+        
+        return None
+    
+    def quit(self, driver):
+        """
+        Quit a driver without hanging, then kill whatever it left behind.
+        
+        ``driver.quit()`` runs on a helper thread bounded by quit_timeout;
+        a hung or crashed browser is then killed through its process tree.
+        """
+        with self.lock:
+            watched = self.watched.pop(id(driver), None)
+        pids = watched.pids if watched else driver_pids(driver)
+        
+        quitter = threading.Thread(target=self._quietly_quit, args=(driver,), daemon=True)
+        quitter.start()
+        quitter.join(self.limits.quit_timeout)
+        if quitter.is_alive():
+            print("   ⚠️ driver.quit() hung; killing the browser")
+        
+        kill_tree(pids)
+        if watched:
+            self._remove_pidfile(watched.pidfile)
+    
+    @staticmethod
+    def _quietly_quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    
+    def kill_orphans(self, include_own: bool = False) -> int:
+        """
+        Kill browsers recorded by processes that no longer exist.
+        
+        With include_own, this process's pidfiles count as orphans too (for
+        the very end of a worker process that runs several scrapers).
+        Returns the number of pidfiles cleaned up.
+        """
+        cleaned = 0
+        for name in os.listdir(self.pidfile_dir):
+            path = os.path.join(self.pidfile_dir, name)
+            try:
+                with open(path) as f:
+                    pids = [int(line) for line in f.read().split()]
+            except (OSError, ValueError):
+                continue
+            if not pids:
+                self._remove_pidfile(path)
+                continue
+            
+            owner, browser_pids = pids[0], pids[1:]
+            own = owner == os.getpid()
+            if (own and not include_own) or (not own and is_running(owner)):
+                continue
+            
+            kill_tree(browser_pids)
+            self._remove_pidfile(path)
+            cleaned += 1
+        
+        if cleaned:
+            print(f"🧹 Killed leftover browsers of {cleaned} driver(s)")
+        return cleaned
+    
+    def shutdown(self):
+        """Kill every browser this watchdog still has registered."""
+        with self.lock:
+            watched = list(self.watched.values())
+            self.watched.clear()
+        for entry in watched:
+            kill_tree(entry.pids)
+            self._remove_pidfile(entry.pidfile)
+        self.kill_orphans()
+    
+    @staticmethod
+    def _remove_pidfile(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,159 @@
+"""
+Columnar Job Export
+===================
+Writes scraped jobs as Parquet, partitioned by run date and search query,
+with real column types: numeric (and annualized) salary bounds,
+dictionary-encoded (categorical) job_type, salary_period and
+salary_currency, nulls instead of "Not mentioned".
+
+Each delivered page becomes one row group, so the writer can be used
+directly as the scraper's page callback. A Parquet file is only readable
+once ``close()`` writes its footer, so a killed run loses the file it was
+writing; with ``row_groups_per_file`` the writer closes each file after that
+many pages and starts the next, and a crash loses at most those pages:
+
+    writer = ParquetJobWriter.for_search("output/parquet", url, row_groups_per_file=10)
+    scraper = IndeedScraperV3(url, pages, page_callback=writer.write_page)
+    scraper.scrape_all_pages()
+    writer.close()
+    
+    pd.read_parquet("output/parquet")   # run_date and query come back as columns
+
+Needs ``pyarrow`` (``pip install pyarrow``); without it ``available()`` is
+False and callers keep to CSV/JSON.
+"""
+
+import os
+import re
+import time
+from datetime import date
+from typing import Dict, List, Optional, Union
+from urllib.parse import parse_qs, urlparse
+
+from job_record import JobRecord
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+COLUMNS = ['title', 'company', 'location', 'salary', 'salary_min', 'salary_max', 'salary_currency',
+           'salary_period', 'salary_annual_min', 'salary_annual_max', 'job_type', 'posted_date',
+           'summary', 'url', 'job_key', 'scraped_from_page']
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def schema():
+    """Arrow schema of the exported jobs."""
+    category = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('title', pa.string()),
+        ('company', pa.string()),
+        ('location', pa.string()),
+        ('salary', pa.string()),
+        ('salary_min', pa.float64()),
+        ('salary_max', pa.float64()),
+        ('salary_currency', category),
+        ('salary_period', category),
+        ('salary_annual_min', pa.float64()),
+        ('salary_annual_max', pa.float64()),
+        ('job_type', category),
+        ('posted_date', pa.string()),
+        ('summary', pa.string()),
+        ('url', pa.string()),
+        ('job_key', pa.string()),
+        ('scraped_from_page', pa.int32()),
+    ])
+
+
+def job_columns(jobs: List[Union[JobRecord, Dict]], page_number: Optional[int] = None) -> Dict[str, list]:
+    """Jobs as typed column lists; dicts (rows of older exports) are read as records first."""
+    columns: Dict[str, list] = {name: [] for name in COLUMNS}
+    
+    for job in jobs:
+        record = job if isinstance(job, JobRecord) else JobRecord.from_dict(job)
+        for name in COLUMNS:
+            columns[name].append(getattr(record, name))
+        if record.scraped_from_page is None:
+            columns['scraped_from_page'][-1] = page_number
+    return columns
+
+
+def query_partition(url: str) -> str:
+    """Filesystem-safe partition value for a search URL's query (and location)."""
+    params = parse_qs(urlparse(url).query)
+    parts = params.get('q', []) + params.get('l', [])
+    slug = re.sub(r'[^a-z0-9]+', '-', ' '.join(parts).lower()).strip('-')
+    return slug or 'all'
+
+
+class ParquetJobWriter:
+    """Appends pages of jobs as row groups of one Parquet file per run and partition."""
+    
+    def __init__(self, root: str, query: str, run_date: Optional[date] = None,
+                 compression: str = "zstd", row_groups_per_file: Optional[int] = None):
+        if pa is None:
+            raise RuntimeError("Parquet export needs pyarrow; pip install pyarrow")
+        self.schema = schema()
+        self.compression = compression
+        self.row_groups_per_file = row_groups_per_file
+        run_date = run_date or date.today()
+        self.directory = os.path.join(root, f"run_date={run_date.isoformat()}", f"query={query}")
+        # Files of one run: runs sharing a partition never overwrite each other
+        self.prefix = f"part-{time.strftime('%H%M%S')}-{os.getpid()}"
+        self.paths: List[str] = []
+        self.path: Optional[str] = None
+        self.writer = None
+        self.file_row_groups = 0
+        self.rows_written = 0
+        self.row_groups = 0
+    
+    @classmethod
+    def for_search(cls, root: str, url: str, **kwargs) -> "ParquetJobWriter":
+        return cls(root, query_partition(url), **kwargs)
+    
+    def write_page(self, page_number: int, jobs: List[JobRecord]):
+        """Write one page's jobs as a row group (page_callback signature)."""
+        if not jobs:
+            return
+        
+        columns = job_columns(jobs, page_number)
+        arrays = []
+        for field in self.schema:
+            if pa.types.is_dictionary(field.type):
+                arrays.append(pa.array(columns[field.name], pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(columns[field.name], field.type))
+        table = pa.Table.from_arrays(arrays, schema=self.schema)
+        
+        if self.writer is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.path = os.path.join(self.directory, f"{self.prefix}-{len(self.paths)}.parquet")
+            self.paths.append(self.path)
+            self.writer = pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        self.writer.write_table(table)
+        self.rows_written += len(jobs)
+        self.row_groups += 1
+        self.file_row_groups += 1
+        
+        # Finish the file so its pages survive a crash; the next page starts a new one
+        if self.row_groups_per_file and self.file_row_groups >= self.row_groups_per_file:
+            self.close()
+    
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            self.file_row_groups = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
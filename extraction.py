@@ -0,0 +1,131 @@
+"""
+Job Extraction Pipeline
+=======================
+Parsing of the job JSON Indeed embeds in result pages, plus a process-pool
+pipeline so that parsing runs off the thread driving Selenium.
+
+The scraper hands each page's raw provider-data payload to
+``ExtractionPipeline.submit`` and moves straight on to the next navigation;
+parsed pages are collected later in submission order, each with the
+worker's error if parsing failed. ``submit`` blocks while too many pages are
+still being parsed (backpressure).
+"""
+
+import json
+import multiprocessing
+import re
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Deque, Iterator, List, Optional, Tuple
+
+from job_record import JobRecord
+
+
+PROVIDER_DATA_MARKER = 'window.mosaic.providerData["mosaic-provider-jobcards"]'
+PROVIDER_DATA_PATTERN = re.compile(
+    r'window\.mosaic\.providerData\["mosaic-provider-jobcards"\]\s*=\s*({.*?});', re.DOTALL
+)
+
+
+def extract_payload(html_content: str) -> Optional[str]:
+    """
+    Cut the job-cards provider data out of a page without parsing it.
+    
+    Only plain substring searches, so it is cheap enough for the Selenium
+    thread; the result is what gets shipped to extraction workers.
+    """
+    start = html_content.find(PROVIDER_DATA_MARKER)
+    if start < 0:
+        return None
+    end = html_content.find('</script>', start)
+    return html_content[start:end] if end > 0 else html_content[start:]
+
+
+def extract_jobs_from_html(html_content: str) -> List[JobRecord]:
+    """Decode the job records from the JSON embedded in a page (or its payload)"""
+    try:
+        # Find the JSON data in the script tag
+        match = PROVIDER_DATA_PATTERN.search(html_content)
+        
+        if not match:
+            return []
+        
+        data = json.loads(match.group(1))
+        
+        # Navigate to the jobs array
+        model = data.get('metaData', {}).get('mosaicProviderJobCardsModel', {})
+        jobs_data = model.get('results') or []
+        
+        # Decode each job straight into a record
+        extracted_jobs = []
+        for job in jobs_data:
+            try:
+                extracted_jobs.append(JobRecord.from_result(job))
+            except Exception as e:
+                continue
+        
+        return extracted_jobs
+    
+    except Exception as e:
+        return []
+
+
+def _extract_page(page_number: int, payload: str) -> List[JobRecord]:
+    """Worker entry point: parse one page's payload and tag its jobs."""
+    jobs = extract_jobs_from_html(payload)
+    for job in jobs:
+        job.scraped_from_page = page_number
+    return jobs
+
+
+class ExtractionPipeline:
+    """Parses page payloads in worker processes, delivering pages in order."""
+    
+    def __init__(self, max_workers: int = 2, max_pending: int = 8):
+        self.max_pending = max_pending
+        # spawn: the scraper process has live threads (probes, watchers) that fork would copy mid-state
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self.pending: Deque[Tuple[int, Future]] = deque()
+    
+    def __len__(self) -> int:
+        return len(self.pending)
+    
+    def has_page(self, page_number: int) -> bool:
+        return any(page == page_number for page, _ in self.pending)
+    
+    def submit(self, page_number: int, payload: str) -> Future:
+        """Queue a page for parsing, waiting while max_pending pages are in flight."""
+        while True:
+            running = [future for _, future in self.pending if not future.done()]
+            if len(running) < self.max_pending:
+                break
+            wait(running, return_when=FIRST_COMPLETED)
+        
+        future = self.executor.submit(_extract_page, page_number, payload)
+        self.pending.append((page_number, future))
+        return future
+    
+    def _result(self, page_number: int, future: Future) -> Tuple[int, List[JobRecord], Optional[Exception]]:
+        try:
+            return page_number, future.result(), None
+        except Exception as e:
+            print(f"⚠️ Extraction of page {page_number} failed: {e}")
+            return page_number, [], e
+    
+    def completed(self) -> Iterator[Tuple[int, List[JobRecord], Optional[Exception]]]:
+        """Pop parsed pages (page, jobs, worker error) from the front of the queue without blocking."""
+        while self.pending and self.pending[0][1].done():
+            page_number, future = self.pending.popleft()
+            yield self._result(page_number, future)
+    
+    def drain(self) -> Iterator[Tuple[int, List[JobRecord], Optional[Exception]]]:
+        """Wait for and pop every queued page, in submission order."""
+        while self.pending:
+            page_number, future = self.pending.popleft()
+            yield self._result(page_number, future)
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -2,6 +2,16 @@
 Enhanced Human Behavior Simulation
 ==================================
 Realistic human-like browsing patterns to avoid detection.
+
+Each behavior is first built as a plan: a flat list of steps such as
+("scroll", pixels), ("pause", seconds) or ("actions", [...]). Plans hold all
+the randomness and no driver calls, so the same plan can be run blocking here
+or with asyncio.sleep by the async simulator in async_scraper.py.
+
+Before running, compile_plan folds each run of scrolls and the pauses between
+them into one ("batch", ops, seconds) step: a single injected JS routine that
+scrolls on animation frames and waits with timers inside the page. A page's
+browsing then costs a handful of WebDriver commands instead of one per scroll.
 """
 
 import time
@@ -13,11 +23,40 @@ from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import WebDriverException
 
 
+# A plan step: (kind, *args)
+Step = Tuple
+
+# Keep batches well under the driver's default 30s script timeout
+MAX_BATCH_SECONDS = 20.0
+
+# Runs [mode, pixels, wait_ms] ops in the page. With execute_async_script the
+# driver's callback is the last argument; with execute_script it runs detached.
+SCROLL_ROUTINE = """
+var ops = arguments[0];
+var done = typeof arguments[arguments.length - 1] === 'function' ? arguments[arguments.length - 1] : function () {};
+var i = 0;
+function frame(fn) {
+    if (document.visibilityState === 'visible') { window.requestAnimationFrame(fn); } else { setTimeout(fn, 0); }
+}
+function next() {
+    if (i >= ops.length) { done(window.scrollY); return; }
+    var op = ops[i++];
+    frame(function () {
+        if (op[0] === 'to') { window.scrollTo(0, op[1]); } else { window.scrollBy(0, op[1]); }
+        setTimeout(next, op[2]);
+    });
+}
+next();
+"""
+
+
 class HumanBehaviorSimulator:
     """Simulates realistic human browsing behavior."""
     
-    def __init__(self, driver):
+    def __init__(self, driver, headless: bool = False):
         self.driver = driver
+        # Headless browsers have no real window to minimize or resize
+        self.headless = headless
         self.session_start_time = time.time()
         self.page_visit_count = 0
         self.last_activity_time = time.time()
@@ -28,39 +67,69 @@ class HumanBehaviorSimulator:
         self.mouse_movement_style = random.choice(['precise', 'wandering', 'normal'])
         self.attention_span = random.uniform(30, 120)  # seconds before getting "distracted"
     
+    # ----- Public behaviors -----
+    
     def simulate_page_arrival(self):
         """Simulate human behavior when arriving at a new page."""
+        self.run_plan(self.plan_page_arrival())
+    
+    def simulate_job_browsing(self, job_count: int) -> float:
+        """
+        Simulate human-like job browsing behavior.
+        Returns the time spent on the page.
+        """
+        start_time = time.time()
+        self.run_plan(self.plan_job_browsing(job_count))
+        return time.time() - start_time
+    
+    def simulate_job_browsing_fast(self, job_count: int) -> float:
+        """
+        OPTIMIZED: Faster but still realistic job browsing behavior.
+        Returns the time spent on the page.
+        """
+        start_time = time.time()
+        self.run_plan(self.plan_job_browsing_fast(job_count))
+        return time.time() - start_time
+    
+    def simulate_session_break(self):
+        """Simulate longer break between session pages (optimized)."""
+        self.run_plan(self.plan_session_break())
+    
+    # ----- Plan builders -----
+    
+    def plan_page_arrival(self) -> List[Step]:
+        """Steps for arriving at a new page."""
         self.page_visit_count += 1
         self.last_activity_time = time.time()
         
         # Initial page load wait (optimized - humans need time to process)
-        initial_wait = random.uniform(0.8, 2.0)
-        time.sleep(initial_wait)
+        plan: List[Step] = [("pause", random.uniform(0.8, 2.0))]
         
         # Random chance of immediate back/forward (human mistake) - reduced frequency
         if random.random() < 0.02:  # 2% chance
-            self._simulate_navigation_mistake()
+            plan += self._plan_navigation_mistake()
         
         # Focus simulation (click somewhere safe)
-        self._simulate_page_focus()
-        
-        # Initial scroll to get page dimensions
-        self._simulate_initial_page_scan()
+        plan += [("focus",), ("pause", random.uniform(0.1, 0.3))]
+        
+        # Initial scroll to get page dimensions, then back to top
+        plan += [
+            ("scroll", 100),
+            ("pause", random.uniform(0.5, 1.5)),
+            ("scroll_to", 0),
+            ("pause", random.uniform(0.3, 0.8)),
+        ]
+        return plan
     
-    def simulate_job_browsing(self, job_count: int) -> float:
-        """
-        Simulate human-like job browsing behavior.
-        Returns the time spent on the page.
-        """
-        start_time = time.time()
-        
+    def plan_job_browsing(self, job_count: int) -> List[Step]:
+        """Steps for browsing a page of results."""
         # Calculate realistic reading time based on job count
         estimated_reading_time = self._calculate_reading_time(job_count)
         
         # Simulate various browsing patterns
         patterns = [
             self._pattern_quick_scan,
-            self._pattern_detailed_reading, 
+            self._pattern_detailed_reading,
             self._pattern_selective_browsing,
             self._pattern_comparison_browsing
         ]
@@ -69,8 +138,8 @@ class HumanBehaviorSimulator:
         if self.page_visit_count <= 2:
             # First few pages - more detailed
             pattern = random.choices(
-                patterns, 
-                weights=[20, 50, 20, 10], 
+                patterns,
+                weights=[20, 50, 20, 10],
                 k=1
             )[0]
         else:
@@ -81,22 +150,16 @@ class HumanBehaviorSimulator:
                 k=1
             )[0]
         
-        # Execute the selected browsing pattern
-        pattern(job_count, estimated_reading_time)
+        plan = pattern(job_count, estimated_reading_time)
         
         # Random chance of getting distracted/multitasking
         if random.random() < 0.15:  # 15% chance
-            self._simulate_distraction()
+            plan += self._plan_distraction()
         
-        return time.time() - start_time
+        return plan
     
-    def simulate_job_browsing_fast(self, job_count: int) -> float:
-        """
-        OPTIMIZED: Faster but still realistic job browsing behavior.
-        Returns the time spent on the page.
-        """
-        start_time = time.time()
-        
+    def plan_job_browsing_fast(self, job_count: int) -> List[Step]:
+        """Steps for the faster browsing profile."""
         # Calculate realistic reading time (50% faster than normal)
         estimated_reading_time = self._calculate_reading_time(job_count) * 0.5
         
@@ -105,18 +168,30 @@ class HumanBehaviorSimulator:
             self._pattern_quick_scan,
             self._pattern_selective_browsing,
         ]
-        
-        # Choose pattern
-        pattern = random.choice(patterns)
-        
-        # Execute the selected browsing pattern with reduced time
-        pattern(job_count, estimated_reading_time)
+        plan = random.choice(patterns)(job_count, estimated_reading_time)
         
         # Reduced distraction chance
         if random.random() < 0.05:  # 5% chance instead of 15%
-            time.sleep(random.uniform(0.5, 1.5))  # Shorter distraction
+            plan.append(("pause", random.uniform(0.5, 1.5)))  # Shorter distraction
         
-        return time.time() - start_time
+        return plan
+    
+    def plan_session_break(self) -> List[Step]:
+        """Steps for the break between pages of a session."""
+        # Shorter random break duration
+        break_duration = random.uniform(0.5, 2.0)
+        
+        print(f"   💤 Taking human-like break: {break_duration:.1f} seconds")
+        plan: List[Step] = [("pause", break_duration)]
+        
+        # Reduced chance of window interaction during break
+        if not self.headless and random.random() < 0.1:
+            plan += [
+                ("window", "minimize"),
+                ("pause", random.uniform(1, 3)),
+                ("window", "maximize"),
+            ]
+        return plan
     
     def _calculate_reading_time(self, job_count: int) -> float:
         """Calculate realistic reading time based on content."""
@@ -132,104 +207,109 @@ class HumanBehaviorSimulator:
         
         return base_reading_time + scanning_time
     
-    def _pattern_quick_scan(self, job_count: int, estimated_time: float):
+    def _pattern_quick_scan(self, job_count: int, estimated_time: float) -> List[Step]:
         """Quick scanning pattern - fast scrolling, minimal stops."""
+        plan: List[Step] = []
         scroll_segments = random.randint(2, 4)  # Reduced segments
-        time_per_segment = estimated_time * 0.3 / scroll_segments  # Use only 30% of estimated time
         
         for i in range(scroll_segments):
             # Quick scroll down
-            self._scroll_smoothly(random.randint(400, 900), speed='fast')
+            plan += self._scroll_steps(random.randint(400, 900), speed='fast')
             
             # Brief pause to "scan" (optimized)
-            time.sleep(random.uniform(0.3, 1.0))
+            plan.append(("pause", random.uniform(0.3, 1.0)))
             
             # Occasional small scroll adjustments (reduced frequency)
             if random.random() < 0.2:
-                self._scroll_smoothly(random.randint(-100, 100), speed='slow')
-                time.sleep(random.uniform(0.2, 0.6))
+                plan += self._scroll_steps(random.randint(-100, 100), speed='slow')
+                plan.append(("pause", random.uniform(0.2, 0.6)))
+        
+        return plan
     
-    def _pattern_detailed_reading(self, job_count: int, estimated_time: float):
+    def _pattern_detailed_reading(self, job_count: int, estimated_time: float) -> List[Step]:
         """Detailed reading pattern - slower scrolling, longer pauses."""
+        plan: List[Step] = []
         jobs_per_segment = random.randint(2, 4)
         segments = math.ceil(job_count / jobs_per_segment)
         
         for i in range(segments):
             # Scroll to next segment
-            scroll_amount = random.randint(400, 700)
-            self._scroll_smoothly(scroll_amount, speed='medium')
+            plan += self._scroll_steps(random.randint(400, 700), speed='medium')
             
             # Longer reading pause
-            reading_pause = random.uniform(3, 8)
-            time.sleep(reading_pause)
+            plan.append(("pause", random.uniform(3, 8)))
             
             # Random mouse movements while "reading"
             if random.random() < 0.7:
-                self._simulate_reading_mouse_movement()
+                plan += self._plan_reading_mouse_movement()
             
             # Occasional re-reading (scroll up a bit, then down)
             if random.random() < 0.3:
-                self._scroll_smoothly(random.randint(-200, -50), speed='slow')
-                time.sleep(random.uniform(1, 3))
-                self._scroll_smoothly(random.randint(100, 300), speed='medium')
+                plan += self._scroll_steps(random.randint(-200, -50), speed='slow')
+                plan.append(("pause", random.uniform(1, 3)))
+                plan += self._scroll_steps(random.randint(100, 300), speed='medium')
+        
+        return plan
     
-    def _pattern_selective_browsing(self, job_count: int, estimated_time: float):
+    def _pattern_selective_browsing(self, job_count: int, estimated_time: float) -> List[Step]:
         """Selective browsing - stop at interesting jobs, skip others (optimized)."""
-        current_position = 0
+        plan: List[Step] = []
         jobs_processed = 0
         
         while jobs_processed < job_count:
             # Scroll to next job(s)
-            scroll_amount = random.randint(300, 600)
-            self._scroll_smoothly(scroll_amount, speed='fast')
-            current_position += scroll_amount
+            plan += self._scroll_steps(random.randint(300, 600), speed='fast')
             
             # Decide if this job is "interesting" (reduced interesting jobs)
             is_interesting = random.random() < 0.25  # 25% of jobs are interesting
             
             if is_interesting:
                 # Shorter pause for interesting jobs
-                time.sleep(random.uniform(1, 3))
+                plan.append(("pause", random.uniform(1, 3)))
                 
                 # Mouse movement to indicate reading (reduced frequency)
                 if random.random() < 0.5:
-                    self._simulate_job_card_interaction()
+                    plan += self._plan_job_card_interaction()
                 
                 # Less frequent scroll adjustments
                 if random.random() < 0.3:
-                    self._scroll_smoothly(random.randint(-50, 50), speed='slow')
-                    time.sleep(random.uniform(0.5, 1.0))
+                    plan += self._scroll_steps(random.randint(-50, 50), speed='slow')
+                    plan.append(("pause", random.uniform(0.5, 1.0)))
             else:
                 # Quick glance at uninteresting jobs
-                time.sleep(random.uniform(0.2, 0.8))
+                plan.append(("pause", random.uniform(0.2, 0.8)))
             
             jobs_processed += random.randint(2, 4)  # Process 2-4 jobs per iteration
+        
+        return plan
     
-    def _pattern_comparison_browsing(self, job_count: int, estimated_time: float):
+    def _pattern_comparison_browsing(self, job_count: int, estimated_time: float) -> List[Step]:
         """Comparison browsing - scrolling back and forth to compare jobs."""
         # Initial scan down
-        self._scroll_smoothly(random.randint(800, 1200), speed='medium')
-        time.sleep(random.uniform(2, 4))
+        plan = self._scroll_steps(random.randint(800, 1200), speed='medium')
+        plan.append(("pause", random.uniform(2, 4)))
         
         # Compare by scrolling up and down
         for i in range(random.randint(2, 4)):
             # Scroll up to compare
-            self._scroll_smoothly(random.randint(-400, -200), speed='medium')
-            time.sleep(random.uniform(2, 4))
+            plan += self._scroll_steps(random.randint(-400, -200), speed='medium')
+            plan.append(("pause", random.uniform(2, 4)))
             
             # Scroll back down
-            self._scroll_smoothly(random.randint(300, 600), speed='medium')
-            time.sleep(random.uniform(1, 3))
+            plan += self._scroll_steps(random.randint(300, 600), speed='medium')
+            plan.append(("pause", random.uniform(1, 3)))
             
             # Random horizontal movement (side-by-side comparison feel)
             if random.random() < 0.6:
-                self._simulate_horizontal_scanning()
+                plan += self._plan_horizontal_scanning()
+        
+        return plan
     
-    def _scroll_smoothly(self, amount: int, speed: str = 'medium'):
+    def _scroll_steps(self, amount: int, speed: str = 'medium') -> List[Step]:
         """Smooth, human-like scrolling."""
         speed_map = {
             'slow': (0.05, 0.15),
-            'medium': (0.02, 0.08), 
+            'medium': (0.02, 0.08),
             'fast': (0.01, 0.03)
         }
         
@@ -239,196 +319,262 @@ class HumanBehaviorSimulator:
         chunks = random.randint(3, 8)
         chunk_size = amount // chunks
         
+        plan: List[Step] = []
         for i in range(chunks):
-            try:
-                self.driver.execute_script(f"window.scrollBy(0, {chunk_size});")
-                time.sleep(random.uniform(*delay_range))
-            except WebDriverException:
-                break
+            plan.append(("scroll", chunk_size))
+            plan.append(("pause", random.uniform(*delay_range)))
         
         # Small random final adjustment
-        final_adjustment = random.randint(-20, 20)
-        try:
-            self.driver.execute_script(f"window.scrollBy(0, {final_adjustment});")
-        except WebDriverException:
-            pass
+        plan.append(("scroll", random.randint(-20, 20)))
+        return plan
     
-    def _simulate_page_focus(self):
-        """Simulate clicking to focus on page (human behavior)."""
-        try:
-            # Click in a safe area (usually center-ish of page)
-            viewport_width = self.driver.execute_script("return window.innerWidth;")
-            viewport_height = self.driver.execute_script("return window.innerHeight;")
-            
-            safe_x = random.randint(viewport_width // 4, 3 * viewport_width // 4)
-            safe_y = random.randint(viewport_height // 4, 3 * viewport_height // 4)
-            
-            ActionChains(self.driver).move_by_offset(safe_x, safe_y).click().perform()
-            time.sleep(random.uniform(0.1, 0.3))
-        except WebDriverException:
-            pass
+    def _plan_reading_mouse_movement(self) -> List[Step]:
+        """Mouse movement while reading."""
+        # Generate natural reading-like mouse movements
+        ops = []
+        for _ in range(random.randint(2, 5)):
+            ops.append(("move", random.randint(-50, 50), random.randint(-20, 20)))
+            ops.append(("pause", random.uniform(0.3, 0.8)))
+        return [("actions", ops)]
     
-    def _simulate_initial_page_scan(self):
-        """Simulate initial page scanning behavior."""
-        # Small initial scroll to see page content
-        try:
-            self.driver.execute_script("window.scrollBy(0, 100);")
-            time.sleep(random.uniform(0.5, 1.5))
-            
-            # Scroll back to top (natural human behavior)
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(random.uniform(0.3, 0.8))
-        except WebDriverException:
-            pass
+    def _plan_job_card_interaction(self) -> List[Step]:
+        """Mouse interaction with job cards."""
+        # Simulate reading company name, title, etc.
+        movements = [
+            (random.randint(-30, 30), random.randint(-10, 10)),
+            (random.randint(-20, 20), random.randint(20, 40)),
+            (random.randint(-40, 40), random.randint(-5, 15))
+        ]
+        
+        ops = []
+        for x, y in movements:
+            ops.append(("move", x, y))
+            ops.append(("pause", random.uniform(0.5, 1.2)))
+        return [("actions", ops)]
     
-    def _simulate_reading_mouse_movement(self):
-        """Simulate mouse movement while reading."""
-        try:
-            actions = ActionChains(self.driver)
-            
-            # Generate natural reading-like mouse movements
-            for _ in range(random.randint(2, 5)):
-                x_offset = random.randint(-50, 50)
-                y_offset = random.randint(-20, 20)
-                
-                actions.move_by_offset(x_offset, y_offset)
-                time.sleep(random.uniform(0.3, 0.8))
-            
-            actions.perform()
-        except WebDriverException:
-            pass
+    def _plan_horizontal_scanning(self) -> List[Step]:
+        """Horizontal eye/mouse movement (reading across)."""
+        # Left to right scanning motion
+        start_x = random.randint(-100, -50)
+        end_x = random.randint(50, 100)
+        steps = random.randint(3, 6)
+        
+        x_step = (end_x - start_x) // steps
+        
+        ops = [("move", start_x, 0)]
+        for i in range(steps):
+            ops.append(("move", x_step, random.randint(-5, 5)))
+            ops.append(("pause", random.uniform(0.2, 0.5)))
+        return [("actions", ops)]
     
-    def _simulate_job_card_interaction(self):
-        """Simulate mouse interaction with job cards."""
-        try:
-            # Move mouse to simulate looking at job details
-            actions = ActionChains(self.driver)
-            
-            # Simulate reading company name, title, etc.
-            movements = [
-                (random.randint(-30, 30), random.randint(-10, 10)),
-                (random.randint(-20, 20), random.randint(20, 40)),
-                (random.randint(-40, 40), random.randint(-5, 15))
+    def _plan_navigation_mistake(self) -> List[Step]:
+        """Accidental navigation (human error)."""
+        mistake_types = ['back_forward', 'accidental_click', 'key_press']
+        mistake = random.choice(mistake_types)
+        
+        if mistake == 'back_forward':
+            # Accidental back, then forward
+            return [
+                ("script", "window.history.back();"),
+                ("pause", random.uniform(0.5, 1.5)),
+                ("script", "window.history.forward();"),
+                ("pause", random.uniform(1.0, 2.0)),
             ]
-            
-            for x, y in movements:
-                actions.move_by_offset(x, y)
-                time.sleep(random.uniform(0.5, 1.2))
-            
-            actions.perform()
-        except WebDriverException:
-            pass
+        
+        if mistake == 'accidental_click':
+            # Quick click somewhere then move away
+            return [
+                ("actions", [
+                    ("move", random.randint(-100, 100), random.randint(-100, 100)),
+                    ("click",),
+                    ("move", random.randint(-50, 50), random.randint(-50, 50)),
+                ]),
+                ("pause", random.uniform(0.3, 0.8)),
+            ]
+        
+        # Accidental key press (like space or arrow)
+        mistake_key = random.choice([Keys.SPACE, Keys.ARROW_DOWN, Keys.ARROW_UP])
+        return [("actions", [("key", mistake_key)]), ("pause", random.uniform(0.5, 1.0))]
+    
+    def _plan_distraction(self) -> List[Step]:
+        """Human distraction/multitasking."""
+        distraction_types = ['pause', 'tab_switch'] if self.headless else ['pause', 'tab_switch', 'window_resize']
+        distraction = random.choice(distraction_types)
+        
+        if distraction == 'pause':
+            # Longer pause (checking phone, reading something else)
+            return [("pause", random.uniform(3, 10))]
+        
+        if distraction == 'tab_switch':
+            # Simulate tab switching (Ctrl+Tab), then switch back
+            return [
+                ("actions", [("chord", Keys.CONTROL, Keys.TAB)]),
+                ("pause", random.uniform(2, 5)),
+                ("actions", [("chord", Keys.CONTROL, Keys.TAB)]),
+            ]
+        
+        # Minor window adjustments, then restore original size
+        width_delta = random.randint(-50, 50)
+        height_delta = random.randint(-30, 30)
+        return [
+            ("window", "resize_by", width_delta, height_delta),
+            ("pause", random.uniform(1, 2)),
+            ("window", "resize_by", -width_delta, -height_delta),
+        ]
+    
+    # ----- Plan execution -----
+    
+    @staticmethod
+    def compile_plan(plan: List[Step]) -> List[Step]:
+        """
+        Fold runs of scroll and pause steps into ("batch", ops, seconds) steps.
+        
+        Each op is [mode, pixels, wait_ms] with the following pauses folded
+        into its wait, so the batch takes as long as the steps it replaces.
+        Pauses before the first scroll of a run stay plain pauses.
+        """
+        compiled: List[Step] = []
+        ops: List[list] = []
+        duration = 0.0
+        
+        def close_batch():
+            nonlocal ops, duration
+            if ops:
+                compiled.append(("batch", ops, duration))
+            ops, duration = [], 0.0
+        
+        for step in plan:
+            kind = step[0]
+            if kind in ("scroll", "scroll_to"):
+                if duration >= MAX_BATCH_SECONDS:
+                    close_batch()
+                ops.append(["to" if kind == "scroll_to" else "by", step[1], 0])
+            elif kind == "pause" and ops and duration + step[1] <= MAX_BATCH_SECONDS:
+                ops[-1][2] += int(step[1] * 1000)
+                duration += step[1]
+            else:
+                close_batch()
+                compiled.append(step)
+        close_batch()
+        return compiled
+    
+    @staticmethod
+    def compile_background(plan: List[Step]) -> Tuple[List[list], float]:
+        """
+        Flatten a plan into one scroll routine for a tab that is not in front.
+        
+        Mouse, keyboard and window steps need focus and are dropped; their
+        pauses are kept so the routine lasts as long as the plan.
+        Returns (ops, seconds) for start_batch.
+        """
+        ops: List[list] = []
+        duration = 0.0
+        for step in HumanBehaviorSimulator.compile_plan(plan):
+            wait = HumanBehaviorSimulator.step_duration(step)
+            if step[0] == "batch":
+                ops.extend(list(op) for op in step[1])
+            elif ops:
+                ops[-1][2] += int(wait * 1000)
+            elif wait:
+                ops.append(["by", 0, int(wait * 1000)])
+            duration += wait
+        return ops, duration
+    
+    @staticmethod
+    def actions_delay(ops: List[Tuple]) -> float:
+        """Total time an ("actions", ops) step spends pausing between moves."""
+        return sum(op[1] for op in ops if op[0] == "pause")
+    
+    @staticmethod
+    def step_duration(step: Step) -> float:
+        """Seconds a step spends waiting, whether compiled or not."""
+        if step[0] == "pause":
+            return step[1]
+        if step[0] == "batch":
+            return step[2]
+        if step[0] == "actions":
+            return HumanBehaviorSimulator.actions_delay(step[1])
+        return 0.0
     
-    def _simulate_horizontal_scanning(self):
-        """Simulate horizontal eye/mouse movement (reading across)."""
+    def run_plan(self, plan: List[Step]):
+        """Execute a plan, blocking through its pauses."""
+        for step in self.compile_plan(plan):
+            if step[0] == "pause":
+                time.sleep(step[1])
+            else:
+                self.execute_step(step)
+    
+    def execute_step(self, step: Step):
+        """
+        Run one non-pause step against the driver, blocking for its duration.
+        
+        A batch runs in the page through execute_async_script and an actions
+        step keeps its pauses inside the chain, so each is one command.
+        """
+        kind = step[0]
         try:
-            actions = ActionChains(self.driver)
+            if kind == "batch":
+                self.driver.execute_async_script(SCROLL_ROUTINE, step[1])
             
-            # Left to right scanning motion
-            start_x = random.randint(-100, -50)
-            end_x = random.randint(50, 100)
-            steps = random.randint(3, 6)
+            elif kind == "scroll":
+                self.driver.execute_script(f"window.scrollBy(0, {step[1]});")
             
-            x_step = (end_x - start_x) // steps
+            elif kind == "scroll_to":
+                self.driver.execute_script(f"window.scrollTo(0, {step[1]});")
             
-            actions.move_by_offset(start_x, 0)
+            elif kind == "script":
+                self.driver.execute_script(step[1])
             
-            for i in range(steps):
-                actions.move_by_offset(x_step, random.randint(-5, 5))
-                time.sleep(random.uniform(0.2, 0.5))
+            elif kind == "focus":
+                # Click in a safe area (usually center-ish of page)
+                viewport_width, viewport_height = self.driver.execute_script(
+                    "return [window.innerWidth, window.innerHeight];"
+                )
+                
+                safe_x = random.randint(viewport_width // 4, 3 * viewport_width // 4)
+                safe_y = random.randint(viewport_height // 4, 3 * viewport_height // 4)
+                
+                ActionChains(self.driver).move_by_offset(safe_x, safe_y).click().perform()
             
-            actions.perform()
+            elif kind == "actions":
+                self.perform_actions(step[1])
+            
+            elif kind == "window" and not self.headless:
+                self._window_step(step[1], *step[2:])
         except WebDriverException:
             pass
     
-    def _simulate_navigation_mistake(self):
-        """Simulate accidental navigation (human error)."""
-        mistake_types = ['back_forward', 'accidental_click', 'key_press']
-        mistake = random.choice(mistake_types)
-        
+    def start_batch(self, ops: List[list]):
+        """Start a batch's routine in the page and return without waiting for it."""
         try:
-            if mistake == 'back_forward':
-                # Accidental back, then forward
-                self.driver.execute_script("window.history.back();")
-                time.sleep(random.uniform(0.5, 1.5))
-                self.driver.execute_script("window.history.forward();")
-                time.sleep(random.uniform(1.0, 2.0))
-            
-            elif mistake == 'accidental_click':
-                # Quick click somewhere then move away
-                actions = ActionChains(self.driver)
-                actions.move_by_offset(random.randint(-100, 100), random.randint(-100, 100))
-                actions.click()
-                actions.move_by_offset(random.randint(-50, 50), random.randint(-50, 50))
-                actions.perform()
-                time.sleep(random.uniform(0.3, 0.8))
-            
-            elif mistake == 'key_press':
-                # Accidental key press (like space or arrow)
-                actions = ActionChains(self.driver)
-                mistake_key = random.choice([Keys.SPACE, Keys.ARROW_DOWN, Keys.ARROW_UP])
-                actions.send_keys(mistake_key)
-                actions.perform()
-                time.sleep(random.uniform(0.5, 1.0))
-                
+            self.driver.execute_script(SCROLL_ROUTINE, ops)
         except WebDriverException:
             pass
     
-    def _simulate_distraction(self):
-        """Simulate human distraction/multitasking."""
-        distraction_types = ['pause', 'tab_switch', 'window_resize']
-        distraction = random.choice(distraction_types)
-        
-        if distraction == 'pause':
-            # Longer pause (checking phone, reading something else)
-            pause_time = random.uniform(3, 10)
-            time.sleep(pause_time)
-        
-        elif distraction == 'tab_switch':
-            # Simulate tab switching (Ctrl+Tab)
-            try:
-                actions = ActionChains(self.driver)
-                actions.key_down(Keys.CONTROL).send_keys(Keys.TAB).key_up(Keys.CONTROL)
-                actions.perform()
-                time.sleep(random.uniform(2, 5))
-                # Switch back
-                actions.key_down(Keys.CONTROL).send_keys(Keys.TAB).key_up(Keys.CONTROL)
-                actions.perform()
-            except WebDriverException:
-                pass
-        
-        elif distraction == 'window_resize':
-            # Minor window adjustments
-            try:
-                current_size = self.driver.get_window_size()
-                new_width = current_size['width'] + random.randint(-50, 50)
-                new_height = current_size['height'] + random.randint(-30, 30)
-                
-                self.driver.set_window_size(new_width, new_height)
-                time.sleep(random.uniform(1, 2))
-                
-                # Restore original size
-                self.driver.set_window_size(current_size['width'], current_size['height'])
-            except WebDriverException:
-                pass
+    def perform_actions(self, ops: List[Tuple]):
+        """Build and perform one ActionChains sequence, pauses included."""
+        actions = ActionChains(self.driver)
+        for op in ops:
+            if op[0] == "move":
+                actions.move_by_offset(op[1], op[2])
+            elif op[0] == "click":
+                actions.click()
+            elif op[0] == "key":
+                actions.send_keys(op[1])
+            elif op[0] == "chord":
+                actions.key_down(op[1]).send_keys(op[2]).key_up(op[1])
+            elif op[0] == "pause":
+                actions.pause(op[1])
+        actions.perform()
     
-    def simulate_session_break(self):
-        """Simulate longer break between session pages (optimized)."""
-        # Shorter random break duration
-        break_duration = random.uniform(0.5, 2.0)
-        
-        print(f"   💤 Taking human-like break: {break_duration:.1f} seconds")
-        time.sleep(break_duration)
-        
-        # Reduced chance of window interaction during break
-        if random.random() < 0.1:
-            try:
-                # Minimize/restore or move window
-                self.driver.minimize_window()
-                time.sleep(random.uniform(1, 3))
-                self.driver.maximize_window()
-            except WebDriverException:
-                pass
+    def _window_step(self, operation: str, *args):
+        if operation == "minimize":
+            self.driver.minimize_window()
+        elif operation == "maximize":
+            self.driver.maximize_window()
+        elif operation == "resize_by":
+            current_size = self.driver.get_window_size()
+            self.driver.set_window_size(current_size['width'] + args[0], current_size['height'] + args[1])
     
     def get_session_summary(self) -> Dict:
         """Get summary of human behavior patterns for this session."""
@@ -441,4 +587,4 @@ class HumanBehaviorSimulator:
             "scroll_preference": self.scroll_preference,
             "mouse_style": self.mouse_movement_style,
             "avg_time_per_page": session_duration / max(self.page_visit_count, 1)
-        }
\ No newline at end of file
+        }
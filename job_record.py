@@ -0,0 +1,186 @@
+"""
+Typed Job Records
+=================
+One slotted dataclass per scraped job, decoded straight from an entry of
+Indeed's providerData ``results`` array. Missing values are ``None``
+rather than sentinel strings like "Not mentioned", and records are written
+row by row to JSONL/CSV without building intermediate dicts or DataFrames.
+
+    records = [JobRecord.from_result(entry) for entry in results]
+    write_jsonl(records, "output/results.jsonl")
+    write_csv(records, "output/results.csv")
+
+``JobRecord.from_dict`` reads rows of older exports (sentinels included).
+"""
+
+import csv
+import json
+import re
+from dataclasses import dataclass, fields
+from html import unescape
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Union
+
+from salary import parse_salary_text, salary_fields
+
+
+# Placeholder strings written by earlier versions for missing values
+SENTINELS = {'', 'Not mentioned', 'Not specified', 'No description', 'N/A'}
+
+# Indeed's job page, derived from the job key
+VIEW_URL = "https://www.indeed.com/viewjob?jk={}"
+
+HTML_TAG = re.compile(r'<[^>]+>')
+WHITESPACE = re.compile(r'\s+')
+
+
+@dataclass(slots=True)
+class JobRecord:
+    """A scraped job; every field may be None."""
+    title: Optional[str] = None
+    company: Optional[str] = None
+    location: Optional[str] = None
+    salary: Optional[str] = None
+    salary_period: Optional[str] = None
+    salary_min: Optional[float] = None
+    salary_max: Optional[float] = None
+    salary_currency: Optional[str] = None
+    salary_annual_min: Optional[float] = None
+    salary_annual_max: Optional[float] = None
+    job_type: Optional[str] = None
+    posted_date: Optional[str] = None
+    summary: Optional[str] = None
+    url: Optional[str] = None
+    job_key: Optional[str] = None
+    scraped_from_page: Optional[int] = None
+    
+    @classmethod
+    def from_result(cls, job: Dict) -> "JobRecord":
+        """Decode one entry of the providerData ``results`` array."""
+        job_key = job.get('jobkey') or None
+        structured = salary_fields(job)
+        
+        # Salary text: extractedSalary numbers, else the snippet Indeed shows
+        salary = None
+        sal_data = job.get('extractedSalary') or {}
+        if sal_data.get('max'):
+            salary = f"${sal_data.get('min', 0):,.0f} - ${sal_data['max']:,.0f}"
+        elif sal_data.get('min'):
+            salary = f"${sal_data['min']:,.0f}"
+        if salary is None:
+            salary = (job.get('salarySnippet') or {}).get('text') or None
+        
+        # Job type from jobTypes, else the job-types taxonomy attribute
+        job_type = ', '.join(job['jobTypes']) if job.get('jobTypes') else None
+        if job_type is None:
+            for attr in job.get('taxonomyAttributes') or []:
+                if attr.get('label') == 'job-types' and attr.get('attributes'):
+                    labels = [a['label'] for a in attr['attributes'] if 'label' in a]
+                    if labels:
+                        job_type = ', '.join(labels)
+                        break
+        
+        return cls(
+            title=job.get('title') or None,
+            company=job.get('company') or None,
+            location=job.get('formattedLocation') or job.get('location') or None,
+            salary=salary,
+            salary_period=structured['salary_period'],
+            salary_min=structured['salary_min'],
+            salary_max=structured['salary_max'],
+            salary_currency=structured['salary_currency'],
+            salary_annual_min=structured['salary_annual_min'],
+            salary_annual_max=structured['salary_annual_max'],
+            job_type=job_type,
+            posted_date=job.get('formattedRelativeTime') or None,
+            summary=clean_summary(job.get('snippet')),
+            url=VIEW_URL.format(job_key) if job_key else None,
+            job_key=job_key,
+        )
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "JobRecord":
+        """A record from an exported row; sentinel strings and NaN become None."""
+        values = {}
+        for name in FIELDS:
+            value = data.get(name)
+            if value is None or value != value or (isinstance(value, str) and value in SENTINELS):
+                continue
+            values[name] = value
+        record = cls(**values)
+        
+        # Numbers arrive as text from CSV, and are missing in pre-structured rows
+        for name in NUMERIC_FIELDS:
+            value = getattr(record, name)
+            if isinstance(value, str):
+                setattr(record, name, float(value))
+        if record.scraped_from_page is not None:
+            record.scraped_from_page = int(float(record.scraped_from_page))
+        if record.salary_min is None and record.salary_max is None and record.salary:
+            record.salary_min, record.salary_max, record.salary_currency = parse_salary_text(record.salary)
+        return record
+    
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in FIELDS}
+    
+    def to_row(self) -> List:
+        """CSV row in FIELDS order (None as an empty cell)."""
+        return ['' if value is None else value for value in (getattr(self, name) for name in FIELDS)]
+
+
+FIELDS = [field.name for field in fields(JobRecord)]
+NUMERIC_FIELDS = ['salary_min', 'salary_max', 'salary_annual_min', 'salary_annual_max']
+
+
+def clean_summary(snippet: Optional[str]) -> Optional[str]:
+    """Plain text of a job snippet: no tags, entities, bullets or repeated whitespace."""
+    if not snippet:
+        return None
+    text = unescape(HTML_TAG.sub('', snippet))
+    text = WHITESPACE.sub(' ', text).replace('•', '').replace('◦', '').strip()
+    return text or None
+
+
+def _open(target: Union[str, IO], append: bool) -> IO:
+    if isinstance(target, str):
+        return open(target, 'a' if append else 'w', encoding='utf-8', newline='')
+    return target
+
+
+def write_jsonl(records: Iterable[JobRecord], target: Union[str, IO], append: bool = False) -> int:
+    """One JSON object per line; returns the number of records written."""
+    f = _open(target, append)
+    count = 0
+    try:
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+        for record in records:
+            f.write(dumps(record.to_dict()))
+            f.write('\n')
+            count += 1
+    finally:
+        if f is not target:
+            f.close()
+    return count
+
+
+def write_csv(records: Iterable[JobRecord], target: Union[str, IO], append: bool = False) -> int:
+    """CSV with a FIELDS header (omitted when appending); returns the number of records written."""
+    f = _open(target, append)
+    count = 0
+    try:
+        writer = csv.writer(f)
+        if not append:
+            writer.writerow(FIELDS)
+        for record in records:
+            writer.writerow(record.to_row())
+            count += 1
+    finally:
+        if f is not target:
+            f.close()
+    return count
+
+
+def read_jsonl(path: str) -> Iterator[JobRecord]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield JobRecord.from_dict(json.loads(line))
@@ -3,27 +3,28 @@ Main Script for V3 Scraper (Anti-Bot Protection)
 ================================================
 """
 
-import json
 import os
 from datetime import datetime
 from pathlib import Path
 
-import pandas as pd
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
 from rich.table import Table
 
 from scraper_v3 import IndeedScraperV3
+from columnar_export import ParquetJobWriter, available as parquet_available
+from job_record import write_csv, write_jsonl
 from proxy_manager import ProxyManager
+from result_buffer import ResultBuffer
 
 console = Console()
 
 
 def generate_output_filename() -> tuple[str, str]:
-    """Generate unique output filenames for both JSON and CSV."""
+    """Generate unique output filenames for both JSONL and CSV."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    json_filename = f"results_{timestamp}.json"
+    json_filename = f"results_{timestamp}.jsonl"
     csv_filename = f"results_{timestamp}.csv"
     return (
         os.path.join("output", json_filename),
@@ -31,28 +32,18 @@ def generate_output_filename() -> tuple[str, str]:
     )
 
 
-def save_results(jobs, json_path: str, csv_path: str):
-    """Save results to both JSON and CSV formats."""
+def save_results(jobs: ResultBuffer, json_path: str, csv_path: str):
+    """Save results as JSON lines and CSV, straight from the job records."""
     # Create output directory
     os.makedirs(os.path.dirname(json_path), exist_ok=True)
     
-    # Save JSON file
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(jobs, f, indent=2, ensure_ascii=False)
+    # Save JSONL file (one job per line)
+    write_jsonl(jobs, json_path)
     
     # Save CSV file
     if jobs:
         try:
-            df = pd.DataFrame(jobs)
-            # Reorder columns for better readability
-            column_order = ['title', 'company', 'location', 'salary', 'salary_period', 
-                          'job_type', 'posted_date', 'summary', 'url', 'scraped_from_page']
-            # Only include columns that exist in the data
-            existing_columns = [col for col in column_order if col in df.columns]
-            df = df[existing_columns]
-            
-            # Save to CSV
-            df.to_csv(csv_path, index=False, encoding='utf-8')
+            write_csv(jobs, csv_path)
         except Exception as e:
             console.print(f"[yellow]⚠️ Could not save CSV file: {e}[/yellow]")
             console.print("[dim]JSON file saved successfully though![/dim]")
@@ -86,23 +77,48 @@ def main():
         console.print(f"[yellow]⚠️  Browser will open - DO NOT CLOSE IT![/yellow]")
         console.print(f"[yellow]   If you see CAPTCHA, solve it manually.[/yellow]\n")
         
+        # Pages are also written to partitioned Parquet as they arrive (needs pyarrow);
+        # files are finished every 10 pages so an interrupted run keeps them
+        parquet_writer = ParquetJobWriter.for_search(os.path.join("output", "parquet"), url,
+                                                     row_groups_per_file=10) \
+            if parquet_available() else None
+        
         # Run scraper with automatic proxy authentication
-        scraper = IndeedScraperV3(url, pages)
-        jobs = scraper.scrape_all_pages()
+        scraper = IndeedScraperV3(url, pages, extraction_workers=2,
+                                  page_callback=parquet_writer.write_page if parquet_writer else None)
+        try:
+            jobs = scraper.scrape_all_pages()
+        finally:
+            if parquet_writer:
+                parquet_writer.close()
         
         # Save results
         json_path, csv_path = generate_output_filename()
         save_results(jobs, json_path, csv_path)
         
-        # Display summary
+        parquet_line = ""
+        if parquet_writer and parquet_writer.rows_written:
+            parquet_line = f"\n[cyan]Parquet Files:[/cyan] {len(parquet_writer.paths)} in {parquet_writer.directory}"
+        
+        # Display summary: pages actually delivered, and what happened to the rest
+        delivered = len(scraper.delivered_pages)
+        complete = delivered == pages
+        failed_line = ""
+        if scraper.dead_letters:
+            failed = ", ".join(f"{letter.page_number} ({letter.kind.value})" for letter in scraper.dead_letters)
+            failed_line += f"\n[red]Dead-lettered Pages:[/red] {failed}"
+        if scraper.unfinished_pages:
+            failed_line += f"\n[red]Pages Not Reached:[/red] {', '.join(map(str, scraper.unfinished_pages))}"
+        
         console.print("\n")
         console.print(Panel.fit(
-            f"[bold green]✅ Scraping Complete![/bold green]\n\n"
+            (f"[bold green]✅ Scraping Complete![/bold green]\n\n" if complete
+             else f"[bold yellow]⚠️ Scraping Incomplete[/bold yellow]\n\n") +
             f"[cyan]Jobs Scraped:[/cyan] {len(jobs)}\n"
-            f"[cyan]Pages Scraped:[/cyan] {pages}\n"
+            f"[cyan]Pages Scraped:[/cyan] {delivered}/{pages}{failed_line}\n"
             f"[cyan]JSON File:[/cyan] {json_path}\n"
-            f"[cyan]CSV File:[/cyan] {csv_path}",
-            border_style="green"
+            f"[cyan]CSV File:[/cyan] {csv_path}{parquet_line}",
+            border_style="green" if complete else "yellow"
         ))
         
         # Sample jobs
@@ -115,9 +131,9 @@ def main():
             
             for job in jobs[:5]:
                 table.add_row(
-                    job.get('title', 'N/A')[:30],
-                    job.get('company', 'N/A')[:20],
-                    job.get('location', 'N/A')[:20]
+                    (job.title or 'N/A')[:30],
+                    (job.company or 'N/A')[:20],
+                    (job.location or 'N/A')[:20]
                 )
             
             console.print(table)
@@ -131,7 +147,7 @@ def main():
             console.print("  • CAPTCHA not solved")
             console.print("  • Invalid search URL")
             console.print("  • Indeed changed their HTML structure")
-        
+    
     except KeyboardInterrupt:
         console.print("\n[red]❌ Scraping interrupted by user[/red]")
     except Exception as e:
@@ -0,0 +1,116 @@
+"""
+Mock Indeed Results Server
+==========================
+A local HTTP server serving synthetic Indeed result pages (job cards plus
+the embedded ``mosaic-provider-jobcards`` provider data), so browser
+benchmarks can run without touching the real site or burning proxies.
+
+    with MockIndeedServer(delay=0.3) as server:
+        scraper = IndeedScraperV3(server.search_url("python"), 5)
+
+Pages honour the ``q`` and ``start`` query parameters, and ``delay`` adds
+server latency to every response.
+"""
+
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, quote_plus, urlparse
+
+
+def render_results_page(query: str, start: int, jobs_per_page: int = 15) -> str:
+    """One results page for ``query`` beginning at result offset ``start``."""
+    results = []
+    cards = []
+    for i in range(start, start + jobs_per_page):
+        jobkey = f"{zlib.crc32(query.encode()) % 10 ** 6:06d}{i:05d}"
+        results.append({
+            'jobkey': jobkey,
+            'title': f'{query.title()} Developer {i}',
+            'company': f'Company {i % 37}',
+            'formattedLocation': ['Remote', 'Austin, TX', 'New York, NY'][i % 3],
+            'extractedSalary': {'min': 80000 + 1000 * (i % 40), 'max': 120000 + 1000 * (i % 40), 'type': 'yearly'},
+            'jobTypes': ['Full-time'],
+            'formattedRelativeTime': f'{i % 30 + 1} days ago',
+            'snippet': '<ul><li>Build &amp; ship services</li></ul>'
+        })
+        cards.append(
+            f'<div class="job_seen_beacon" data-jk="{jobkey}">'
+            f'<h2 class="jobTitle"><a class="jcs-JobTitle" href="/viewjob?jk={jobkey}">'
+            f'{query.title()} Developer {i}</a></h2>'
+            f'<span data-testid="company-name">Company {i % 37}</span></div>'
+        )
+    
+    data = {'metaData': {'mosaicProviderJobCardsModel': {'results': results}}}
+    return (
+        f"<html><head><title>{query} jobs</title><script>"
+        f'window.mosaic = window.mosaic || {{providerData: {{}}}};'
+        f'window.mosaic.providerData["mosaic-provider-jobcards"]={json.dumps(data)};'
+        "</script></head><body><div id=\"mosaic-provider-jobcards\">"
+        + "".join(cards) +
+        "</div>" + "<div class=\"filler\">Lorem ipsum dolor sit amet.</div>" * 2000 +
+        "</body></html>"
+    )
+
+
+class MockIndeedServer:
+    """Threaded local server for synthetic result pages."""
+    
+    def __init__(self, port: int = 0, jobs_per_page: int = 15, delay: float = 0.0):
+        self.jobs_per_page = jobs_per_page
+        self.delay = delay
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+    
+    def _handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.delay:
+                    time.sleep(server.delay)
+                
+                params = parse_qs(urlparse(self.path).query)
+                query = params.get('q', ['python'])[0]
+                start = int(params.get('start', ['0'])[0])
+                body = render_results_page(query, start, server.jobs_per_page).encode()
+                
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+    
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+    
+    def search_url(self, query: str) -> str:
+        return f"http://127.0.0.1:{self.port}/jobs?q={quote_plus(query)}"
+    
+    def start(self) -> "MockIndeedServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self) -> "MockIndeedServer":
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,241 @@
+"""
+Multi-Tab Scraper
+=================
+Runs several searches as tabs of one browser instead of one browser each.
+A Chrome process tree costs ~300-500 MB, while an extra tab is one more
+renderer, so a node gets more concurrent page streams per GB of RAM.
+
+All tabs share the session's proxy (the site sees one IP, so the per-proxy
+request budget is shared too); each tab paginates its own query on its own
+timeline. While one tab "reads" (its scroll routine runs detached in the
+page), the driver moves on to whichever tab is due next.
+
+    scraper = MultiTabScraper(["https://www.indeed.com/jobs?q=python",
+                               "https://www.indeed.com/jobs?q=golang"], 5)
+    results = scraper.scrape_all_tabs()   # {search url: jobs}
+"""
+
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+from job_record import JobRecord
+from result_buffer import ResultBuffer
+from rate_limiter import RateLimiter
+from page_errors import PageErrorKind, PageFailed
+from scraper_v3 import IndeedScraperV3
+
+
+@dataclass
+class TabState:
+    """One search paginating in its own tab."""
+    base_url: str
+    pending_pages: Deque[int]
+    jobs: ResultBuffer = field(default_factory=ResultBuffer)
+    page_attempts: Dict[int, int] = field(default_factory=dict)
+    handle: Optional[str] = None
+    # "navigate" to the next page, or "read" the page that is loading
+    phase: str = "navigate"
+    page_number: Optional[int] = None
+    ready_at: float = 0.0
+    
+    @property
+    def active(self) -> bool:
+        return bool(self.pending_pages) or self.phase == "read"
+
+
+class MultiTabScraper(IndeedScraperV3):
+    """IndeedScraperV3 driving one tab per search in a single browser."""
+    
+    # Seconds to let a navigated tab load before reading it
+    LOAD_WAIT = (1.5, 3.0)
+    # Headed Chrome throttles the tabs that are not in front; the reading
+    # routines run in exactly those tabs
+    BACKGROUND_TABS = True
+    
+    def __init__(self, base_urls: List[str], page_count: int, proxy_file: str = "proxies.txt",
+                 start_page: int = 1,
+                 page_callback: Optional[Callable[[int, List[JobRecord]], None]] = None,
+                 lease_db: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 max_page_attempts: int = 3,
+                 headless: bool = False,
+                 archive_dir: Optional[str] = None,
+                 **kwargs):
+        super().__init__(base_urls[0], page_count, proxy_file, start_page=start_page,
+                         page_callback=page_callback, lease_db=lease_db,
+                         rate_limiter=rate_limiter, max_page_attempts=max_page_attempts,
+                         headless=headless, archive_dir=archive_dir, **kwargs)
+        self.tabs = [
+            TabState(url, deque(range(start_page, start_page + page_count)))
+            for url in base_urls
+        ]
+        self._tabs_driver = None
+        # A tab's failed page moves the whole browser to a fresh session
+        self._session_failed = False
+    
+    def scrape_all_tabs(self) -> Dict[str, ResultBuffer]:
+        """Scrape every search's pages, interleaving the tabs; results keyed by search URL."""
+        all_jobs = ResultBuffer()
+        
+        try:
+            print(f"🚀 Starting multi-tab scraping ({len(self.tabs)} tabs)...")
+            
+            while not self._stop_requested.is_set():
+                active = [tab for tab in self.tabs if tab.active]
+                if not active:
+                    break
+                
+                # Rotate only between pages, when no tab has a page loading
+                rotate = self._session_failed or self.session_manager.should_rotate_session()
+                if rotate and not any(tab.phase == "read" for tab in active):
+                    self._end_session(successful=not self._session_failed)
+                    self._session_failed = False
+                    self._start_new_session()
+                    if not self.current_session:
+                        print("❌ No healthy proxies available. Stopping.")
+                        break
+                
+                # Recycle an over-limit browser only when no tab has a page loading
+                if not any(tab.phase == "read" for tab in active):
+                    self._recycle_browser_if_needed()
+                
+                if self.driver is not self._tabs_driver:
+                    self._open_tabs(active)
+                
+                tab = min(active, key=lambda t: t.ready_at)
+                delay = tab.ready_at - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                
+                if tab.phase == "navigate":
+                    self._navigate_tab(tab, all_jobs)
+                else:
+                    self._read_tab(tab, all_jobs)
+            
+            self._end_session()
+            self._report_pool_status()
+        
+        except Exception as e:
+            print(f"\n❌ Error during scraping: {str(e)}")
+        finally:
+            self._close_run(all_jobs)
+        
+        print(f"\n  📊 Total jobs scraped: {len(all_jobs)} across {len(self.tabs)} tabs")
+        return {tab.base_url: tab.jobs for tab in self.tabs}
+    
+    def _open_tabs(self, tabs: List[TabState]):
+        """Give each tab a window in the (new) browser, reusing the first one."""
+        handles = list(self.driver.window_handles)
+        for tab in tabs:
+            if handles:
+                tab.handle = handles.pop(0)
+            else:
+                self.driver.switch_to.new_window('tab')
+                tab.handle = self.driver.current_window_handle
+            tab.ready_at = time.time()
+        self._tabs_driver = self.driver
+        print(f"   🗂️ {len(tabs)} tabs open in one browser")
+    
+    def _navigate_tab(self, tab: TabState, all_jobs: ResultBuffer):
+        """Send a tab to its next page once the request budgets allow it."""
+        # Nothing new goes out on a session that is about to be replaced
+        if self._session_failed:
+            tab.ready_at = time.time() + 0.5
+            return
+        
+        page_number = tab.pending_pages[0]
+        url = self._build_page_url(page_number, tab.base_url)
+        
+        # Wait by serving other tabs, not by sleeping on this one
+        wait = self.session_manager.try_acquire_request_slot(url)
+        if wait > 0:
+            tab.ready_at = time.time() + wait
+            return
+        
+        tab.pending_pages.popleft()
+        tab.page_number = page_number
+        print(f"  📄 [{tab.base_url[-30:]}] page {page_number}...")
+        
+        try:
+            self.driver.switch_to.window(tab.handle)
+            self.driver.get(url)
+            tab.phase = "read"
+            tab.ready_at = time.time() + random.uniform(*self.LOAD_WAIT)
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            self.session_manager.record_failure()
+            self._fail_tab_page(tab, self._page_failure(e))
+    
+    def _read_tab(self, tab: TabState, all_jobs: ResultBuffer):
+        """Extract a loaded tab's jobs and start its reading behaviour."""
+        page_number = tab.page_number
+        url = self._build_page_url(page_number, tab.base_url)
+        
+        try:
+            self.driver.switch_to.window(tab.handle)
+            
+            if self._check_for_captcha():
+                print("🛡️ CAPTCHA detected!")
+                self.session_manager.record_failure(is_captcha=True)
+                self._park_challenged_browser(page_number, url)
+                self._fail_tab_page(tab, PageFailed(PageErrorKind.CAPTCHA))
+                return
+            
+            job_count, jobs = self._collect_jobs(page_number, self.driver.page_source, url)
+            if job_count:
+                self.session_manager.record_success()
+            else:
+                print("⚠️ No jobs found in JSON data")
+                self.session_manager.record_failure(empty=True)
+                self._fail_tab_page(tab, PageFailed(PageErrorKind.EMPTY_JSON, "no jobs in JSON data"))
+                return
+        
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            self.session_manager.record_failure()
+            self._fail_tab_page(tab, self._page_failure(e))
+            return
+        
+        self._finish_tab_page(tab, jobs, all_jobs)
+        
+        # Read in the background: the scroll routine runs in the page while
+        # the driver serves other tabs
+        if self.human_behavior and job_count:
+            plan = self.human_behavior.plan_job_browsing_fast(job_count) + self.human_behavior.plan_session_break()
+            ops, duration = self.human_behavior.compile_background(plan)
+            if ops:
+                self.human_behavior.start_batch(ops)
+            tab.ready_at = time.time() + duration
+    
+    def _finish_tab_page(self, tab: TabState, jobs: List[JobRecord], all_jobs: ResultBuffer):
+        """Deliver the tab's page and make the tab ready to navigate again."""
+        tab.jobs.extend(jobs)
+        self._deliver_page(tab.page_number, jobs, all_jobs)
+        tab.page_number = None
+        tab.phase = "navigate"
+        tab.ready_at = time.time()
+    
+    def _fail_tab_page(self, tab: TabState, failure: PageFailed):
+        """Retry a tab's failed page after its backoff on the next session, or dead-letter it."""
+        page_number = tab.page_number
+        tab.page_number = None
+        tab.phase = "navigate"
+        backoff = self._handle_failed_page(page_number, failure, tab.pending_pages, tab.page_attempts,
+                                           self._build_page_url(page_number, tab.base_url))
+        tab.ready_at = time.time() + backoff
+        self._session_failed = True
+        
+        # A parked or crashed browser takes the other tabs' loading pages with it
+        if failure.kind == PageErrorKind.CAPTCHA or not self.driver:
+            self._requeue_loading_tabs()
+    
+    def _requeue_loading_tabs(self):
+        """Pages loading in the parked browser's tabs are visited again on the next one."""
+        for tab in self.tabs:
+            if tab.phase == "read":
+                tab.pending_pages.appendleft(tab.page_number)
+                tab.page_number = None
+                tab.phase = "navigate"
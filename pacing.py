@@ -0,0 +1,105 @@
+"""
+Adaptive Pacing Controller
+==========================
+AIMD control of request rates from observed block signals:
+
+- every successful page adds a little to the proxy's and the global rate
+- a CAPTCHA halves the proxy's rate and cuts the global rate
+- an empty result page (soft block) trims the proxy's rate
+
+Per-proxy rates and CAPTCHA cooldowns are kept in the proxy's stats row, so
+they persist with the stats snapshots. Cooldowns are learned too: a proxy
+challenged again soon after its cooldown ended gets a longer one next time,
+while clean sessions slowly shrink it back.
+"""
+
+import math
+import threading
+import time
+from typing import Optional
+
+from rate_limiter import RateLimiter
+
+
+class AdaptivePacer:
+    """AIMD controller driving a RateLimiter's per-proxy and global buckets."""
+    
+    def __init__(self, rate_limiter: RateLimiter,
+                 min_rpm: float = 2.0, max_rpm: float = 30.0,
+                 min_global_rpm: float = 10.0, max_global_rpm: float = 600.0,
+                 increase_rpm: float = 0.5, captcha_factor: float = 0.5,
+                 global_captcha_factor: float = 0.75, empty_factor: float = 0.85,
+                 min_cooldown: float = 900.0, max_cooldown: float = 86400.0,
+                 cooldown_growth: float = 2.0, cooldown_decay: float = 0.9):
+        self.rate_limiter = rate_limiter
+        self.min_rpm = min_rpm
+        self.max_rpm = max_rpm
+        self.min_global_rpm = min_global_rpm
+        self.max_global_rpm = max_global_rpm
+        self.increase_rpm = increase_rpm
+        self.captcha_factor = captcha_factor
+        self.global_captcha_factor = global_captcha_factor
+        self.empty_factor = empty_factor
+        self.min_cooldown = min_cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown_growth = cooldown_growth
+        self.cooldown_decay = cooldown_decay
+        
+        self.global_rpm = rate_limiter.global_bucket.rate * 60
+        self.lock = threading.Lock()
+    
+    def _clamp(self, rpm: float) -> float:
+        return min(self.max_rpm, max(self.min_rpm, rpm))
+    
+    def proxy_rate(self, stats) -> float:
+        """The proxy's learned rate in requests/minute (limiter default if unset)."""
+        rpm = stats.request_rate
+        return self.rate_limiter.per_proxy_rpm if math.isnan(rpm) else rpm
+    
+    def apply(self, proxy_key: str, stats):
+        """Load a proxy's learned rate into the limiter (on session start)."""
+        self.rate_limiter.set_proxy_rate(proxy_key, self.proxy_rate(stats))
+    
+    def _set_proxy_rate(self, proxy_key: str, stats, rpm: float):
+        rpm = self._clamp(rpm)
+        stats.request_rate = rpm
+        self.rate_limiter.set_proxy_rate(proxy_key, rpm)
+    
+    def _set_global_rate(self, rpm: float):
+        self.global_rpm = min(self.max_global_rpm, max(self.min_global_rpm, rpm))
+        self.rate_limiter.set_global_rate(self.global_rpm)
+    
+    def on_success(self, proxy_key: str, stats):
+        """Additive increase after a page came back with results."""
+        with self.lock:
+            self._set_proxy_rate(proxy_key, stats, self.proxy_rate(stats) + self.increase_rpm)
+            self._set_global_rate(self.global_rpm + self.increase_rpm)
+    
+    def on_empty(self, proxy_key: str, stats):
+        """Mild multiplicative decrease after an empty result page."""
+        with self.lock:
+            self._set_proxy_rate(proxy_key, stats, self.proxy_rate(stats) * self.empty_factor)
+    
+    def on_captcha(self, proxy_key: str, stats, now: Optional[float] = None):
+        """
+        Multiplicative decrease after a challenge, and cooldown learning.
+        
+        Must run before the session applies the new cooldown, since it looks
+        at when the previous one ended.
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            self._set_proxy_rate(proxy_key, stats, self.proxy_rate(stats) * self.captcha_factor)
+            self._set_global_rate(self.global_rpm * self.global_captcha_factor)
+            
+            # Challenged again within one cooldown length of being released:
+            # the cooldown was too short
+            previous = stats.cooldown_until
+            cooldown = stats.cooldown_seconds
+            if previous and now - previous.timestamp() < cooldown:
+                stats.cooldown_seconds = min(self.max_cooldown, cooldown * self.cooldown_growth)
+    
+    def on_session_end(self, stats, successful: bool):
+        """Shrink the learned cooldown after a clean session."""
+        if successful:
+            stats.cooldown_seconds = max(self.min_cooldown, stats.cooldown_seconds * self.cooldown_decay)
@@ -0,0 +1,316 @@
+"""
+Raw Page Archive
+================
+Keeps every scraped page's job-cards provider data (not the whole DOM) so
+extraction can be fixed and re-run after Indeed changes its JSON, without
+re-scraping through proxies.
+
+Payloads are compressed (zstd when ``zstandard`` is installed, gzip
+otherwise) and stored once per content hash in append-only segment files;
+a SQLite index maps search/page/fetch time to the stored blob.
+
+    archive = PageArchive("page_archive")
+    archive.store(url, page_number, payload)
+    
+    python page_archive.py stats --archive page_archive
+    python page_archive.py reparse --archive page_archive --out reparsed.jsonl --workers 4
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from extraction import extract_jobs_from_html
+from job_record import JobRecord, write_jsonl
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+DEFAULT_CODEC = "zstd" if zstandard else "gzip"
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    raw_size INTEGER NOT NULL,
+    codec TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    query TEXT NOT NULL,
+    page_number INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    digest TEXT NOT NULL REFERENCES blobs (digest)
+);
+CREATE INDEX IF NOT EXISTS idx_pages_query ON pages (query, page_number, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_pages_fetched ON pages (fetched_at);
+"""
+
+# URL parameters that select a page of a search rather than the search itself
+PAGING_PARAMS = {"start", "vjk", "advn"}
+
+
+@dataclass
+class ArchivedPage:
+    """One archived fetch of a results page."""
+    id: int
+    query: str
+    page_number: int
+    url: str
+    fetched_at: float
+    digest: str
+
+
+def search_key(url: str) -> str:
+    """The search a results URL belongs to: its query string minus paging parameters."""
+    params = [(k, v) for k, v in parse_qsl(urlparse(url).query) if k not in PAGING_PARAMS]
+    return urlencode(sorted(params))
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("archive blob is zstd-compressed; pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    """Content-addressed, compressed store of page payloads with a SQLite index."""
+    
+    def __init__(self, root: str = "page_archive", codec: str = DEFAULT_CODEC,
+                 segment_max_bytes: int = SEGMENT_MAX_BYTES):
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("zstd codec needs the zstandard package")
+        self.root = root
+        self.codec = codec
+        self.segment_max_bytes = segment_max_bytes
+        os.makedirs(root, exist_ok=True)
+        self.db_path = os.path.join(root, "index.db")
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction; it also serializes segment appends between processes."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.root, f"segment-{segment:06d}.bin")
+    
+    def store(self, url: str, page_number: int, payload: str,
+              fetched_at: Optional[float] = None) -> str:
+        """Archive one page's payload; identical payloads are stored once. Returns its digest."""
+        data = payload.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        
+        with self._transaction() as conn:
+            known = conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            if not known:
+                self._append_blob(conn, digest, data)
+            conn.execute(
+                "INSERT INTO pages (query, page_number, url, fetched_at, digest) VALUES (?, ?, ?, ?, ?)",
+                (search_key(url), page_number, url, fetched_at or time.time(), digest)
+            )
+        return digest
+    
+    def _append_blob(self, conn: sqlite3.Connection, digest: str, data: bytes):
+        row = conn.execute("SELECT MAX(segment) FROM blobs").fetchone()
+        segment = row[0] or 1
+        path = self._segment_path(segment)
+        if os.path.exists(path) and os.path.getsize(path) >= self.segment_max_bytes:
+            segment += 1
+            path = self._segment_path(segment)
+        
+        blob = compress(data, self.codec)
+        with open(path, "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(blob)
+        conn.execute(
+            "INSERT INTO blobs (digest, segment, offset, length, raw_size, codec) VALUES (?, ?, ?, ?, ?, ?)",
+            (digest, segment, offset, len(blob), len(data), self.codec)
+        )
+    
+    def load(self, digest: str) -> str:
+        """The payload stored under ``digest``."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT segment, offset, length, codec FROM blobs WHERE digest = ?", (digest,)
+            ).fetchone()
+        if not row:
+            raise KeyError(digest)
+        return _read_blob(self.root, *row)
+    
+    def pages(self, query: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, latest: bool = False) -> List[ArchivedPage]:
+        """
+        Archived fetches, oldest first.
+        
+        ``query`` matches part of the search key (e.g. "q=python"); with
+        ``latest`` only the newest fetch of each search page is returned.
+        """
+        clauses, args = [], []
+        if query:
+            clauses.append("query LIKE ?")
+            args.append(f"%{query}%")
+        if since is not None:
+            clauses.append("fetched_at >= ?")
+            args.append(since)
+        if until is not None:
+            clauses.append("fetched_at < ?")
+            args.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        sql = f"SELECT id, query, page_number, url, fetched_at, digest FROM pages {where} ORDER BY fetched_at, id"
+        if latest:
+            sql = (
+                f"SELECT id, query, page_number, url, fetched_at, digest FROM ("
+                f"SELECT *, ROW_NUMBER() OVER (PARTITION BY query, page_number ORDER BY fetched_at DESC, id DESC) AS n "
+                f"FROM pages {where}) WHERE n = 1 ORDER BY fetched_at, id"
+            )
+        with closing(self._connect()) as conn:
+            return [ArchivedPage(*row) for row in conn.execute(sql, args)]
+    
+    def stats(self) -> Dict:
+        """Page and blob counts, raw vs stored bytes."""
+        with closing(self._connect()) as conn:
+            pages, searches = conn.execute("SELECT COUNT(*), COUNT(DISTINCT query) FROM pages").fetchone()
+            blobs, raw, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(length), 0) FROM blobs"
+            ).fetchone()
+        return {
+            "pages": pages,
+            "searches": searches,
+            "unique_payloads": blobs,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "compression_ratio": round(raw / stored, 1) if stored else 0.0,
+        }
+    
+    def locations(self, digests: List[str]) -> Dict[str, Tuple[int, int, int, str]]:
+        """(segment, offset, length, codec) of each digest."""
+        found = {}
+        with closing(self._connect()) as conn:
+            for digest in digests:
+                row = conn.execute(
+                    "SELECT segment, offset, length, codec FROM blobs WHERE digest = ?", (digest,)
+                ).fetchone()
+                if row:
+                    found[digest] = row
+        return found
+
+
+def _read_blob(root: str, segment: int, offset: int, length: int, codec: str) -> str:
+    with open(os.path.join(root, f"segment-{segment:06d}.bin"), "rb") as f:
+        f.seek(offset)
+        return decompress(f.read(length), codec).decode("utf-8")
+
+
+def _reparse_blobs(root: str, blobs: List[Tuple[str, int, int, int, str]]) -> Dict[str, List[JobRecord]]:
+    """Worker entry point: extract the jobs of a batch of stored payloads."""
+    return {digest: extract_jobs_from_html(_read_blob(root, *location)) for digest, *location in blobs}
+
+
+def reparse(archive: PageArchive, pages: List[ArchivedPage], workers: int = 2,
+            batch_size: int = 50) -> List[JobRecord]:
+    """
+    Re-run extraction over archived pages in worker processes.
+    
+    Each distinct payload is parsed once; jobs come back in page order,
+    tagged like freshly scraped ones.
+    """
+    locations = archive.locations(sorted({page.digest for page in pages}))
+    # Batches follow segment order so each worker reads its files sequentially
+    blobs = sorted(((digest,) + tuple(location) for digest, location in locations.items()),
+                   key=lambda blob: (blob[1], blob[2]))
+    batches = [blobs[i:i + batch_size] for i in range(0, len(blobs), batch_size)]
+    
+    parsed: Dict[str, List[JobRecord]] = {}
+    if workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            for result in executor.map(_reparse_blobs, [archive.root] * len(batches), batches):
+                parsed.update(result)
+    else:
+        for batch in batches:
+            parsed.update(_reparse_blobs(archive.root, batch))
+    
+    return [
+        replace(job, scraped_from_page=page.page_number)
+        for page in pages
+        for job in parsed.get(page.digest, [])
+    ]
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw page archive")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    stats = subparsers.add_parser("stats", help="Show archive size and deduplication")
+    stats.add_argument("--archive", default="page_archive")
+    
+    redo = subparsers.add_parser("reparse", help="Re-run extraction over archived pages")
+    redo.add_argument("--archive", default="page_archive")
+    redo.add_argument("--out", required=True)
+    redo.add_argument("--query", help="Only searches whose query string contains this")
+    redo.add_argument("--since", help="Only pages fetched at or after this ISO date/time")
+    redo.add_argument("--until", help="Only pages fetched before this ISO date/time")
+    redo.add_argument("--all-fetches", action="store_true", help="Include older fetches of the same page")
+    redo.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    
+    args = parser.parse_args()
+    archive = PageArchive(args.archive)
+    
+    if args.command == "stats":
+        print(json.dumps(archive.stats(), indent=2))
+    elif args.command == "reparse":
+        pages = archive.pages(args.query, _parse_time(args.since), _parse_time(args.until),
+                              latest=not args.all_fetches)
+        start = time.time()
+        jobs = reparse(archive, pages, workers=args.workers)
+        write_jsonl(jobs, args.out)
+        print(f"✅ Reparsed {len(pages)} pages into {len(jobs)} jobs in {time.time() - start:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Page Failure Taxonomy
+=====================
+Classifies why a results page could not be scraped, so the scraper can
+retry it on a fresh session instead of counting it as scraped with zero
+jobs, and dead-letter it once its retries are used up.
+
+    try:
+        jobs = scraper._scrape_page(page)
+    except PageFailed as failure:
+        failure.kind  # PageErrorKind.NAVIGATION_TIMEOUT, ...
+"""
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+
+from selenium.common.exceptions import TimeoutException
+
+
+class PageErrorKind(Enum):
+    NAVIGATION_TIMEOUT = "navigation_timeout"
+    PROXY_AUTH = "proxy_auth"
+    RENDERER_CRASH = "renderer_crash"
+    EMPTY_JSON = "empty_json"
+    CAPTCHA = "captcha"
+    OTHER = "other"
+
+
+# Attempts per page before it is dead-lettered, where a kind differs from the
+# scraper's max_page_attempts. Empty pages may simply be past the last result;
+# a challenge says nothing about the page, only about the proxy that hit it.
+MAX_ATTEMPTS = {
+    PageErrorKind.EMPTY_JSON: 2,
+    PageErrorKind.CAPTCHA: 5,
+}
+
+# Kinds retried without a backoff: the challenged browser is already parked
+# and its proxy cooling down, so the page goes straight to another proxy
+NO_BACKOFF = {PageErrorKind.CAPTCHA}
+
+# Substrings of driver/browser error messages, checked in this order
+ERROR_SIGNATURES = [
+    (PageErrorKind.PROXY_AUTH, [
+        "err_proxy_connection_failed", "err_tunnel_connection_failed", "err_proxy_auth",
+        "err_no_supported_proxies", "err_proxy_certificate", "proxy authentication",
+    ]),
+    (PageErrorKind.RENDERER_CRASH, [
+        "tab crashed", "page crash", "target crashed", "invalid session id", "no such window",
+        "chrome not reachable", "disconnected", "connection refused", "max retries exceeded",
+    ]),
+    (PageErrorKind.NAVIGATION_TIMEOUT, [
+        "timed out", "timeout", "err_timed_out", "err_connection_timed_out",
+    ]),
+]
+
+
+class PageFailed(Exception):
+    """A page could not be scraped; ``kind`` says why."""
+    
+    def __init__(self, kind: PageErrorKind, message: str = ""):
+        super().__init__(f"{kind.value}: {message}" if message else kind.value)
+        self.kind = kind
+        self.message = message
+
+
+@dataclass
+class DeadLetter:
+    """A page that used up its retries."""
+    page_number: int
+    url: str
+    kind: PageErrorKind
+    attempts: int
+    error: str = ""
+    failed_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    
+    def to_dict(self) -> dict:
+        return {
+            "page_number": self.page_number,
+            "url": self.url,
+            "kind": self.kind.value,
+            "attempts": self.attempts,
+            "error": self.error,
+            "failed_at": self.failed_at,
+        }
+
+
+def classify_error(error: Exception) -> PageErrorKind:
+    """Map an exception raised while scraping a page to its failure kind."""
+    if isinstance(error, PageFailed):
+        return error.kind
+    if isinstance(error, TimeoutException):
+        return PageErrorKind.NAVIGATION_TIMEOUT
+    
+    message = f"{type(error).__name__} {error}".lower()
+    for kind, signatures in ERROR_SIGNATURES:
+        if any(signature in message for signature in signatures):
+            return kind
+    return PageErrorKind.OTHER
+
+
+def backoff_delay(attempt: int, base: float = 2.0, cap: float = 60.0) -> float:
+    """Capped exponential backoff with jitter before retry number ``attempt``."""
+    if base <= 0:
+        return 0.0
+    return min(cap, base * 2 ** (attempt - 1) * random.uniform(0.75, 1.25))
@@ -0,0 +1,89 @@
+"""
+In-Page Prefetch of the Next Results Page
+=========================================
+While the simulated user "reads" page N, the browser fetches page N+1 with
+an in-page ``fetch()`` (same cookies, same proxy, same TLS fingerprint) and
+cuts the job-cards provider data out of the response. The visible
+navigation to page N+1 still happens afterwards for realism, but its jobs
+are already in hand, so the scraper does not wait on job elements or pull
+the rendered page source back over WebDriver.
+
+Both scripts return immediately or poll inside the page, so a prefetch
+costs two WebDriver commands and overlaps entirely with the dwell time.
+"""
+
+from typing import Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from extraction import PROVIDER_DATA_MARKER
+
+
+# Starts the fetch and leaves its result on window.__indeedPrefetch
+START_SCRIPT = """
+var url = arguments[0], marker = arguments[1];
+var state = window.__indeedPrefetch = {url: url, done: false, status: 0, payload: null};
+fetch(url, {credentials: 'include', headers: {'Accept': 'text/html'}})
+    .then(function (response) { state.status = response.status; return response.text(); })
+    .then(function (text) {
+        var start = text.indexOf(marker);
+        if (start >= 0) {
+            var end = text.indexOf('</script>', start);
+            state.payload = end > 0 ? text.slice(start, end) : text.slice(start);
+        }
+        state.done = true;
+    })
+    .catch(function () { state.done = true; });
+"""
+
+# Waits (in the page) up to arguments[1] ms for the fetch, then hands back the payload
+COLLECT_SCRIPT = """
+var url = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+var started = Date.now();
+(function poll() {
+    var state = window.__indeedPrefetch;
+    if (!state || state.url !== url) { done(null); return; }
+    if (state.done) {
+        window.__indeedPrefetch = null;
+        done(state.status === 200 ? state.payload : null);
+        return;
+    }
+    if (Date.now() - started > timeout) { done(null); return; }
+    setTimeout(poll, 100);
+})();
+"""
+
+
+class PagePrefetcher:
+    """Fetches one results page in the background of the current tab."""
+    
+    def __init__(self, driver, collect_timeout: float = 5.0):
+        self.driver = driver
+        self.collect_timeout = collect_timeout
+        self.url: Optional[str] = None
+    
+    def start(self, url: str) -> bool:
+        """Kick off the fetch; returns False if the page would not run it."""
+        try:
+            self.driver.execute_script(START_SCRIPT, url, PROVIDER_DATA_MARKER)
+            self.url = url
+            return True
+        except WebDriverException:
+            self.url = None
+            return False
+    
+    def collect(self) -> Optional[str]:
+        """
+        The fetched page's provider-data payload, or None.
+        
+        None covers a failed or slow fetch, a non-200 response and a page
+        without job data (e.g. a challenge), so the caller falls back to
+        reading the page it navigates to.
+        """
+        if not self.url:
+            return None
+        url, self.url = self.url, None
+        try:
+            return self.driver.execute_async_script(COLLECT_SCRIPT, url, int(self.collect_timeout * 1000))
+        except WebDriverException:
+            return None
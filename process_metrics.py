@@ -0,0 +1,98 @@
+"""
+Process Tree Metrics
+====================
+Resident memory and CPU time of a browser's whole process tree, read from
+/proc (Linux) so no extra dependency is needed. A Chrome instance is a
+browser process plus renderer, GPU and utility children, so the tree - not
+the single pid - is what a scraping node actually pays for.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional
+
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _read_stat(pid: int) -> Optional[List[str]]:
+    """Fields of /proc/<pid>/stat after the command name, or None if gone."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # The command name may contain spaces; everything after its ')' is fixed
+    return stat[stat.rfind(")") + 2:].split()
+
+
+def _children_map() -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        fields = _read_stat(int(entry))
+        if fields:
+            children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+
+def is_running(pid: int) -> bool:
+    """Running: not exited and not a zombie waiting to be reaped."""
+    fields = _read_stat(pid)
+    return bool(fields) and fields[0] != "Z"
+
+
+def process_tree(pids: Iterable[int]) -> List[int]:
+    """The given pids plus all their live descendants."""
+    children = _children_map()
+    seen: List[int] = []
+    stack = [pid for pid in pids if pid]
+    while stack:
+        pid = stack.pop()
+        if pid in seen or _read_stat(pid) is None:
+            continue
+        seen.append(pid)
+        stack.extend(children.get(pid, []))
+    return seen
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident set size of one process (0 if it has exited)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def cpu_seconds(pid: int) -> float:
+    """User plus system CPU time of one process."""
+    fields = _read_stat(pid)
+    if not fields:
+        return 0.0
+    # utime and stime are fields 14 and 15 of stat (11 and 12 after the name)
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def tree_rss_mb(pids: Iterable[int]) -> float:
+    """Total resident memory of the process trees, in MB."""
+    return sum(rss_bytes(pid) for pid in process_tree(pids)) / (1024 * 1024)
+
+
+def tree_cpu_seconds(pids: Iterable[int]) -> float:
+    """Total CPU time of the process trees."""
+    return sum(cpu_seconds(pid) for pid in process_tree(pids))
+
+
+def driver_pids(driver) -> List[int]:
+    """Root pids of a Selenium/undetected-chromedriver driver (browser and chromedriver)."""
+    pids = []
+    browser_pid = getattr(driver, "browser_pid", None)
+    if browser_pid:
+        pids.append(browser_pid)
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    if process is not None and getattr(process, "pid", None):
+        pids.append(process.pid)
+    return pids
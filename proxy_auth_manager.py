@@ -6,47 +6,168 @@ Handles proxy authentication automatically without popups using Chrome extension
 
 import os
 import json
+import time
 import zipfile
 import tempfile
 import random
+import shutil
+import hashlib
+import weakref
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+from urllib.parse import urlencode
 import undetected_chromedriver as uc
 
+from chrome_driver_manager import apply_background_tab_profile, apply_headless_profile
+
+
+# Sentinel URL intercepted by the extension; ".invalid" never resolves, so the
+# request cannot leak past the browser even if the extension is missing
+SWITCH_URL = "http://proxy-auth.invalid/"
+
+# Extension page switch_proxy() drives with execute_script; it has the
+# extension's privileges, so the new proxy is handed over in-process
+SWITCH_PAGE = "switch.html"
+SWITCH_PAGE_HTML = "<!DOCTYPE html><html><head><title>proxy switch</title></head><body></body></html>\n"
+
+# Cached extensions unused this long (by any process) are swept at startup
+EXTENSION_MAX_AGE = 7 * 24 * 3600
+
+BACKGROUND_JS_TEMPLATE = """
+var TOKEN = {token};
+var state = {state};
+var applied = null;
+
+function applyProxy(next) {{
+    var config = {{
+        mode: "fixed_servers",
+        rules: {{
+            singleProxy: {{
+                scheme: "http",
+                host: next.host,
+                port: parseInt(next.port)
+            }},
+            bypassList: ["localhost"]
+        }}
+    }};
+    chrome.proxy.settings.set({{value: config, scope: "regular"}}, function() {{
+        applied = next.host + ":" + next.port;
+    }});
+}}
+
+// Restore the last switched proxy if the background page was reloaded
+chrome.storage.local.get("proxyState", function(items) {{
+    if (items && items.proxyState) {{
+        state = items.proxyState;
+    }}
+    applyProxy(state);
+}});
+
+// Runtime switching: switch_proxy() calls this from the extension's switch
+// page (chrome.extension.getBackgroundPage()), so credentials never travel
+// in a URL; the state is kept in chrome.storage for reloads
+function switchProxy(next) {{
+    state = next;
+    applied = null;
+    chrome.storage.local.set({{proxyState: state}});
+    applyProxy(state);
+}}
+
+function callbackFn(details) {{
+    if (!state.username) {{
+        return {{}};
+    }}
+    return {{
+        authCredentials: {{
+            username: state.username,
+            password: state.password
+        }}
+    }};
+}}
+
+chrome.webRequest.onAuthRequired.addListener(
+    callbackFn,
+    {{urls: ["<all_urls>"]}},
+    ['blocking']
+);
+
+// The sentinel URL tells switch_proxy() the extension's id (needed to open
+// its switch page); it is answered here before any network access happens
+function switchFn(details) {{
+    var params = new URL(details.url).searchParams;
+    if (params.get("token") !== TOKEN) {{
+        return {{cancel: true}};
+    }}
+    var title = "extension:" + chrome.runtime.id;
+    return {{redirectUrl: "data:text/html," + encodeURIComponent("<title>" + title + "</title>")}};
+}}
+
+chrome.webRequest.onBeforeRequest.addListener(
+    switchFn,
+    {{urls: [{switch_pattern}]}},
+    ['blocking']
+);
+"""
+
 
 class ProxyAuthManager:
     """Manages proxy authentication automatically for Chrome."""
     
-    def __init__(self, proxy_file: str = "proxies.txt"):
+    def __init__(self, proxy_file: str = "proxies.txt", extension_cache_dir: Optional[str] = None):
         self.proxy_file = proxy_file
         self.proxies = []
         self.current_proxy_index = 0
-        self.extension_dir = None
+        self._file_signature = None
+        self.extension_cache_dir = extension_cache_dir or os.path.join(tempfile.gettempdir(), "proxy_auth_extensions")
+        # Switching tokens of drivers launched with our extension, and the
+        # extension ids already looked up through them
+        self._driver_tokens = weakref.WeakKeyDictionary()
+        self._driver_extension_ids = weakref.WeakKeyDictionary()
+        # Extension directories this process has handed to Chrome
+        self._extensions_in_use = set()
         self.load_proxies()
+        self.sweep_extension_cache()
+    
+    def _read_proxy_file(self) -> List[Dict]:
+        """Parse every proxy line in the proxy file."""
+        self._file_signature = self._get_file_signature()
+        proxies = []
+        
+        with open(self.proxy_file, 'r') as f:
+            lines = f.readlines()
+        
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            
+            proxy_info = self.parse_proxy_line(line)
+            if proxy_info:
+                proxies.append(proxy_info)
+        
+        return proxies
+    
+    def _get_file_signature(self) -> Optional[Tuple[int, int]]:
+        """Modification time and size of the proxy file (None if missing)."""
+        try:
+            stat = os.stat(self.proxy_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
     
     def load_proxies(self) -> List[Dict]:
         """Load and parse proxies from file."""
         self.proxies = []
         
         try:
-            with open(self.proxy_file, 'r') as f:
-                lines = f.readlines()
-            
-            for line in lines:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                proxy_info = self.parse_proxy_line(line)
-                if proxy_info:
-                    self.proxies.append(proxy_info)
+            self.proxies = self._read_proxy_file()
             
             print(f"✅ Loaded {len(self.proxies)} proxies from {self.proxy_file}")
             
             # Show proxy types
             auth_count = sum(1 for p in self.proxies if p['requires_auth'])
             print(f"   📊 With authentication: {auth_count}/{len(self.proxies)}")
-            
+        
         except FileNotFoundError:
             print(f"❌ Proxy file not found: {self.proxy_file}")
         except Exception as e:
@@ -54,6 +175,42 @@ class ProxyAuthManager:
         
         return self.proxies
     
+    def proxy_file_changed(self) -> bool:
+        """Cheap mtime/size poll of the proxy file."""
+        return self._get_file_signature() != self._file_signature
+    
+    def reload_proxies(self) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Re-read the proxy file and diff-apply it to ``self.proxies`` in place.
+        
+        Proxies are matched on server and credentials; unchanged entries keep
+        their dict identity so references held by live sessions stay valid.
+        Returns ``(added, removed)``.
+        """
+        try:
+            loaded = self._read_proxy_file()
+        except Exception as e:
+            print(f"❌ Error reloading proxies: {e}")
+            return [], []
+        
+        def identity(proxy: Dict) -> Tuple:
+            return proxy['server'], proxy['username'], proxy['password']
+        
+        current = {identity(p): p for p in self.proxies}
+        wanted = {identity(p): p for p in loaded}
+        
+        added = [p for key, p in wanted.items() if key not in current]
+        removed = [p for key, p in current.items() if key not in wanted]
+        
+        # Keep file order while reusing existing dicts
+        self.proxies[:] = [current.get(key, p) for key, p in wanted.items()]
+        self.current_proxy_index = self.current_proxy_index % len(self.proxies) if self.proxies else 0
+        
+        if added or removed:
+            print(f"🔁 Reloaded {self.proxy_file}: +{len(added)} / -{len(removed)} proxies")
+        
+        return added, removed
+    
     def parse_proxy_line(self, line: str) -> Optional[Dict]:
         """Parse a single proxy line into structured data."""
         parts = line.split(':')
@@ -103,18 +260,13 @@ class ProxyAuthManager:
         
         return random.choice(self.proxies)
     
-    def create_auth_extension(self, proxy: Dict) -> str:
-        """Create Chrome extension for proxy authentication."""
-        if not proxy['requires_auth']:
-            return None
-        
-        # Create temporary directory for extension
-        if self.extension_dir:
-            self._cleanup_extension()
-        
-        self.extension_dir = tempfile.mkdtemp(prefix="proxy_auth_")
-        
-        # Create manifest.json
+    def _extension_token(self, proxy: Dict) -> str:
+        """Derive the runtime-switching token for a proxy's extension."""
+        material = f"switch-token:{proxy['host']}:{proxy['port']}:{proxy['username']}:{proxy['password']}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+    
+    def _render_extension(self, proxy: Dict) -> Tuple[str, str]:
+        """Render manifest.json and background.js contents for a proxy."""
         manifest = {
             "manifest_version": 2,
             "name": "Proxy Auth",
@@ -135,63 +287,117 @@ class ProxyAuthManager:
             "content_security_policy": "script-src 'self' 'unsafe-eval'; object-src 'self'"
         }
         
-        # Create background.js for automatic authentication
-        background_js = f"""
-var config = {{
-    mode: "fixed_servers",
-    rules: {{
-        singleProxy: {{
-            scheme: "http",
-            host: "{proxy['host']}",
-            port: parseInt("{proxy['port']}")
-        }},
-        bypassList: ["localhost"]
-    }}
-}};
-
-chrome.proxy.settings.set({{value: config, scope: "regular"}}, function() {{}});
-
-function callbackFn(details) {{
-    return {{
-        authCredentials: {{
-            username: "{proxy['username']}",
-            password: "{proxy['password']}"
-        }}
-    }};
-}}
-
-chrome.webRequest.onAuthRequired.addListener(
-    callbackFn,
-    {{urls: ["<all_urls>"]}},
-    ['blocking']
-);
-"""
+        # Create background.js for automatic authentication. The proxy state lives in
+        # chrome.storage so switch_proxy() can replace it in a running browser.
+        initial_state = {
+            "host": proxy['host'],
+            "port": proxy['port'],
+            "username": proxy['username'],
+            "password": proxy['password']
+        }
+        background_js = BACKGROUND_JS_TEMPLATE.format(
+            token=json.dumps(self._extension_token(proxy)),
+            switch_pattern=json.dumps(SWITCH_URL + "*"),
+            state=json.dumps(initial_state)
+        )
         
-        # Write files
-        manifest_path = os.path.join(self.extension_dir, "manifest.json")
-        background_path = os.path.join(self.extension_dir, "background.js")
+        return json.dumps(manifest, indent=2), background_js
+    
+    def get_extension_path(self, proxy: Dict) -> str:
+        """Cache directory of a proxy's extension, keyed by a hash of its contents."""
+        manifest_json, background_js = self._render_extension(proxy)
+        digest = hashlib.sha256((manifest_json + background_js + SWITCH_PAGE_HTML).encode('utf-8')).hexdigest()[:24]
+        return os.path.join(self.extension_cache_dir, f"proxy_auth_{digest}")
+    
+    def create_auth_extension(self, proxy: Dict) -> str:
+        """
+        Get (creating once) the Chrome extension for proxy authentication.
+        
+        Extensions are content-addressed in the cache directory, so the same
+        proxy maps to the same read-only directory across sessions, processes
+        and parallel drivers. New extensions are written to a private temp
+        directory and renamed into place atomically. Each use refreshes the
+        directory's mtime, which keeps it from being swept.
+        """
+        extension_path = self.get_extension_path(proxy)
+        self._extensions_in_use.add(extension_path)
+        try:
+            os.utime(extension_path)
+        except OSError:
+            pass
+        if os.path.exists(os.path.join(extension_path, "background.js")):
+            return extension_path
         
-        with open(manifest_path, 'w') as f:
-            json.dump(manifest, f, indent=2)
+        os.makedirs(self.extension_cache_dir, exist_ok=True)
+        manifest_json, background_js = self._render_extension(proxy)
         
-        with open(background_path, 'w') as f:
+        # Write files
+        staging_dir = tempfile.mkdtemp(prefix=".staging_", dir=self.extension_cache_dir)
+        with open(os.path.join(staging_dir, "manifest.json"), 'w') as f:
+            f.write(manifest_json)
+        
+        with open(os.path.join(staging_dir, "background.js"), 'w') as f:
             f.write(background_js)
         
-        print(f"🔧 Created auth extension for {proxy['host']}:{proxy['port']}")
-        return self.extension_dir
+        with open(os.path.join(staging_dir, SWITCH_PAGE), 'w') as f:
+            f.write(SWITCH_PAGE_HTML)
+        
+        try:
+            os.rename(staging_dir, extension_path)
+            print(f"🔧 Created auth extension for {proxy['host']}:{proxy['port']}")
+        except OSError:
+            # Another process or driver won the race; its copy is identical
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        
+        return extension_path
     
-    def _cleanup_extension(self):
-        """Clean up temporary extension directory."""
-        if self.extension_dir and os.path.exists(self.extension_dir):
+    def sweep_extension_cache(self, max_age: float = EXTENSION_MAX_AGE) -> int:
+        """
+        Delete cached extensions no process has used for ``max_age`` seconds.
+        
+        Directories are shared by running browsers (here and in other
+        processes), so a proxy leaving the pool never deletes its extension;
+        only this age-based sweep does, skipping anything this process has
+        used. Returns the number of directories removed.
+        """
+        try:
+            names = os.listdir(self.extension_cache_dir)
+        except OSError:
+            return 0
+        
+        cutoff = time.time() - max_age
+        removed = 0
+        for name in names:
+            path = os.path.join(self.extension_cache_dir, name)
+            if path in self._extensions_in_use or not os.path.isdir(path):
+                continue
             try:
-                import shutil
-                shutil.rmtree(self.extension_dir)
-            except:
-                pass
-        self.extension_dir = None
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                # Move it off its content-addressed name first: a process that
+                # needs it again rebuilds it instead of finding it half deleted
+                doomed = tempfile.mkdtemp(prefix=".sweep_", dir=self.extension_cache_dir)
+                os.rename(path, os.path.join(doomed, name))
+                shutil.rmtree(doomed, ignore_errors=True)
+                removed += 1
+            except OSError:
+                continue
+        
+        if removed:
+            print(f"🧹 Swept {removed} unused proxy extension(s)")
+        return removed
     
-    def setup_chrome_options(self, proxy: Dict) -> uc.ChromeOptions:
-        """Setup Chrome options with proxy authentication."""
+    def remove_proxy(self, proxy: Dict):
+        """Remove a proxy from rotation (its cached extension stays for running browsers)."""
+        self.proxies[:] = [p for p in self.proxies if p['server'] != proxy['server']]
+        if self.proxies:
+            self.current_proxy_index %= len(self.proxies)
+        else:
+            self.current_proxy_index = 0
+    
+    def setup_chrome_options(self, proxy: Dict, headless: bool = False,
+                             background_tabs: bool = False) -> uc.ChromeOptions:
+        """Setup Chrome options with proxy authentication (and the headless/background-tab profiles)."""
         options = uc.ChromeOptions()
         
         # Basic stealth options
@@ -202,21 +408,27 @@ chrome.webRequest.onAuthRequired.addListener(
         options.add_argument('--disable-features=IsolateOrigins,site-per-process')
         options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
         
+        # Always route through the extension (even without credentials) so the
+        # proxy can later be switched at runtime instead of relaunching Chrome
+        extension_path = self.create_auth_extension(proxy)
+        options.add_argument(f'--load-extension={extension_path}')
+        options.add_argument('--disable-extensions-except={}'.format(extension_path))
+        
+        # New headless mode keeps extensions, so proxy auth/switching still works
+        if headless:
+            apply_headless_profile(options)
+        if background_tabs:
+            apply_background_tab_profile(options)
+        
         if proxy['requires_auth']:
-            # Use extension for authenticated proxies
-            extension_path = self.create_auth_extension(proxy)
-            if extension_path:
-                options.add_argument(f'--load-extension={extension_path}')
-                options.add_argument('--disable-extensions-except={}'.format(extension_path))
-                print(f"📡 Using authenticated proxy: {proxy['username']}@{proxy['server']}")
+            print(f"📡 Using authenticated proxy: {proxy['username']}@{proxy['server']}")
         else:
-            # Use standard proxy argument for non-authenticated proxies
-            options.add_argument(f'--proxy-server=http://{proxy["server"]}')
             print(f"📡 Using proxy: {proxy['server']}")
         
         return options
     
-    def create_driver_with_proxy(self, proxy: Optional[Dict] = None) -> uc.Chrome:
+    def create_driver_with_proxy(self, proxy: Optional[Dict] = None, headless: bool = False,
+                                 background_tabs: bool = False) -> uc.Chrome:
         """Create Chrome driver with automatic proxy authentication."""
         if proxy is None:
             proxy = self.get_next_proxy()
@@ -225,50 +437,105 @@ chrome.webRequest.onAuthRequired.addListener(
             print("⚠️ No proxy available, creating driver without proxy")
             options = uc.ChromeOptions()
             options.add_argument('--disable-blink-features=AutomationControlled')
-            return uc.Chrome(options=options)
+            if headless:
+                apply_headless_profile(options)
+            if background_tabs:
+                apply_background_tab_profile(options)
+            return uc.Chrome(options=options, headless=headless)
         
         print(f"🚀 Setting up driver with proxy: {proxy['server']}")
         
         try:
             # Setup Chrome options with proxy
-            options = self.setup_chrome_options(proxy)
+            options = self.setup_chrome_options(proxy, headless=headless, background_tabs=background_tabs)
             
             # Create driver
-            driver = uc.Chrome(options=options, version_main=None)
+            driver = uc.Chrome(options=options, version_main=None, headless=headless)
             driver.set_window_size(1920, 1080)
+            self._driver_tokens[driver] = self._extension_token(proxy)
             
-            # Test proxy connection
-            self._test_proxy_connection(driver, proxy)
-            
+            # Proxy reachability is checked out of band by ProxyHealthChecker
             return driver
-            
+        
         except Exception as e:
             print(f"❌ Failed to create driver with proxy {proxy['server']}: {e}")
-            self._cleanup_extension()
             raise
     
-    def _test_proxy_connection(self, driver: uc.Chrome, proxy: Dict):
-        """Test if proxy connection is working."""
+    def switch_proxy(self, driver: uc.Chrome, proxy: Dict, timeout: float = 5.0) -> bool:
+        """
+        Switch a running browser to another proxy without relaunching it.
+        
+        Browser cookies, cache and site storage are cleared first so the new
+        proxy starts from a clean identity. The proxy is handed to the
+        extension by execute_script on its switch page, never in a URL.
+        Returns False when the driver was not created with the switching
+        extension or the switch was not confirmed in time; callers should
+        then fall back to a fresh driver.
+        """
+        token = self._driver_tokens.get(driver)
+        if not token:
+            return False
+        
         try:
-            print("🔍 Testing proxy connection...")
-            
-            # Navigate to IP check service
-            driver.get("https://httpbin.org/ip")
+            self._clear_browser_state(driver)
             
-            # Wait a moment for page to load
-            import time
-            time.sleep(3)
+            extension_id = self._extension_id(driver, token)
+            if not extension_id:
+                print(f"⚠️ Proxy switch to {proxy['server']} failed: extension not answering")
+                return False
+            driver.get(f"chrome-extension://{extension_id}/{SWITCH_PAGE}")
+            driver.execute_script(
+                "chrome.extension.getBackgroundPage().switchProxy(arguments[0]);",
+                {
+                    'host': proxy['host'],
+                    'port': proxy['port'],
+                    'username': proxy['username'],
+                    'password': proxy['password']
+                }
+            )
             
-            # Get page content
-            page_source = driver.page_source.lower()
+            # chrome.proxy.settings.set() is asynchronous; poll until applied
+            expected = f"{proxy['host']}:{proxy['port']}"
+            deadline = time.time() + timeout
+            while True:
+                if driver.execute_script("return chrome.extension.getBackgroundPage().applied;") == expected:
+                    print(f"🔀 Switched live browser to proxy {proxy['server']}")
+                    return True
+                if time.time() >= deadline:
+                    break
+                time.sleep(0.05)
             
-            if "origin" in page_source:
-                print("✅ Proxy connection successful")
-            else:
-                print("⚠️ Proxy connection test inconclusive")
-                
+            print(f"⚠️ Proxy switch to {proxy['server']} not confirmed")
         except Exception as e:
-            print(f"⚠️ Proxy test failed: {e}")
+            print(f"⚠️ Proxy switch failed: {e}")
+        
+        return False
+    
+    def _extension_id(self, driver: uc.Chrome, token: str) -> Optional[str]:
+        """Id of the driver's proxy extension, asked once through the sentinel URL."""
+        extension_id = self._driver_extension_ids.get(driver)
+        if not extension_id:
+            driver.get(f"{SWITCH_URL}id?{urlencode({'token': token})}")
+            title = driver.title or ""
+            if not title.startswith("extension:"):
+                return None
+            extension_id = self._driver_extension_ids[driver] = title[len("extension:"):]
+        return extension_id
+    
+    def _clear_browser_state(self, driver: uc.Chrome):
+        """Clear cookies, cache and storage of the current origin."""
+        try:
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            origin = driver.execute_script("return window.location.origin;")
+            if origin and origin.startswith('http'):
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {
+                    'origin': origin,
+                    'storageTypes': 'all'
+                })
+        except Exception:
+            # Not a Chromium driver with CDP access; fall back to WebDriver
+            driver.delete_all_cookies()
     
     def rotate_proxy(self, current_driver: uc.Chrome) -> uc.Chrome:
         """Rotate to next proxy by creating new driver."""
@@ -280,15 +547,15 @@ chrome.webRequest.onAuthRequired.addListener(
         except:
             pass
         
-        # Clean up current extension
-        self._cleanup_extension()
-        
         # Create new driver with next proxy
         return self.create_driver_with_proxy()
     
     def cleanup(self):
         """Clean up resources."""
-        self._cleanup_extension()
+        # Cached extensions are shared with other drivers and processes; old
+        # ones are removed by sweep_extension_cache
+        self._driver_tokens.clear()
+        self._driver_extension_ids.clear()
     
     def get_proxy_stats(self) -> Dict:
         """Get statistics about loaded proxies."""
@@ -363,7 +630,7 @@ def test_proxy_authentication():
         # Cleanup
         driver.quit()
         proxy_manager.cleanup()
-        
+    
     except Exception as e:
         print(f"❌ Test failed: {e}")
         proxy_manager.cleanup()
@@ -0,0 +1,265 @@
+"""
+Proxy Health Checking
+=====================
+Probes proxies concurrently in the background so driver creation never blocks on it.
+
+Two probe modes are supported:
+- ``connect``: TCP-connect to the proxy and issue an (authenticated) CONNECT
+  to the check URL's host; cheap and needs no response body.
+- ``http``: fetch the check URL through the proxy with requests.
+
+Probe the site you scrape (``site_check_url(search_url)``): a proxy that
+reaches httpbin.org can still be refused by the target.
+"""
+
+import time
+import base64
+import socket
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from urllib.parse import quote, urlparse
+
+import requests
+
+
+DEFAULT_CHECK_URL = "https://httpbin.org/ip"
+
+
+def site_check_url(url: str) -> str:
+    """Check URL for probing proxies against the site that will be scraped: its origin."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme or 'https'}://{parsed.netloc}/"
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of a single proxy probe."""
+    proxy_key: str
+    reachable: bool
+    latency: Optional[float]  # seconds, None when unreachable
+    checked_at: float  # epoch seconds
+    error: Optional[str] = None
+
+
+class ProxyHealthChecker:
+    """
+    Concurrent, cached proxy prober.
+    
+    Probes run on a small thread pool; results are cached for ``cache_ttl``
+    seconds and reported through ``on_result`` so callers (SessionManager)
+    can mark failing proxies before they are ever scheduled.
+    """
+    
+    def __init__(self, check_url: str = DEFAULT_CHECK_URL, timeout: float = 5.0,
+                 cache_ttl: float = 300.0, max_workers: int = 8,
+                 on_result: Optional[Callable[[ProbeResult], None]] = None,
+                 mode: str = "connect"):
+        if mode not in ("connect", "http"):
+            raise ValueError(f"Unknown probe mode: {mode}")
+        
+        self.check_url = check_url
+        self.mode = mode
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.on_result = on_result
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="proxy-probe")
+        self._cache: Dict[str, ProbeResult] = {}
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @staticmethod
+    def _get_proxy_key(proxy: Dict) -> str:
+        """Same key SessionManager uses for its stats."""
+        return proxy.get('server', 'unknown')
+    
+    @staticmethod
+    def _proxy_url(proxy: Dict) -> str:
+        """Build a requests-style proxy URL with optional credentials."""
+        if proxy.get('requires_auth'):
+            credentials = f"{quote(proxy['username'], safe='')}:{quote(proxy['password'], safe='')}@"
+        else:
+            credentials = ""
+        return f"http://{credentials}{proxy['host']}:{proxy['port']}"
+    
+    def probe(self, proxy: Dict) -> ProbeResult:
+        """Probe one proxy synchronously using the configured mode."""
+        if self.mode == "connect":
+            return self._connect_probe(proxy)
+        return self._http_probe(proxy)
+    
+    def _connect_probe(self, proxy: Dict) -> ProbeResult:
+        """TCP-connect to the proxy and tunnel to the check URL's host."""
+        target = urlparse(self.check_url)
+        target_port = target.port or (443 if target.scheme == "https" else 80)
+        authority = f"{target.hostname}:{target_port}"
+        
+        request = f"CONNECT {authority} HTTP/1.1\r\nHost: {authority}\r\n"
+        if proxy.get('requires_auth'):
+            token = base64.b64encode(f"{proxy['username']}:{proxy['password']}".encode('utf-8')).decode('ascii')
+            request += f"Proxy-Authorization: Basic {token}\r\n"
+        request += "\r\n"
+        
+        start = time.time()
+        try:
+            with socket.create_connection((proxy['host'], proxy['port']), timeout=self.timeout) as sock:
+                sock.settimeout(self.timeout)
+                sock.sendall(request.encode('utf-8'))
+                status_line = self._read_status_line(sock)
+        except OSError as e:
+            return ProbeResult(self._get_proxy_key(proxy), False, None, time.time(), type(e).__name__)
+        
+        latency = time.time() - start
+        parts = status_line.split()
+        status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+        reachable = status == 200
+        
+        if reachable:
+            error = None
+        elif status is None:
+            error = "Malformed proxy response"
+        else:
+            error = f"HTTP {status}"
+        
+        return ProbeResult(
+            proxy_key=self._get_proxy_key(proxy),
+            reachable=reachable,
+            latency=latency if reachable else None,
+            checked_at=time.time(),
+            error=error
+        )
+    
+    @staticmethod
+    def _read_status_line(sock: socket.socket) -> str:
+        """Read the first response line from a socket."""
+        data = b""
+        while b"\r\n" not in data and len(data) < 1024:
+            chunk = sock.recv(1024)
+            if not chunk:
+                break
+            data += chunk
+        return data.split(b"\r\n", 1)[0].decode('latin-1')
+    
+    def _http_probe(self, proxy: Dict) -> ProbeResult:
+        """Fetch check_url through the proxy."""
+        proxy_url = self._proxy_url(proxy)
+        start = time.time()
+        
+        try:
+            response = requests.get(
+                self.check_url,
+                proxies={'http': proxy_url, 'https': proxy_url},
+                timeout=self.timeout
+            )
+            reachable = response.status_code < 400
+            error = None if reachable else f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            reachable = False
+            error = type(e).__name__
+        
+        latency = time.time() - start
+        return ProbeResult(
+            proxy_key=self._get_proxy_key(proxy),
+            reachable=reachable,
+            latency=latency if reachable else None,
+            checked_at=time.time(),
+            error=error
+        )
+    
+    def _run_probe(self, proxy: Dict) -> ProbeResult:
+        """Probe, cache and report (runs on the worker pool)."""
+        proxy_key = self._get_proxy_key(proxy)
+        try:
+            result = self.probe(proxy)
+        except Exception as e:
+            result = ProbeResult(proxy_key, False, None, time.time(), str(e))
+        
+        with self._lock:
+            self._cache[proxy_key] = result
+            self._pending.pop(proxy_key, None)
+        
+        if self.on_result:
+            try:
+                self.on_result(result)
+            except Exception as e:
+                print(f"⚠️ Proxy probe callback failed: {e}")
+        
+        return result
+    
+    def get_result(self, proxy_key: str) -> Optional[ProbeResult]:
+        """Get the cached probe result if it has not expired."""
+        with self._lock:
+            result = self._cache.get(proxy_key)
+        if result and time.time() - result.checked_at < self.cache_ttl:
+            return result
+        return None
+    
+    def check(self, proxy: Dict, force: bool = False) -> Future:
+        """
+        Schedule a background probe and return its future.
+        
+        Fresh cached results are returned as an already-completed future and
+        concurrent requests for the same proxy share one probe.
+        """
+        proxy_key = self._get_proxy_key(proxy)
+        
+        if not force:
+            cached = self.get_result(proxy_key)
+            if cached:
+                future = Future()
+                future.set_result(cached)
+                return future
+        
+        with self._lock:
+            pending = self._pending.get(proxy_key)
+            if pending:
+                return pending
+            future = self._executor.submit(self._run_probe, proxy)
+            self._pending[proxy_key] = future
+            return future
+    
+    def check_all(self, proxies: List[Dict], force: bool = False) -> List[Future]:
+        """Schedule background probes for every proxy."""
+        return [self.check(proxy, force=force) for proxy in proxies]
+    
+    def is_reachable(self, proxy_key: str) -> Optional[bool]:
+        """Liveness from the TTL cache; None when unknown or expired."""
+        result = self.get_result(proxy_key)
+        return result.reachable if result else None
+    
+    def start(self, proxies_provider: Callable[[], List[Dict]], interval: float = 120.0):
+        """
+        Start periodic background probing.
+        
+        Every ``interval`` seconds each proxy returned by ``proxies_provider``
+        is probed again (so newly added proxies are picked up automatically);
+        keep ``cache_ttl`` above ``interval`` so liveness never lapses between
+        rounds.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        
+        def loop():
+            while not self._stop_event.is_set():
+                try:
+                    self.check_all(proxies_provider(), force=True)
+                except Exception as e:
+                    print(f"⚠️ Background proxy probing failed: {e}")
+                self._stop_event.wait(interval)
+        
+        self._thread = threading.Thread(target=loop, name="proxy-prober", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop periodic background probing."""
+        self._stop_event.set()
+    
+    def shutdown(self):
+        """Stop probing and the worker pool, dropping probes that have not started."""
+        self.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
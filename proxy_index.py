@@ -0,0 +1,176 @@
+"""
+Indexed Healthy-Proxy Selection
+===============================
+Keeps the healthy subset of a large proxy pool selectable in O(log n).
+
+Each proxy owns a slot in a Fenwick (binary indexed) tree holding its
+selection weight, so weighted-random selection and weight updates are both
+O(log n). Proxies in cooldown get weight 0 and wait in a min-heap ordered by
+cooldown expiry; they are re-admitted lazily when the heap is drained.
+"""
+
+import heapq
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from session_manager import ProxyStats
+
+
+class ProxyIndex:
+    """Incrementally maintained priority index over proxy stats."""
+    
+    def __init__(self):
+        self._slots: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._free_slots: List[int] = []
+        self._weights: List[float] = []
+        self._tree: List[float] = [0.0]  # 1-based Fenwick tree
+        self._stats: Dict[str, "ProxyStats"] = {}
+        self._scores: Dict[str, Tuple[float, float, float]] = {}  # healthy proxies only
+        self._cooldown_heap: List[Tuple[float, str]] = []
+        self._cooldown_until: Dict[str, float] = {}
+        self._lock = threading.RLock()
+    
+    # ----- Fenwick tree -----
+    
+    def _tree_add(self, slot: int, delta: float):
+        i = slot + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+    
+    def _tree_rebuild(self, capacity: int):
+        """Grow the tree to ``capacity`` slots, rebuilding in O(n)."""
+        self._tree = [0.0] * (capacity + 1)
+        for slot, weight in enumerate(self._weights):
+            self._tree[slot + 1] += weight
+        for i in range(1, capacity + 1):
+            parent = i + (i & -i)
+            if parent <= capacity:
+                self._tree[parent] += self._tree[i]
+    
+    def _set_weight(self, slot: int, weight: float):
+        delta = weight - self._weights[slot]
+        if delta:
+            self._weights[slot] = weight
+            self._tree_add(slot, delta)
+    
+    def total_weight(self) -> float:
+        """Sum of all selection weights."""
+        total = 0.0
+        i = len(self._weights)
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+    
+    # ----- Maintenance -----
+    
+    def add(self, key: str, stats: "ProxyStats"):
+        """Register a proxy (or refresh it if already present)."""
+        with self._lock:
+            if key not in self._slots:
+                if self._free_slots:
+                    slot = self._free_slots.pop()
+                    self._keys[slot] = key
+                else:
+                    slot = len(self._keys)
+                    self._keys.append(key)
+                    self._weights.append(0.0)
+                    if len(self._weights) >= len(self._tree):
+                        self._tree_rebuild(max(16, 2 * len(self._weights)))
+                self._slots[key] = slot
+            self._stats[key] = stats
+            self.update(key)
+    
+    def remove(self, key: str):
+        """Drop a proxy from the index."""
+        with self._lock:
+            slot = self._slots.pop(key, None)
+            if slot is None:
+                return
+            self._set_weight(slot, 0.0)
+            self._keys[slot] = None
+            self._free_slots.append(slot)
+            self._stats.pop(key, None)
+            self._scores.pop(key, None)
+            self._cooldown_until.pop(key, None)
+    
+    def update(self, key: str, now: Optional[float] = None):
+        """Re-score a proxy after its stats changed. O(log n)."""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                return
+            stats = self._stats[key]
+            now = time.time() if now is None else now
+            
+            weight = 0.0
+            self._scores.pop(key, None)
+            self._cooldown_until.pop(key, None)
+            
+            if stats.is_healthy(ignore_cooldown=True):
+                cooldown = stats.cooldown_until.timestamp() if stats.cooldown_until else None
+                if cooldown and cooldown > now:
+                    # Wait in the cooldown heap; stale heap entries are skipped on expiry
+                    self._cooldown_until[key] = cooldown
+                    heapq.heappush(self._cooldown_heap, (cooldown, key))
+                else:
+                    success_rate = stats.success_rate()
+                    weight = stats.health_score.value * (1 + success_rate / 100)
+                    response_time = -stats.avg_response_time if stats.avg_response_time > 0 else 0
+                    self._scores[key] = (stats.health_score.value, success_rate, response_time)
+            
+            self._set_weight(slot, weight)
+    
+    def _expire_cooldowns(self, now: float):
+        """Re-admit proxies whose cooldown has passed."""
+        while self._cooldown_heap and self._cooldown_heap[0][0] <= now:
+            until, key = heapq.heappop(self._cooldown_heap)
+            if self._cooldown_until.get(key) == until:
+                self.update(key, now)
+    
+    # ----- Queries -----
+    
+    def sample(self, rng: random.Random = random) -> Optional[str]:
+        """Weighted-random healthy proxy key in O(log n); None if none healthy."""
+        with self._lock:
+            self._expire_cooldowns(time.time())
+            total = self.total_weight()
+            if total <= 0:
+                return None
+            
+            # Find the first slot whose cumulative weight exceeds target
+            target = rng.random() * total
+            pos = 0
+            step = 1 << (len(self._tree) - 1).bit_length()
+            while step:
+                nxt = pos + step
+                if nxt < len(self._tree) and self._tree[nxt] <= target:
+                    pos = nxt
+                    target -= self._tree[nxt]
+                step >>= 1
+            
+            # Guard against float drift landing past the last weighted slot
+            slot = min(pos, len(self._weights) - 1)
+            while slot >= 0 and self._weights[slot] <= 0:
+                slot -= 1
+            return self._keys[slot] if slot >= 0 else None
+    
+    def healthy_count(self) -> int:
+        """Number of proxies currently selectable."""
+        with self._lock:
+            self._expire_cooldowns(time.time())
+            return len(self._scores)
+    
+    def ranked(self, limit: Optional[int] = None) -> List[str]:
+        """Healthy proxy keys, best first (health, success rate, speed)."""
+        with self._lock:
+            self._expire_cooldowns(time.time())
+            if limit is None:
+                return sorted(self._scores, key=self._scores.__getitem__, reverse=True)
+            return heapq.nlargest(limit, self._scores, key=self._scores.__getitem__)
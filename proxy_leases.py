@@ -0,0 +1,194 @@
+"""
+Shared Proxy Lease Service
+==========================
+Coordinates proxy use between scraper processes on the same machine (or on a
+shared filesystem) through a small SQLite database:
+
+- exclusive, time-bounded leases so two processes never drive the same proxy
+- shared per-proxy counters and cooldowns, so a CAPTCHA seen by one process
+  benches the proxy for all of them
+- a global token bucket per proxy enforcing a request rate across processes
+"""
+
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from typing import Dict, Iterator, Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    proxy_key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shared_stats (
+    proxy_key TEXT PRIMARY KEY,
+    success_count INTEGER NOT NULL DEFAULT 0,
+    failure_count INTEGER NOT NULL DEFAULT 0,
+    captcha_count INTEGER NOT NULL DEFAULT 0,
+    cooldown_until REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_shared_stats_updated ON shared_stats (updated_at);
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    proxy_key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class ProxyLeaseManager:
+    """Cross-process proxy leases, shared stats and global rate limits."""
+    
+    def __init__(self, db_path: str = "proxy_leases.db", lease_ttl: float = 1800.0,
+                 requests_per_minute: float = 10.0, burst: float = 2.0):
+        self.db_path = db_path
+        self.lease_ttl = lease_ttl
+        self.rate_per_second = requests_per_minute / 60.0
+        self.burst = burst
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction that takes the database lock up front."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    # ----- Leases -----
+    
+    def acquire(self, proxy_key: str, owner: str, ttl: Optional[float] = None) -> bool:
+        """Take (or renew) an exclusive lease; False if another owner holds it."""
+        now = time.time()
+        expires_at = now + (ttl or self.lease_ttl)
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT owner, expires_at FROM leases WHERE proxy_key = ?", (proxy_key,)
+            ).fetchone()
+            if row and row[0] != owner and row[1] > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (proxy_key, owner, expires_at) VALUES (?, ?, ?)",
+                (proxy_key, owner, expires_at)
+            )
+        return True
+    
+    def renew(self, proxy_key: str, owner: str, ttl: Optional[float] = None) -> bool:
+        """Extend a lease held by ``owner``."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE proxy_key = ? AND owner = ?",
+                (time.time() + (ttl or self.lease_ttl), proxy_key, owner)
+            )
+            return cursor.rowcount == 1
+    
+    def release(self, proxy_key: str, owner: str):
+        """Give a lease back."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE proxy_key = ? AND owner = ?", (proxy_key, owner))
+    
+    def release_all(self, owner: str):
+        """Give back every lease held by ``owner`` (process shutdown)."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE owner = ?", (owner,))
+    
+    def get_holder(self, proxy_key: str) -> Optional[str]:
+        """Current unexpired lease owner of a proxy, if any."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT owner FROM leases WHERE proxy_key = ? AND expires_at > ?",
+                (proxy_key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+    
+    # ----- Shared stats -----
+    
+    def record_stats(self, proxy_key: str, success: int = 0, failure: int = 0, captcha: int = 0,
+                     cooldown_until: Optional[float] = None):
+        """Add counter deltas (and optionally extend the cooldown) for a proxy."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO shared_stats (proxy_key, success_count, failure_count, captcha_count, "
+                "cooldown_until, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(proxy_key) DO UPDATE SET "
+                "success_count = success_count + excluded.success_count, "
+                "failure_count = failure_count + excluded.failure_count, "
+                "captcha_count = captcha_count + excluded.captcha_count, "
+                "cooldown_until = MAX(COALESCE(cooldown_until, 0), COALESCE(excluded.cooldown_until, 0)), "
+                "updated_at = excluded.updated_at",
+                (proxy_key, success, failure, captcha, cooldown_until, now)
+            )
+    
+    def get_stats_since(self, since: float = 0.0) -> Dict[str, Dict]:
+        """Shared stats rows updated after ``since`` (epoch seconds)."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT proxy_key, success_count, failure_count, captcha_count, cooldown_until, updated_at "
+                "FROM shared_stats WHERE updated_at > ?",
+                (since,)
+            ).fetchall()
+        return {
+            row[0]: {
+                "success_count": row[1],
+                "failure_count": row[2],
+                "captcha_count": row[3],
+                "cooldown_until": row[4] or None,
+                "updated_at": row[5]
+            }
+            for row in rows
+        }
+    
+    # ----- Global rate limiting -----
+    
+    def try_acquire_request(self, proxy_key: str, requests_per_minute: Optional[float] = None) -> float:
+        """
+        Take one request token from the proxy's global bucket.
+        
+        ``requests_per_minute`` overrides the configured rate for this proxy.
+        Returns 0.0 on success, otherwise the seconds to wait before a token
+        will be available.
+        """
+        rate_per_second = requests_per_minute / 60.0 if requests_per_minute else self.rate_per_second
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_buckets WHERE proxy_key = ?", (proxy_key,)
+            ).fetchone()
+            tokens = self.burst if not row else min(self.burst, row[0] + (now - row[1]) * rate_per_second)
+            
+            if tokens >= 1.0:
+                tokens -= 1.0
+                wait = 0.0
+            else:
+                wait = (1.0 - tokens) / rate_per_second
+            
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (proxy_key, tokens, updated_at) VALUES (?, ?, ?)",
+                (proxy_key, tokens, now)
+            )
+        return wait
+    
+    def wait_for_request(self, proxy_key: str) -> float:
+        """Block until the proxy's global bucket grants a request; returns seconds waited."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire_request(proxy_key)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
@@ -0,0 +1,188 @@
+"""
+Columnar Proxy Statistics
+=========================
+Array-backed storage for per-proxy statistics so pools of tens of thousands
+of proxies stay compact and can be scored in one vectorized pass.
+
+Timestamps are stored as epoch seconds (NaN = never), health as its integer
+level (see session_manager.ProxyHealth) and probe reachability as
+-1 (unknown) / 0 / 1. ``session_manager.ProxyStats`` is a thin view onto one
+row of this table.
+"""
+
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+HEALTH_BLACKLISTED = 1
+HEALTH_EXCELLENT = 5
+REACHABLE_UNKNOWN = -1
+
+MIN_SUCCESS_RATE = 30.0
+MAX_CONSECUTIVE_FAILURES = 5
+DEFAULT_COOLDOWN_SECONDS = 7200.0
+
+# name -> (dtype, default)
+COLUMNS = {
+    "success_count": (np.int64, 0),
+    "failure_count": (np.int64, 0),
+    "captcha_count": (np.int32, 0),
+    "consecutive_failures": (np.int32, 0),
+    "total_sessions": (np.int32, 0),
+    "successful_sessions": (np.int32, 0),
+    "avg_response_time": (np.float64, 0.0),  # EWMA latency in seconds
+    "last_used": (np.float64, np.nan),
+    "last_failure": (np.float64, np.nan),
+    "cooldown_until": (np.float64, np.nan),
+    "last_probe": (np.float64, np.nan),
+    "health_code": (np.int8, HEALTH_EXCELLENT),
+    "reachable": (np.int8, REACHABLE_UNKNOWN),
+    "cooldown_seconds": (np.float64, DEFAULT_COOLDOWN_SECONDS),  # learned CAPTCHA cooldown
+    "request_rate": (np.float64, np.nan),  # learned requests/minute (NaN = limiter default)
+}
+
+
+class ProxyStatsTable:
+    """Growable struct-of-arrays table, one row per proxy."""
+    
+    def __init__(self, capacity: int = 16):
+        capacity = max(capacity, 1)
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.full(capacity, default, dtype=dtype)
+            for name, (dtype, default) in COLUMNS.items()
+        }
+        self.active = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self._rows: Dict[str, int] = {}
+        # Removed rows wait in _retired until no live view can reach them,
+        # then move to _free for add() to reuse
+        self._retired: List[int] = []
+        self._free: List[int] = []
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def _grow(self):
+        """Double the capacity of every column."""
+        capacity = 2 * len(self.active)
+        for name, (dtype, default) in COLUMNS.items():
+            column = np.full(capacity, default, dtype=dtype)
+            column[:self.size] = self.columns[name][:self.size]
+            self.columns[name] = column
+        active = np.zeros(capacity, dtype=bool)
+        active[:self.size] = self.active[:self.size]
+        self.active = active
+    
+    def add(self, key: Optional[str] = None) -> int:
+        """
+        Claim a row (a recycled one if any) and return its index.
+        
+        Removed rows are only reused once recycle() has released them, so
+        views held by live sessions can never end up pointing at another proxy.
+        """
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self.size == len(self.active):
+                self._grow()
+            row = self.size
+            self.size += 1
+        self.active[row] = True
+        if key is not None:
+            self._rows[key] = row
+        return row
+    
+    def remove(self, key: str):
+        """Deactivate a proxy's row and retire it until the next recycle()."""
+        row = self._rows.pop(key, None)
+        if row is not None:
+            self.active[row] = False
+            self._retired.append(row)
+    
+    def recycle(self, in_use: Iterable[int] = ()) -> int:
+        """
+        Reset retired rows to their defaults and make them reusable.
+        
+        Rows listed in ``in_use`` (still viewed by a live session) stay
+        retired. Returns the number of rows freed.
+        """
+        in_use = set(in_use)
+        rows = [row for row in self._retired if row not in in_use]
+        self._retired = [row for row in self._retired if row in in_use]
+        for name, (dtype, default) in COLUMNS.items():
+            self.columns[name][rows] = default
+        self._free.extend(rows)
+        return len(rows)
+    
+    def row_of(self, key: str) -> Optional[int]:
+        return self._rows.get(key)
+    
+    def keys(self) -> List[str]:
+        return list(self._rows)
+    
+    def record_latency(self, row: int, latency: float, alpha: float = 0.3):
+        """Fold a latency sample into the row's EWMA response time."""
+        column = self.columns["avg_response_time"]
+        previous = column[row]
+        column[row] = latency if previous <= 0 else (1 - alpha) * previous + alpha * latency
+    
+    # ----- Vectorized whole-pool computations -----
+    
+    def success_rates(self) -> np.ndarray:
+        """Success rate percentage of every row (100 when unused)."""
+        n = self.size
+        success = self.columns["success_count"][:n].astype(np.float64)
+        total = success + self.columns["failure_count"][:n]
+        rates = np.full(n, 100.0)
+        np.divide(success * 100, total, out=rates, where=total > 0)
+        return rates
+    
+    def healthy_mask(self, now: Optional[float] = None, ignore_cooldown: bool = False) -> np.ndarray:
+        """Boolean mask of rows that pass ProxyStats.is_healthy()."""
+        n = self.size
+        now = time.time() if now is None else now
+        mask = self.active[:n].copy()
+        mask &= self.columns["health_code"][:n] != HEALTH_BLACKLISTED
+        mask &= self.columns["consecutive_failures"][:n] < MAX_CONSECUTIVE_FAILURES
+        mask &= self.success_rates() >= MIN_SUCCESS_RATE
+        if not ignore_cooldown:
+            cooldown = self.columns["cooldown_until"][:n]
+            # NaN comparisons are False, so rows without a cooldown pass
+            mask &= ~(cooldown > now)
+        return mask
+    
+    def selection_weights(self, now: Optional[float] = None) -> np.ndarray:
+        """Weighted-selection weight of every row (0 for unhealthy rows)."""
+        weights = self.columns["health_code"][:self.size] * (1 + self.success_rates() / 100)
+        return np.where(self.healthy_mask(now), weights, 0.0)
+    
+    def health_counts(self) -> Dict[int, int]:
+        """Number of active proxies per health level."""
+        codes = self.columns["health_code"][:self.size][self.active[:self.size]]
+        counts = np.bincount(codes, minlength=HEALTH_EXCELLENT + 1)
+        return {code: int(counts[code]) for code in range(HEALTH_BLACKLISTED, HEALTH_EXCELLENT + 1)}
+    
+    # ----- Binary snapshots -----
+    
+    def save(self, filepath: str):
+        """Write active rows to a compressed .npz snapshot."""
+        keys = self.keys()
+        rows = np.array([self._rows[k] for k in keys], dtype=np.int64)
+        arrays = {name: column[rows] for name, column in self.columns.items()}
+        with open(filepath, 'wb') as f:
+            np.savez_compressed(f, keys=np.array(keys, dtype=str), **arrays)
+    
+    def load(self, filepath: str) -> List[str]:
+        """Merge a snapshot into rows of known keys; returns the keys updated."""
+        with np.load(filepath, allow_pickle=False) as snapshot:
+            keys = snapshot["keys"].tolist()
+            arrays = {name: snapshot[name] for name in COLUMNS if name in snapshot.files}
+        
+        positions = [i for i, key in enumerate(keys) if key in self._rows]
+        rows = np.array([self._rows[keys[i]] for i in positions], dtype=np.int64)
+        for name, values in arrays.items():
+            self.columns[name][rows] = values[positions]
+        
+        return [keys[i] for i in positions]
@@ -0,0 +1,177 @@
+"""
+Token-Bucket Rate Limiting
+==========================
+Paces requests with token buckets instead of fixed sleeps: one bucket per
+proxy, one per target domain and one global bucket for the process. A request
+goes out only when every bucket it touches has a token, so throughput runs at
+the configured safe rate and no faster.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from proxy_leases import ProxyLeaseManager
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate`` tokens/second."""
+    
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def time_until_available(self, now: Optional[float] = None, tokens: float = 1.0) -> float:
+        """Seconds until ``tokens`` can be taken (0.0 if available now)."""
+        with self.lock:
+            self._refill(now or time.monotonic())
+            if self.tokens >= tokens:
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+    
+    def take(self, now: Optional[float] = None, tokens: float = 1.0):
+        """Remove tokens unconditionally (callers check availability first)."""
+        with self.lock:
+            self._refill(now or time.monotonic())
+            self.tokens -= tokens
+    
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return the seconds to wait."""
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+    
+    def set_rate(self, rate: float):
+        """Change the refill rate, keeping the tokens earned so far."""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+
+class RateLimiter:
+    """
+    Per-proxy, per-domain and global request budgets.
+    
+    Rates are requests per minute. With a ``shared`` lease manager the
+    per-proxy budget is enforced across processes through its database
+    instead of locally.
+    """
+    
+    def __init__(self, per_proxy_rpm: float = 10.0, per_domain_rpm: float = 60.0,
+                 global_rpm: float = 120.0, burst: float = 2.0,
+                 shared: Optional[ProxyLeaseManager] = None):
+        self.per_proxy_rpm = per_proxy_rpm
+        self.per_domain_rpm = per_domain_rpm
+        self.burst = burst
+        self.shared = shared
+        
+        self.global_bucket = TokenBucket(global_rpm / 60.0, burst)
+        # Per-proxy overrides of per_proxy_rpm (set by the adaptive pacer)
+        self.proxy_rpm: Dict[str, float] = {}
+        self.proxy_buckets: Dict[str, TokenBucket] = {}
+        self.domain_buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+    
+    def attach_shared(self, shared: ProxyLeaseManager):
+        """
+        Enforce the per-proxy budget through ``shared`` from now on.
+        
+        For limiters built without one and handed to a SessionManager that
+        has a lease manager; attaching a lease manager on another database
+        than the one already shared is an error.
+        """
+        with self.lock:
+            if self.shared is None:
+                self.shared = shared
+            elif os.path.abspath(self.shared.db_path) != os.path.abspath(shared.db_path):
+                raise ValueError(f"Rate limiter already shares {self.shared.db_path}, not {shared.db_path}")
+    
+    def _bucket(self, buckets: Dict[str, TokenBucket], key: str, rpm: float) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(rpm / 60.0, self.burst)
+        return bucket
+    
+    def _buckets_for(self, proxy_key: Optional[str], url: Optional[str]) -> List[TokenBucket]:
+        buckets = [self.global_bucket]
+        
+        domain = urlparse(url).hostname if url else None
+        if domain:
+            buckets.append(self._bucket(self.domain_buckets, domain, self.per_domain_rpm))
+        
+        if proxy_key and not self.shared:
+            buckets.append(self._bucket(self.proxy_buckets, proxy_key, self.get_proxy_rate(proxy_key)))
+        
+        return buckets
+    
+    def proxy_bucket(self, proxy_key: str) -> TokenBucket:
+        """Local bucket for a proxy (created on first use)."""
+        with self.lock:
+            return self._bucket(self.proxy_buckets, proxy_key, self.get_proxy_rate(proxy_key))
+    
+    def get_proxy_rate(self, proxy_key: str) -> float:
+        """Current requests/minute allowed for a proxy."""
+        return self.proxy_rpm.get(proxy_key, self.per_proxy_rpm)
+    
+    def set_proxy_rate(self, proxy_key: str, rpm: float):
+        """Change one proxy's requests/minute (local bucket and shared budget)."""
+        self.proxy_rpm[proxy_key] = rpm
+        bucket = self.proxy_buckets.get(proxy_key)
+        if bucket:
+            bucket.set_rate(rpm / 60.0)
+    
+    def set_global_rate(self, rpm: float):
+        """Change the process-wide requests/minute."""
+        self.global_bucket.set_rate(rpm / 60.0)
+    
+    def domain_bucket(self, domain: str) -> TokenBucket:
+        """Bucket for a target domain (created on first use)."""
+        with self.lock:
+            return self._bucket(self.domain_buckets, domain, self.per_domain_rpm)
+    
+    def try_acquire(self, proxy_key: Optional[str] = None, url: Optional[str] = None) -> float:
+        """
+        Take one token from every applicable bucket, all or nothing.
+        
+        Returns 0.0 when the request may go out, otherwise the seconds until
+        the slowest bucket has a token.
+        """
+        with self.lock:
+            buckets = self._buckets_for(proxy_key, url)
+            now = time.monotonic()
+            
+            wait = max(bucket.time_until_available(now) for bucket in buckets)
+            if wait > 0:
+                return wait
+            
+            if proxy_key and self.shared:
+                wait = self.shared.try_acquire_request(proxy_key, self.proxy_rpm.get(proxy_key))
+                if wait > 0:
+                    return wait
+            
+            for bucket in buckets:
+                bucket.take(now)
+        
+        return 0.0
+    
+    def acquire(self, proxy_key: Optional[str] = None, url: Optional[str] = None) -> float:
+        """Block until a request may go out; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(proxy_key, url)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
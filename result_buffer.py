@@ -0,0 +1,209 @@
+"""
+Compact Result Buffer
+=====================
+Holds a run's jobs as columns instead of one object per job. Fields that
+repeat across thousands of jobs (company, location, salary text, job type,
+salary period/currency, posted date) are dictionary-encoded: each distinct
+value is stored once, interned, and rows keep a 4-byte code. Salary
+numbers and page numbers live in typed arrays, and the job URL is only kept
+when it is not the usual view URL of the job key.
+
+    buffer = ResultBuffer()
+    buffer.extend(records)
+    len(buffer), buffer[0], buffer[:5]      # JobRecords, rebuilt on access
+    write_jsonl(buffer, "output/results.jsonl")
+
+Measure memory per 100k jobs against lists of dicts and JobRecords with
+``python result_buffer.py --jobs 100000``; the number of distinct values per
+dictionary is printed alongside, since the savings depend on it.
+"""
+
+import argparse
+import random
+import sys
+import tracemalloc
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from job_record import NUMERIC_FIELDS, VIEW_URL, JobRecord
+
+
+# Low-cardinality fields, dictionary-encoded
+CATEGORICAL_FIELDS = ['company', 'location', 'salary', 'salary_period', 'salary_currency',
+                      'job_type', 'posted_date']
+# Mostly unique per job, kept as plain lists
+TEXT_FIELDS = ['title', 'summary', 'job_key']
+
+MISSING_PAGE = -1
+
+
+class CategoricalColumn:
+    """Distinct values of one column plus a code per row (code 0 is None)."""
+    
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.index: Dict[str, int] = {}
+        self.codes = array('I')
+    
+    def append(self, value: Optional[str]):
+        if value is None:
+            self.codes.append(0)
+            return
+        code = self.index.get(value)
+        if code is None:
+            value = sys.intern(value)
+            code = len(self.values)
+            self.values.append(value)
+            self.index[value] = code
+        self.codes.append(code)
+    
+    def __getitem__(self, row: int) -> Optional[str]:
+        return self.values[self.codes[row]]
+
+
+class ResultBuffer:
+    """Append-only, list-like store of JobRecords in compact columns."""
+    
+    def __init__(self, records: Iterable[JobRecord] = ()):
+        self.categories = {name: CategoricalColumn() for name in CATEGORICAL_FIELDS}
+        self.text: Dict[str, List[Optional[str]]] = {name: [] for name in TEXT_FIELDS}
+        self.numbers = {name: array('d') for name in NUMERIC_FIELDS}
+        self.pages = array('i')
+        # Only URLs that differ from VIEW_URL of the job key
+        self.urls: Dict[int, Optional[str]] = {}
+        self.extend(records)
+    
+    def append(self, record: JobRecord):
+        row = len(self.pages)
+        for name, column in self.categories.items():
+            column.append(getattr(record, name))
+        for name, column in self.text.items():
+            column.append(getattr(record, name))
+        for name, column in self.numbers.items():
+            value = getattr(record, name)
+            column.append(float('nan') if value is None else value)
+        self.pages.append(MISSING_PAGE if record.scraped_from_page is None else record.scraped_from_page)
+        
+        if record.url != (VIEW_URL.format(record.job_key) if record.job_key else None):
+            self.urls[row] = record.url
+    
+    def extend(self, records: Iterable[JobRecord]):
+        for record in records:
+            self.append(record)
+    
+    def record(self, row: int) -> JobRecord:
+        values = {name: column[row] for name, column in self.categories.items()}
+        for name, column in self.text.items():
+            values[name] = column[row]
+        for name, column in self.numbers.items():
+            value = column[row]
+            values[name] = None if value != value else value
+        page = self.pages[row]
+        values['scraped_from_page'] = None if page == MISSING_PAGE else page
+        
+        job_key = values['job_key']
+        if row in self.urls:
+            values['url'] = self.urls[row]
+        elif job_key:
+            values['url'] = VIEW_URL.format(job_key)
+        return JobRecord(**values)
+    
+    def __len__(self) -> int:
+        return len(self.pages)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[JobRecord, List[JobRecord]]:
+        if isinstance(index, slice):
+            return [self.record(row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("result buffer index out of range")
+        return self.record(index)
+    
+    def __iter__(self) -> Iterator[JobRecord]:
+        for row in range(len(self)):
+            yield self.record(row)
+    
+    def distinct(self, name: str) -> int:
+        """Number of distinct non-null values of a categorical field."""
+        return len(self.categories[name].values) - 1
+
+
+def measure_bytes(build) -> int:
+    """Memory still allocated by the object ``build()`` returns (tracemalloc)."""
+    tracemalloc.start()
+    try:
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+
+def _mock_pages(jobs: int, jobs_per_page: int, companies: Optional[int] = None,
+                locations: Optional[int] = None) -> Iterator[List[JobRecord]]:
+    """
+    Extracted jobs of mock result pages, each page decoded afresh as when scraping.
+    
+    Every page is a different result offset, so titles and job keys don't
+    repeat, and company and location are drawn from pools of ``companies``
+    (default one per 5 jobs) and ``locations`` (one per 50 jobs) values, so
+    the dictionaries are as large as a real scrape's rather than the mock
+    site's handful of names.
+    """
+    # Benchmark-only: the scraper imports this module, and must not pull in the mock site
+    from extraction import extract_jobs_from_html
+    from mock_indeed import render_results_page
+    
+    companies = companies or max(jobs // 5, 1)
+    locations = locations or max(jobs // 50, 1)
+    rng = random.Random(0)
+    queries = ["python", "golang", "data engineer", "devops"]
+    for page in range(-(-jobs // jobs_per_page)):
+        html = render_results_page(queries[page % len(queries)], page * jobs_per_page, jobs_per_page)
+        records = extract_jobs_from_html(html)[:jobs - page * jobs_per_page]
+        for record in records:
+            record.company = f"Company {rng.randrange(companies)}"
+            record.location = f"City {rng.randrange(locations)}"
+            record.scraped_from_page = page + 1
+        yield records
+
+
+def _mock_records(jobs: int, jobs_per_page: int) -> Iterator[JobRecord]:
+    for page in _mock_pages(jobs, jobs_per_page):
+        yield from page
+
+
+def benchmark(jobs: int = 100_000, jobs_per_page: int = 100) -> Dict[str, int]:
+    """Bytes held by ``jobs`` scraped jobs as dicts, JobRecords and a ResultBuffer."""
+    return {
+        "dicts": measure_bytes(lambda: [record.to_dict() for record in _mock_records(jobs, jobs_per_page)]),
+        "records": measure_bytes(lambda: list(_mock_records(jobs, jobs_per_page))),
+        "buffer": measure_bytes(lambda: ResultBuffer(_mock_records(jobs, jobs_per_page))),
+    }
+
+
+def cardinality(jobs: int = 100_000, jobs_per_page: int = 100) -> Dict[str, int]:
+    """Distinct values per dictionary-encoded field of the benchmark's jobs."""
+    buffer = ResultBuffer(_mock_records(jobs, jobs_per_page))
+    return {name: buffer.distinct(name) for name in CATEGORICAL_FIELDS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per job of the in-run result representations")
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--jobs-per-page", type=int, default=100)
+    args = parser.parse_args()
+    
+    sizes = benchmark(args.jobs, args.jobs_per_page)
+    for name, size in sizes.items():
+        print(f"📦 {name:8} {size / 2 ** 20:8.1f} MiB  ({size / args.jobs:6.0f} bytes/job)")
+    print(f"📉 buffer vs dicts: {sizes['buffer'] / sizes['dicts']:.0%}")
+    # The savings depend on how often values repeat, so show it
+    distinct = ", ".join(f"{name} {count}" for name, count in cardinality(args.jobs, args.jobs_per_page).items())
+    print(f"🔢 distinct values: {distinct}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Structured Salary Parsing
+=========================
+Turns Indeed's salary data into numbers: ``salary_min``, ``salary_max``,
+``salary_currency``, ``salary_period`` and annualized
+``salary_annual_min``/``salary_annual_max`` (hourly x 2080, daily x 260,
+weekly x 52, monthly x 12).
+
+``salary_fields`` works on one job's JSON during extraction (preferring
+the numeric ``extractedSalary`` over the ``salarySnippet`` text);
+``normalize_frame`` does the same for a whole DataFrame of already
+exported rows with vectorized string operations, for bulk re-processing of
+historical CSVs:
+
+    python salary.py output/results_*.csv         # writes *_normalized.csv
+"""
+
+import argparse
+import glob
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+MISSING = "Not mentioned"
+
+# Working hours/days/weeks/months per year
+PERIOD_MULTIPLIERS = {'hour': 2080, 'day': 260, 'week': 52, 'month': 12, 'year': 1}
+
+CURRENCY_SYMBOLS = {'$': 'USD', '£': 'GBP', '€': 'EUR', '₹': 'INR'}
+
+# Period keywords in salary text / extractedSalary type, checked in order
+PERIOD_PATTERNS = [
+    ('hour', r'hour|/hr\b'),
+    ('day', r'\bday\b|daily|/day'),
+    ('week', r'week|/wk\b'),
+    ('month', r'month|/mo\b'),
+    ('year', r'year|annual|/yr\b'),
+]
+
+AMOUNT = r'(?P<{0}>\d[\d,]*(?:\.\d+)?)\s*(?P<{0}_k>[kK])?'
+SALARY_PATTERN = re.compile(
+    r'(?P<symbol>[$£€₹])\s*' + AMOUNT.format('low')
+    + r'(?:\s*(?:-|–|—|to)\s*[$£€₹]?\s*' + AMOUNT.format('high') + r')?'
+)
+UP_TO_PATTERN = re.compile(r'^\s*up to\b', re.IGNORECASE)
+
+
+def detect_period(text: Optional[str]) -> Optional[str]:
+    """Pay period named in a salary text or extractedSalary type ("hourly", "$20 an hour", ...)."""
+    if not text:
+        return None
+    lowered = text.lower()
+    for period, pattern in PERIOD_PATTERNS:
+        if re.search(pattern, lowered):
+            return period
+    return None
+
+
+def _amount(number: Optional[str], thousands: Optional[str]) -> Optional[float]:
+    if not number:
+        return None
+    return float(number.replace(',', '')) * (1000 if thousands else 1)
+
+
+def parse_salary_text(text: Optional[str]) -> Tuple[Optional[float], Optional[float], Optional[str]]:
+    """
+    (min, max, currency) of a salary text such as "$95k–$125k a year".
+    
+    A single figure is both min and max, except "Up to $X" (max only).
+    """
+    if not text or text == MISSING:
+        return None, None, None
+    match = SALARY_PATTERN.search(text)
+    if not match:
+        return None, None, None
+    
+    low = _amount(match.group('low'), match.group('low_k'))
+    high = _amount(match.group('high'), match.group('high_k'))
+    currency = CURRENCY_SYMBOLS[match.group('symbol')]
+    if high is None:
+        if UP_TO_PATTERN.search(text):
+            return None, low, currency
+        high = low
+    return low, high, currency
+
+
+def annualize(amount: Optional[float], period: Optional[str]) -> Optional[float]:
+    if amount is None or period not in PERIOD_MULTIPLIERS:
+        return None
+    return round(amount * PERIOD_MULTIPLIERS[period], 2)
+
+
+def salary_fields(job: Dict) -> Dict:
+    """Structured salary of one job's JSON: min/max/currency/period plus annualized bounds."""
+    low = high = currency = None
+    snippet = job.get('salarySnippet') or {}
+    
+    extracted = job.get('extractedSalary') or {}
+    period = detect_period(extracted.get('type'))
+    if extracted.get('min') or extracted.get('max'):
+        low = float(extracted['min']) if extracted.get('min') else None
+        high = float(extracted['max']) if extracted.get('max') else low
+        currency = snippet.get('currency')
+    
+    if low is None and high is None and snippet.get('text'):
+        low, high, currency = parse_salary_text(snippet['text'])
+        currency = snippet.get('currency') or currency
+    
+    if period is None and snippet.get('text'):
+        period = detect_period(snippet['text'])
+    if currency is None and (low is not None or high is not None):
+        currency = 'USD'
+    
+    return {
+        'salary_min': low,
+        'salary_max': high,
+        'salary_currency': currency,
+        'salary_period': period,
+        'salary_annual_min': annualize(low, period),
+        'salary_annual_max': annualize(high, period),
+    }
+
+
+def _column_amount(parts: pd.DataFrame, name: str) -> pd.Series:
+    numbers = pd.to_numeric(parts[name].str.replace(',', '', regex=False), errors='coerce').astype('float64')
+    return numbers * np.where(parts[f'{name}_k'].notna(), 1000, 1)
+
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the structured salary columns to exported rows, vectorized.
+    
+    Uses the ``salary`` text and, where set, the ``salary_period`` column;
+    rows without a recognisable amount or period get nulls (the "Not
+    mentioned" sentinel is not written back).
+    """
+    df = df.copy()
+    if 'salary' in df.columns:
+        text = df['salary'].astype('string')
+    else:
+        text = pd.Series(pd.NA, index=df.index, dtype='string')
+    text = text.mask(text == MISSING)
+    
+    parts = text.str.extract(SALARY_PATTERN)
+    low = _column_amount(parts, 'low')
+    high = _column_amount(parts, 'high')
+    up_to = text.str.contains(UP_TO_PATTERN, na=False) & high.isna()
+    high = high.fillna(low)
+    low = low.mask(up_to)
+    
+    lowered = text.str.lower()
+    detected = pd.Series(
+        np.select([lowered.str.contains(pattern, na=False) for _, pattern in PERIOD_PATTERNS],
+                  [period for period, _ in PERIOD_PATTERNS], default=''),
+        index=df.index
+    ).replace('', np.nan)
+    if 'salary_period' in df.columns:
+        period = df['salary_period'].where(df['salary_period'].isin(PERIOD_MULTIPLIERS.keys()), detected)
+    else:
+        period = detected
+    multiplier = period.map(PERIOD_MULTIPLIERS).astype('float64')
+    
+    df['salary_min'] = low
+    df['salary_max'] = high
+    df['salary_currency'] = parts['symbol'].map(CURRENCY_SYMBOLS)
+    df['salary_period'] = period
+    df['salary_annual_min'] = (low * multiplier).round(2)
+    df['salary_annual_max'] = (high * multiplier).round(2)
+    return df
+
+
+def normalize_csv_files(paths: List[str], suffix: str = "_normalized", chunksize: int = 200_000) -> List[str]:
+    """Write a normalized copy of each CSV next to it; returns the new paths."""
+    written = []
+    for path in paths:
+        root, ext = os.path.splitext(path)
+        if root.endswith(suffix):
+            continue
+        out_path = f"{root}{suffix}{ext}"
+        rows = 0
+        # Chunked so multi-million-row histories never have to fit in memory at once
+        for i, chunk in enumerate(pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False)):
+            normalize_frame(chunk).to_csv(out_path, mode='w' if i == 0 else 'a', header=i == 0,
+                                          index=False, encoding='utf-8')
+            rows += len(chunk)
+        print(f"✅ {path}: {rows} rows -> {out_path}")
+        written.append(out_path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add numeric, annualized salary columns to exported CSVs")
+    parser.add_argument("paths", nargs="*", help="CSV files (default: output/*.csv)")
+    parser.add_argument("--suffix", default="_normalized")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    args = parser.parse_args()
+    
+    paths = args.paths or sorted(glob.glob(os.path.join("output", "*.csv")))
+    normalize_csv_files(paths, args.suffix, args.chunksize)
+
+
+if __name__ == "__main__":
+    main()
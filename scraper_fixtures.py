@@ -0,0 +1,51 @@
+"""
+Offline Scraper Fixtures
+========================
+Scrapers for tests, wired to a pool of fake proxies: no background probing
+or proxy-file polling (the fake proxies would be marked dead), no
+proxy_stats.json in the working directory, and a private pidfile directory
+so the Chrome watchdog never touches other processes' browsers.
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = offline_scraper(IndeedScraperV3, tmp, "https://www.indeed.com/jobs?q=python", 3)
+"""
+
+import os
+from typing import Optional
+
+from chrome_watchdog import ChromeWatchdog
+from proxy_leases import ProxyLeaseManager
+from rate_limiter import RateLimiter
+from session_manager import SessionManager
+
+
+def fake_proxy_file(directory: str, count: int = 8) -> str:
+    """A proxies.txt with ``count`` unroutable 10.0.0.x proxies."""
+    path = os.path.join(directory, "proxies.txt")
+    with open(path, 'w') as f:
+        f.write("".join(f"10.0.0.{i}:8000:user:pass\n" for i in range(1, count + 1)))
+    return path
+
+
+def offline_session_manager(directory: str, proxies: int = 8, lease_db: Optional[str] = None,
+                            rate_limiter: Optional[RateLimiter] = None) -> SessionManager:
+    """SessionManager over fake proxies, without probe or file-watch threads."""
+    return SessionManager(
+        fake_proxy_file(directory, proxies),
+        probe_interval=None,
+        watch_interval=None,
+        lease_manager=ProxyLeaseManager(lease_db) if lease_db else None,
+        rate_limiter=rate_limiter
+    )
+
+
+def offline_scraper(cls, directory: str, *args, proxies: int = 8, lease_db: Optional[str] = None,
+                    rate_limiter: Optional[RateLimiter] = None, **kwargs):
+    """An IndeedScraperV3 (subclass) built on offline_session_manager."""
+    return cls(
+        *args,
+        session_manager=offline_session_manager(directory, proxies, lease_db, rate_limiter),
+        stats_path=None,
+        watchdog=ChromeWatchdog(pidfile_dir=os.path.join(directory, "pids")),
+        **kwargs
+    )
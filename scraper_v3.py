@@ -4,11 +4,12 @@ Indeed Scraper v3.0 - Anti-Bot Protection Bypass
 Uses undetected-chromedriver to bypass Cloudflare protection with session-based proxy rotation.
 """
 
-import asyncio
 import time
 import random
 import os
-from typing import List, Dict, Optional
+import threading
+from collections import deque
+from typing import Callable, Deque, List, Dict, Optional, Set, Tuple
 from bs4 import BeautifulSoup
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
@@ -18,7 +19,18 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from chrome_driver_manager import get_driver
 from session_manager import SessionManager, ProxySession
+from proxy_health import site_check_url
+from proxy_leases import ProxyLeaseManager
+from rate_limiter import RateLimiter
 from human_behavior import HumanBehaviorSimulator
+from captcha_pool import CaptchaAttentionPool
+from chrome_watchdog import ChromeWatchdog
+from page_errors import DeadLetter, MAX_ATTEMPTS, NO_BACKOFF, PageErrorKind, PageFailed, backoff_delay, classify_error
+from extraction import ExtractionPipeline, extract_jobs_from_html, extract_payload
+from job_record import JobRecord
+from result_buffer import ResultBuffer
+from prefetch import PagePrefetcher
+from page_archive import PageArchive
 
 
 class IndeedScraperV3:
@@ -26,17 +38,90 @@ class IndeedScraperV3:
     Scraper using undetected-chromedriver with session-based proxy rotation.
     """
     
-    def __init__(self, base_url: str, page_count: int, proxy_file: str = "proxies.txt"):
+    # Launch browsers with unthrottled background tabs (set by multi-tab scrapers)
+    BACKGROUND_TABS = False
+    
+    def __init__(self, base_url: str, page_count: int, proxy_file: str = "proxies.txt",
+                 start_page: int = 1,
+                 page_callback: Optional[Callable[[int, List[JobRecord]], None]] = None,
+                 lease_db: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 max_page_attempts: int = 3,
+                 extraction_workers: int = 0,
+                 prefetch_next: bool = False,
+                 headless: bool = False,
+                 retry_backoff: float = 2.0,
+                 max_retry_backoff: float = 60.0,
+                 archive_dir: Optional[str] = None,
+                 session_manager: Optional[SessionManager] = None,
+                 stats_path: Optional[str] = "proxy_stats.json",
+                 probe_interval: Optional[float] = 120.0,
+                 check_url: Optional[str] = None,
+                 watchdog: Optional[ChromeWatchdog] = None):
         self.base_url = base_url
         self.page_count = page_count
-        self.session_manager = SessionManager(proxy_file)
+        self.start_page = start_page
+        # Called with (page_number, jobs) as soon as each page is scraped
+        self.page_callback = page_callback
+        # A ready-made SessionManager (shared pool, tests) replaces proxy_file,
+        # lease_db, rate_limiter, probe_interval and check_url
+        if session_manager is None:
+            # A shared lease database keeps parallel scraper processes off each other's proxies
+            lease_manager = ProxyLeaseManager(lease_db) if lease_db else None
+            # Probes tunnel to the scraped site itself unless told otherwise
+            session_manager = SessionManager(proxy_file, check_url=check_url or site_check_url(base_url),
+                                             lease_manager=lease_manager, rate_limiter=rate_limiter,
+                                             probe_interval=probe_interval)
+        self.session_manager = session_manager
         self.current_session: Optional[ProxySession] = None
         self.driver = None
+        # Launch browsers with the headless profile (no display server needed)
+        self.headless = headless
         self.human_behavior: Optional[HumanBehaviorSimulator] = None
         
-        # Load existing proxy statistics
-        if self.session_manager:
-            self.session_manager.load_proxy_stats("proxy_stats.json")
+        # Tracks browser process trees: limits, timeouts and orphan cleanup
+        self.watchdog = watchdog or ChromeWatchdog()
+        self.watchdog.kill_orphans()
+        
+        # Challenged browsers wait here for solving while their page is
+        # retried on another proxy (up to max_page_attempts times); a solve
+        # lifts the proxy's cooldown
+        self.captcha_pool = CaptchaAttentionPool(
+            self._check_for_captcha,
+            on_solved=self._on_challenge_solved,
+            close_driver=self._quit_driver,
+            headless=headless
+        )
+        self.max_page_attempts = max_page_attempts
+        
+        # Failed pages are retried on a fresh session after a capped exponential
+        # backoff; pages that use up their attempts end up here
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.dead_letters: List[DeadLetter] = []
+        # Pages handed to the page callback; see unfinished_pages
+        self.delivered_pages: Set[int] = set()
+        
+        # Optional worker processes parsing page JSON while the browser moves on
+        self.extraction = ExtractionPipeline(extraction_workers) if extraction_workers > 0 else None
+        # The run's page queue, so pages whose extraction fails can be requeued
+        self._pending_pages: Deque[int] = deque()
+        self._page_attempts: Dict[int, int] = {}
+        # Set by stop() (from any thread) to end the run after the page in hand
+        self._stop_requested = threading.Event()
+        
+        # Compressed copies of each page's job JSON, for re-extraction without re-scraping
+        self.archive = PageArchive(archive_dir) if archive_dir else None
+        
+        # Fetch the session's next page in-page while "reading" the current one
+        self.prefetch_next = prefetch_next
+        self._upcoming_page: Optional[int] = None
+        self._prefetched: Dict[int, str] = {}
+        
+        # Proxy statistics persisted between runs (None: keep them in memory only)
+        self.stats_path = stats_path
+        if self.session_manager and stats_path:
+            self.session_manager.load_proxy_stats(stats_path)
     
     def _get_next_proxy(self) -> Optional[Dict]:
         """Get proxy from current session."""
@@ -44,11 +129,11 @@ class IndeedScraperV3:
             return self.current_session.proxy
         return None
     
-    def _build_page_url(self, page_number: int) -> str:
-        """Build URL for specific page."""
+    def _build_page_url(self, page_number: int, base_url: Optional[str] = None) -> str:
+        """Build URL for specific page (of ``base_url``, default the scraper's search)."""
         from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
         
-        parsed = urlparse(self.base_url)
+        parsed = urlparse(base_url or self.base_url)
         params = parse_qs(parsed.query)
         
         start_value = (page_number - 1) * 10
@@ -74,11 +159,13 @@ class IndeedScraperV3:
             driver = get_driver(
                 use_proxy=True, 
                 proxy_config=session.proxy,
-                proxy_auth_manager=proxy_auth_manager
+                proxy_auth_manager=proxy_auth_manager,
+                headless=self.headless,
+                background_tabs=self.BACKGROUND_TABS
             )
         else:
             # No proxy or session
-            driver = get_driver(use_proxy=False)
+            driver = get_driver(use_proxy=False, headless=self.headless, background_tabs=self.BACKGROUND_TABS)
         
         # Set session-specific user agent if available
         if session and session.user_agent:
@@ -87,12 +174,35 @@ class IndeedScraperV3:
             except:
                 pass  # Ignore if script fails
         
+        self.watchdog.register(driver)
         return driver
     
-    def _check_for_captcha(self) -> bool:
-        """Check if Cloudflare CAPTCHA is present."""
+    def _quit_driver(self, driver):
+        """Quit a browser, killing its processes if it is hung or already crashed."""
+        self.watchdog.quit(driver)
+    
+    def _recycle_browser_if_needed(self):
+        """
+        Relaunch the session's browser when it is over the watchdog's limits.
+        
+        The session (proxy, page counts) and the pending pages are untouched,
+        so scraping resumes at the same page in the fresh browser.
+        """
+        if not self.driver:
+            return
+        reason = self.watchdog.check(self.driver)
+        if not reason:
+            return
+        
+        print(f"   ♻️ Recycling browser ({reason}), keeping session and page position")
+        self._quit_driver(self.driver)
+        self.driver = self._init_driver(self.current_session)
+        self.human_behavior = HumanBehaviorSimulator(self.driver, headless=self.headless)
+    
+    def _check_for_captcha(self, driver=None) -> bool:
+        """Check if Cloudflare CAPTCHA is present (on ``driver``, default the active one)."""
         try:
-            page_source = self.driver.page_source
+            page_source = (driver or self.driver).page_source
             # First check if we have job data - if yes, no CAPTCHA
             if 'window.mosaic.providerData' in page_source:
                 return False
@@ -110,21 +220,18 @@ class IndeedScraperV3:
         except:
             return False
     
-    def _wait_for_captcha_solve(self, timeout: int = 60):
-        """Wait for user to solve CAPTCHA manually."""
-        print(f"\n⚠️  CAPTCHA detected! Please solve it in the browser...")
-        print(f"    Waiting up to {timeout} seconds...")
-        
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            if not self._check_for_captcha():
-                print("    ✓ CAPTCHA solved!")
-                time.sleep(2)
-                return True
-            time.sleep(2)
-        
-        print("    ❌ Timeout waiting for CAPTCHA solve")
-        return False
+    def _park_challenged_browser(self, page_number: int, url: str):
+        """Move the challenged browser into the attention pool and drop it from this session."""
+        proxy_key = self.current_session.proxy.get('server', 'unknown') if self.current_session else 'none'
+        self.captcha_pool.park(self.driver, proxy_key, page_number, url)
+        # The next session launches a fresh browser; the parked one is the pool's now
+        self.driver = None
+        self.human_behavior = None
+    
+    def _on_challenge_solved(self, entry):
+        """Let a proxy whose parked browser got past its challenge back into rotation."""
+        if self.session_manager:
+            self.session_manager.clear_cooldown(entry.proxy_key)
     
     def _simulate_human_behavior(self):
         """Simulate human-like behavior using dedicated simulator."""
@@ -139,33 +246,27 @@ class IndeedScraperV3:
             self.driver.execute_script(f"window.scrollBy(0, -{scroll_amount // 2});")
             time.sleep(random.uniform(0.3, 0.8))
     
-    def _scrape_page(self, page_number: int) -> List[Dict]:
-        """Scrape a single page with session-based approach."""
+    def _scrape_page(self, page_number: int) -> List[JobRecord]:
+        """
+        Scrape a single page with session-based approach.
+        
+        Raises PageFailed (CAPTCHA, empty JSON, navigation timeout, proxy
+        auth failure, renderer crash) when the page must be retried.
+        """
         url = self._build_page_url(page_number)
-        jobs = []
         
         print(f"  📄 Scraping page {page_number}... ", end='', flush=True)
         
         try:
-            # Navigate to page
+            # Navigate to page once the proxy/domain/global budgets allow it
+            waited = self.session_manager.acquire_request_slot(url)
+            if waited > 0.5:
+                print(f"(paced {waited:.1f}s) ", end='', flush=True)
             self.driver.get(url)
             
             # Initial wait for page load (optimized)
             time.sleep(random.uniform(1.5, 3.0))
-            
-            # Check for CAPTCHA immediately
-            if self._check_for_captcha():
-                print("🛡️ CAPTCHA detected!")
-                if self.session_manager:
-                    self.session_manager.record_failure(is_captcha=True)
-                
-                if not self._wait_for_captcha_solve():
-                    print("❌ Failed - CAPTCHA not solved")
-                    return []
-            
-            # Check page title
-            page_title = self.driver.title
-            print(f"(title: {page_title[:30]}...) ", end='', flush=True)
+            self._check_arrival(page_number, url)
             
             # Enhanced human behavior simulation
             if self.human_behavior:
@@ -173,216 +274,181 @@ class IndeedScraperV3:
             else:
                 self._simulate_human_behavior()
             
-            # Wait for job cards with multiple strategies (optimized timeout)
-            selectors_to_try = [
-                (By.CLASS_NAME, "job_seen_beacon"),
-                (By.CSS_SELECTOR, "[data-jk]"),
-                (By.CSS_SELECTOR, "td.resultContent"),
-                (By.CSS_SELECTOR, "h2.jobTitle"),
-                (By.ID, "mosaic-provider-jobcards"),
-            ]
-            
-            element_found = False
-            for selector_type, selector_value in selectors_to_try:
-                try:
-                    WebDriverWait(self.driver, 4).until(
-                        EC.presence_of_element_located((selector_type, selector_value))
-                    )
-                    element_found = True
-                    print(f"(found: {selector_value}) ", end='', flush=True)
-                    break
-                except TimeoutException:
-                    continue
-            
-            if not element_found:
-                print("(no job elements found) ", end='', flush=True)
-                if self.session_manager:
-                    self.session_manager.record_failure()
-                return []
-            
-            # OPTIMIZATION: Stop page loading once we have the job data (saves 20-40%)
-            try:
-                self.driver.execute_script("window.stop();")
-            except:
-                pass  # Ignore if already stopped
+            job_count, jobs = self._collect_page_jobs(page_number, self._page_html(page_number))
             
-            # Get page HTML
-            html = self.driver.page_source
-            
-            # Extract jobs from JSON data embedded in the page
-            extracted_jobs = self._extract_jobs_from_json(html)
-            
-            if extracted_jobs:
-                print(f"Found {len(extracted_jobs)} jobs from JSON")
-                
-                # Simulate human browsing behavior for the found jobs (optimized timing)
-                if self.human_behavior:
-                    browse_time = self.human_behavior.simulate_job_browsing_fast(len(extracted_jobs))
-                    print(f"   ⏱️ Browsed jobs for {browse_time:.1f} seconds")
-                
-                for job in extracted_jobs:
-                    job['scraped_from_page'] = page_number
-                    jobs.append(job)
-                
-                # Record success with session manager
-                if self.session_manager:
-                    self.session_manager.record_success()
-            else:
-                print("⚠️ No jobs found in JSON data")
-                if self.session_manager:
-                    self.session_manager.record_failure()
+            # Simulate human browsing behavior for the found jobs (optimized timing)
+            if self.human_behavior:
+                prefetch = self._start_prefetch()
+                browse_time = self.human_behavior.simulate_job_browsing_fast(job_count)
+                print(f"   ⏱️ Browsed jobs for {browse_time:.1f} seconds")
+                self._finish_prefetch(prefetch)
             
+            self._record_page_success()
+        
+        except PageFailed:
+            raise
         except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            if self.session_manager:
-                self.session_manager.record_failure()
+            raise self._page_error(e) from e
         
         return jobs
     
-    def _extract_jobs_from_json(self, html_content: str) -> List[Dict]:
-        """Extract job data from the JSON embedded in the page with proper field normalization"""
-        try:
-            import json
-            import re
-            from html import unescape
-            
-            # Find the JSON data in the script tag
-            pattern = r'window\.mosaic\.providerData\["mosaic-provider-jobcards"\]\s*=\s*({.*?});'
-            match = re.search(pattern, html_content, re.DOTALL)
-            
-            if not match:
-                return []
-            
-            json_str = match.group(1)
-            data = json.loads(json_str)
-            
-            # Navigate to the jobs array
-            jobs_data = []
-            if 'metaData' in data and 'mosaicProviderJobCardsModel' in data['metaData']:
-                model = data['metaData']['mosaicProviderJobCardsModel']
-                if 'results' in model:
-                    jobs_data = model['results']
-            
-            # Extract data from each job
-            extracted_jobs = []
-            for job in jobs_data:
-                try:
-                    job_id = job.get('jobkey', '')
-                    title = job.get('title', 'Not mentioned')
-                    company = job.get('company', 'Not mentioned')
-                    
-                    # Extract location
-                    location = 'Not mentioned'
-                    if 'formattedLocation' in job:
-                        location = job['formattedLocation']
-                    elif 'location' in job:
-                        location = job['location']
-                    
-                    # ===== EXTRACT SALARY WITH PERIOD DETECTION =====
-                    # Handles: $55 - $75 an hour, $95k–$125k, $95,000/year, $140,000 - $150,000 a year
-                    salary = 'Not mentioned'
-                    salary_period = 'Not mentioned'
-                    
-                    if 'extractedSalary' in job:
-                        sal_data = job['extractedSalary']
-                        # Get salary type (hourly, yearly, etc.)
-                        if 'type' in sal_data:
-                            sal_type = sal_data['type'].lower()
-                            if 'hour' in sal_type:
-                                salary_period = 'hour'
-                            elif 'year' in sal_type or 'annual' in sal_type:
-                                salary_period = 'year'
-                            elif 'month' in sal_type:
-                                salary_period = 'month'
-                            elif 'week' in sal_type:
-                                salary_period = 'week'
-                        
-                        # Build salary string
-                        if 'max' in sal_data and sal_data.get('max'):
-                            salary = f"${sal_data.get('min', 0):,.0f} - ${sal_data['max']:,.0f}"
-                        elif 'min' in sal_data and sal_data.get('min'):
-                            salary = f"${sal_data['min']:,.0f}"
-                    
-                    # Fallback to salarySnippet text
-                    if not salary and 'salarySnippet' in job:
-                        snippet = job['salarySnippet']
-                        if 'text' in snippet:
-                            salary_text = snippet['text']
-                            salary = salary_text
-                            
-                            # Detect period from salary text
-                            salary_lower = salary_text.lower()
-                            if 'hour' in salary_lower or '/hr' in salary_lower:
-                                salary_period = 'hour'
-                            elif 'year' in salary_lower or '/yr' in salary_lower or 'annual' in salary_lower:
-                                salary_period = 'year'
-                            elif 'month' in salary_lower or '/mo' in salary_lower:
-                                salary_period = 'month'
-                            elif 'week' in salary_lower or '/wk' in salary_lower:
-                                salary_period = 'week'
-                    
-                    # ===== EXTRACT JOB TYPE (NOT POSTED DATE!) =====
-                    # Job types: Full-time, Part-time, Contract, Internship, Temporary
-                    # Check BOTH jobTypes field AND taxonomyAttributes
-                    job_type = 'Not mentioned'
-                    
-                    # Method 1: Check jobTypes field (most reliable)
-                    if 'jobTypes' in job and job['jobTypes']:
-                        job_type = ', '.join(job['jobTypes'])
-                    
-                    # Method 2: Check taxonomyAttributes if jobTypes is empty
-                    elif 'taxonomyAttributes' in job:
-                        for attr in job['taxonomyAttributes']:
-                            if attr.get('label') == 'job-types' and attr.get('attributes'):
-                                # Extract job type labels from attributes
-                                types = [a['label'] for a in attr['attributes'] if 'label' in a]
-                                if types:
-                                    job_type = ', '.join(types)
-                                    break
-                    
-                    # ===== EXTRACT POSTED DATE =====
-                    # This is separate from job type! (e.g., "30+ days ago", "2 days ago")
-                    posted_date = 'Not mentioned'
-                    if 'formattedRelativeTime' in job:
-                        posted_date = job['formattedRelativeTime']
-                    
-                    # ===== EXTRACT AND CLEAN SUMMARY =====
-                    # Remove HTML tags and get clean text
-                    summary = job.get('snippet', 'No description')
-                    
-                    if summary and summary != 'No description':
-                        # Remove HTML tags
-                        summary = re.sub(r'<[^>]+>', '', summary)
-                        # Decode HTML entities (e.g., &amp; -> &)
-                        summary = unescape(summary)
-                        # Clean up whitespace
-                        summary = re.sub(r'\s+', ' ', summary).strip()
-                        # Remove bullet point markers
-                        summary = summary.replace('•', '').replace('◦', '')
-                        summary = summary.strip()
-                    
-                    # Build URL
-                    job_url = f"https://www.indeed.com/viewjob?jk={job_id}" if job_id else 'Not mentioned'
-                    
-                    extracted_jobs.append({
-                        'title': title,
-                        'company': company,
-                        'location': location,
-                        'salary': salary,
-                        'salary_period': salary_period,
-                        'job_type': job_type,
-                        'posted_date': posted_date,
-                        'summary': summary,
-                        'url': job_url
-                    })
-                    
-                except Exception as e:
-                    continue
-            
-            return extracted_jobs
+    # ----- Page steps shared with the async scraper (blocking; it runs them in its executor) -----
+    
+    def _check_arrival(self, page_number: int, url: str):
+        """Check a freshly loaded page; on a CAPTCHA park the browser and raise PageFailed."""
+        # Check for CAPTCHA immediately; park the browser and requeue the page
+        if self._check_for_captcha():
+            print("🛡️ CAPTCHA detected!")
+            if self.session_manager:
+                self.session_manager.record_failure(is_captcha=True)
             
+            self._park_challenged_browser(page_number, url)
+            raise PageFailed(PageErrorKind.CAPTCHA)
+        
+        # Check page title
+        page_title = self.driver.title
+        print(f"(title: {page_title[:30]}...) ", end='', flush=True)
+    
+    def _page_html(self, page_number: int) -> str:
+        """The page's HTML (or its prefetched payload) once its jobs are there; raises PageFailed if they never appear."""
+        # A prefetched page's jobs are already in hand; don't wait for it to render
+        prefetched = self._prefetched.pop(page_number, None)
+        if prefetched:
+            print("(prefetched) ", end='', flush=True)
+        elif not self._wait_for_job_elements():
+            print("(no job elements found) ", end='', flush=True)
+            if self.session_manager:
+                self.session_manager.record_failure(empty=True)
+            raise PageFailed(PageErrorKind.EMPTY_JSON, "no job elements")
+        
+        # OPTIMIZATION: Stop page loading once we have the job data (saves 20-40%)
+        try:
+            self.driver.execute_script("window.stop();")
+        except:
+            pass  # Ignore if already stopped
+        
+        return prefetched or self.driver.page_source
+    
+    def _collect_page_jobs(self, page_number: int, html: str) -> Tuple[int, List[JobRecord]]:
+        """_collect_jobs, raising PageFailed when the page carries no jobs."""
+        # Extract (or queue) the page's jobs
+        job_count, jobs = self._collect_jobs(page_number, html)
+        if not job_count:
+            print("⚠️ No jobs found in JSON data")
+            if self.session_manager:
+                self.session_manager.record_failure(empty=True)
+            raise PageFailed(PageErrorKind.EMPTY_JSON, "no jobs in JSON data")
+        return job_count, jobs
+    
+    def _record_page_success(self):
+        """Record success with session manager."""
+        if self.session_manager:
+            self.session_manager.record_success()
+    
+    def _page_error(self, error: Exception) -> PageFailed:
+        """Record an unexpected page error and turn it into the PageFailed to raise."""
+        print(f"❌ Error: {str(error)}")
+        if self.session_manager:
+            self.session_manager.record_failure()
+        return self._page_failure(error)
+    
+    def _page_failure(self, error: Exception) -> PageFailed:
+        """Classify a driver error; a crashed browser is dropped so the retry gets a new one."""
+        kind = classify_error(error)
+        if kind == PageErrorKind.RENDERER_CRASH and self.driver:
+            self._quit_driver(self.driver)
+            self.driver = None
+            self.human_behavior = None
+        lines = str(error).strip().splitlines()
+        return PageFailed(kind, lines[0] if lines else type(error).__name__)
+    
+    def _start_prefetch(self) -> Optional[Tuple[int, PagePrefetcher]]:
+        """Start fetching the session's next page in the background, budgets permitting."""
+        page_number = self._upcoming_page
+        if not self.prefetch_next or page_number is None or page_number in self._prefetched:
+            return None
+        
+        # The prefetch is a real request to the site, so it needs its own slot;
+        # rather than stall the dwell, skip it when none is free
+        url = self._build_page_url(page_number)
+        if self.session_manager.try_acquire_request_slot(url) > 0:
+            return None
+        
+        prefetcher = PagePrefetcher(self.driver)
+        return (page_number, prefetcher) if prefetcher.start(url) else None
+    
+    def _finish_prefetch(self, prefetch: Optional[Tuple[int, PagePrefetcher]]):
+        """Keep the prefetched page's job payload for when it is visited."""
+        if not prefetch:
+            return
+        page_number, prefetcher = prefetch
+        payload = prefetcher.collect()
+        if payload:
+            self._prefetched[page_number] = payload
+            print(f"   ⚡ Prefetched page {page_number}")
+    
+    def _wait_for_job_elements(self) -> bool:
+        """Wait for job cards with multiple strategies (optimized timeout)."""
+        selectors_to_try = [
+            (By.CLASS_NAME, "job_seen_beacon"),
+            (By.CSS_SELECTOR, "[data-jk]"),
+            (By.CSS_SELECTOR, "td.resultContent"),
+            (By.CSS_SELECTOR, "h2.jobTitle"),
+            (By.ID, "mosaic-provider-jobcards"),
+        ]
+        
+        for selector_type, selector_value in selectors_to_try:
+            try:
+                WebDriverWait(self.driver, 4).until(
+                    EC.presence_of_element_located((selector_type, selector_value))
+                )
+                print(f"(found: {selector_value}) ", end='', flush=True)
+                return True
+            except TimeoutException:
+                continue
+        
+        return False
+    
+    def _collect_jobs(self, page_number: int, html: str, url: Optional[str] = None) -> Tuple[int, List[JobRecord]]:
+        """
+        Extract the page's jobs, or queue them on the extraction pipeline.
+        
+        Returns (job_count, jobs available now); queued pages report an
+        estimated count and deliver their jobs later.
+        """
+        payload = extract_payload(html) if self.extraction is not None or self.archive else None
+        if payload and self.archive:
+            self._archive_page(url or self._build_page_url(page_number), page_number, payload)
+        
+        # With an extraction pipeline only the payload is cut out here;
+        # a worker process parses it while we navigate on
+        if self.extraction is not None:
+            if not payload:
+                return 0, []
+            job_count = payload.count('"jobkey"')
+            self.extraction.submit(page_number, payload)
+            print(f"Queued ~{job_count} jobs for extraction")
+            return job_count, []
+        
+        # Extract jobs from JSON data embedded in the page
+        extracted_jobs = self._extract_jobs_from_json(html)
+        if extracted_jobs:
+            print(f"Found {len(extracted_jobs)} jobs from JSON")
+        
+        for job in extracted_jobs:
+            job.scraped_from_page = page_number
+        
+        return len(extracted_jobs), extracted_jobs
+    
+    def _archive_page(self, url: str, page_number: int, payload: str):
+        try:
+            self.archive.store(url, page_number, payload)
         except Exception as e:
-            return []
+            print(f"⚠️ Could not archive page {page_number}: {e}")
+    
+    def _extract_jobs_from_json(self, html_content: str) -> List[JobRecord]:
+        """Extract job data from the JSON embedded in the page with proper field normalization"""
+        return extract_jobs_from_html(html_content)
     
     def _extract_job_data(self, card, page_number: int) -> Optional[Dict]:
         """Extract job information from card."""
@@ -455,14 +521,15 @@ class IndeedScraperV3:
                 'url': job_url,
                 'scraped_from_page': page_number
             }
-            
+        
         except Exception as e:
             return None
     
-    def scrape_all_pages(self) -> List[Dict]:
+    def scrape_all_pages(self) -> ResultBuffer:
         """Scrape all pages using session-based proxy rotation."""
-        all_jobs = []
-        pages_scraped = 0
+        all_jobs = ResultBuffer()
+        pending_pages = self._pending_pages = deque(range(self.start_page, self.start_page + self.page_count))
+        page_attempts = self._page_attempts = {}
         
         try:
             print("🚀 Starting session-based scraping...")
@@ -472,7 +539,7 @@ class IndeedScraperV3:
                 pool_status = self.session_manager.get_proxy_pool_status()
                 print(f"� Proxy pool: {pool_status['healthy_proxies']}/{pool_status['total_proxies']} healthy proxies")
             
-            while pages_scraped < self.page_count:
+            while not self._stop_requested.is_set() and (pending_pages or self._await_extraction(all_jobs)):
                 # Check if we need a new session
                 if not self.current_session or self.session_manager.should_rotate_session():
                     self._start_new_session()
@@ -481,86 +548,238 @@ class IndeedScraperV3:
                         print("❌ No healthy proxies available. Stopping.")
                         break
                 
-                # Calculate pages remaining in this session
-                pages_remaining_in_session = min(
-                    self.current_session.max_pages - self.current_session.pages_scraped,
-                    self.page_count - pages_scraped
-                )
-                
-                print(f"\n🔄 Session: {self.current_session.session_id}")
-                print(f"   Proxy: {self.current_session.proxy.get('server', 'unknown')}")
-                print(f"   Pages in session: {self.current_session.pages_scraped}/{self.current_session.max_pages}")
-                print(f"   Will scrape {pages_remaining_in_session} more pages")
+                pages_remaining_in_session = self._pages_for_session(pending_pages)
+                backoff = None
                 
                 # Scrape pages in this session
                 for session_page in range(pages_remaining_in_session):
-                    page_num = pages_scraped + 1
+                    if self._stop_requested.is_set():
+                        break
+                    page_num = pending_pages.popleft()
                     
                     # Add session break between pages (except first page of session)
                     if session_page > 0 and self.human_behavior:
                         self.human_behavior.simulate_session_break()
                     
-                    jobs = self._scrape_page(page_num)
-                    all_jobs.extend(jobs)
-                    pages_scraped += 1
-                    
-                    print(f"  ✓ Page {page_num} complete: {len(jobs)} jobs scraped")
-                    
-                    # Check if session was terminated due to CAPTCHA
-                    if self.current_session and not self.current_session.is_active:
-                        print("   🛡️ Session terminated due to CAPTCHA")
+                    self._recycle_browser_if_needed()
+                    self._upcoming_page = self._next_session_page(pending_pages, session_page, pages_remaining_in_session)
+                    try:
+                        jobs = self._scrape_page(page_num)
+                    except PageFailed as failure:
+                        backoff = self._handle_failed_page(page_num, failure, pending_pages, page_attempts)
                         break
                     
-                    # Inter-page delay within session (optimized)
-                    if session_page < pages_remaining_in_session - 1:
-                        delay = random.uniform(1, 3)
-                        time.sleep(delay)
+                    if not self._finish_page(page_num, jobs, all_jobs):
+                        break
                 
-                # End session
-                if self.current_session:
-                    successful = not self.current_session.captcha_triggered
-                    self.current_session.end_session(successful=successful)
+                self._end_session(successful=backoff is None)
+                if backoff:
+                    time.sleep(backoff)
             
-            # Save proxy statistics
-            if self.session_manager:
-                self.session_manager.save_proxy_stats("proxy_stats.json")
-                
-                # Display final stats
-                final_status = self.session_manager.get_proxy_pool_status()
-                print(f"\n📊 Final proxy pool status:")
-                print(f"   Sessions completed: {final_status['sessions_completed']}")
-                print(f"   Healthy proxies: {final_status['healthy_proxies']}/{final_status['total_proxies']}")
-                
-                for health, count in final_status['health_distribution'].items():
-                    if count > 0:
-                        print(f"   {health}: {count}")
+            self._report_pool_status()
         
         except Exception as e:
             print(f"\n❌ Error during scraping: {str(e)}")
         finally:
-            if self.driver:
-                print("\n🔒 Closing browser...")
-                try:
-                    self.driver.quit()
-                except:
-                    pass
+            self._close_run(all_jobs)
         
         print(f"\n  📊 Total jobs scraped: {len(all_jobs)}")
         return all_jobs
     
+    @property
+    def unfinished_pages(self) -> List[int]:
+        """
+        Pages of the run neither delivered nor dead-lettered.
+        
+        Non-empty after a run that stopped early: stop(), no healthy
+        proxies left, or an unexpected error (scrape_all_pages reports
+        those rather than raising).
+        """
+        dead = {letter.page_number for letter in self.dead_letters}
+        return [page for page in range(self.start_page, self.start_page + self.page_count)
+                if page not in self.delivered_pages and page not in dead]
+    
+    def stop(self):
+        """Ask a running scrape to stop after the page in hand (thread-safe)."""
+        self._stop_requested.set()
+    
+    def _pages_for_session(self, pending_pages: Deque[int]) -> int:
+        """Calculate (and announce) how many pages the current session will scrape."""
+        pages_remaining_in_session = min(
+            self.current_session.max_pages - self.current_session.pages_scraped,
+            len(pending_pages)
+        )
+        
+        print(f"\n🔄 Session: {self.current_session.session_id}")
+        print(f"   Proxy: {self.current_session.proxy.get('server', 'unknown')}")
+        print(f"   Pages in session: {self.current_session.pages_scraped}/{self.current_session.max_pages}")
+        print(f"   Will scrape {pages_remaining_in_session} more pages")
+        return pages_remaining_in_session
+    
+    @staticmethod
+    def _next_session_page(pending_pages: Deque[int], session_page: int,
+                           pages_in_session: int) -> Optional[int]:
+        """The page this session visits after the current one, if any."""
+        if pending_pages and session_page + 1 < pages_in_session:
+            return pending_pages[0]
+        return None
+    
+    def _handle_failed_page(self, page_num: int, failure: PageFailed, pending_pages: Deque[int],
+                            page_attempts: Dict[int, int], url: Optional[str] = None) -> float:
+        """
+        Requeue a failed page for the next session, or dead-letter it.
+        
+        The session that failed it is ended by the caller. Returns the
+        backoff to wait before that next session (0 once the page has been
+        dead-lettered).
+        """
+        attempts = page_attempts[page_num] = page_attempts.get(page_num, 0) + 1
+        limit = MAX_ATTEMPTS.get(failure.kind, self.max_page_attempts)
+        
+        if attempts < limit:
+            delay = 0.0
+            if failure.kind not in NO_BACKOFF:
+                delay = backoff_delay(attempts, self.retry_backoff, self.max_retry_backoff)
+            print(f"  ↩️ Page {page_num} failed ({failure.kind.value}); "
+                  f"requeued, attempt {attempts}/{limit}")
+            pending_pages.appendleft(page_num)
+            return delay
+        
+        print(f"  ❌ Page {page_num} failed {attempts} times (last: {failure.kind.value}), dead-lettered")
+        self.dead_letters.append(DeadLetter(
+            page_num, url or self._build_page_url(page_num), failure.kind, attempts, failure.message
+        ))
+        return 0.0
+    
+    def _report_dead_letters(self):
+        """Print the pages that used up their retries."""
+        if not self.dead_letters:
+            return
+        print(f"\n📮 {len(self.dead_letters)} page(s) dead-lettered after retries:")
+        for letter in self.dead_letters:
+            print(f"   Page {letter.page_number}: {letter.kind.value} x{letter.attempts} "
+                  f"{letter.error[:60]} ({letter.url})")
+    
+    def _finish_page(self, page_num: int, jobs: List[JobRecord], all_jobs: ResultBuffer) -> bool:
+        """Deliver a scraped page; returns False when the session just ended."""
+        # Pages handed to the extraction pipeline are delivered once parsed
+        if not (self.extraction is not None and self.extraction.has_page(page_num)):
+            self._deliver_page(page_num, jobs, all_jobs)
+        self._deliver_extracted(all_jobs)
+        
+        # Check if session was terminated due to CAPTCHA
+        if self.current_session and not self.current_session.is_active:
+            print("   🛡️ Session terminated due to CAPTCHA")
+            return False
+        return True
+    
+    def _end_session(self, successful: bool = True):
+        """End the current session, successful unless it failed a page or hit a CAPTCHA."""
+        # A prefetch belongs to the session's page plan; a requeued or later
+        # page is fetched afresh on the next session's proxy
+        self._prefetched.clear()
+        if self.current_session:
+            successful = successful and not self.current_session.captcha_triggered
+            self.current_session.end_session(successful=successful)
+    
+    def _report_pool_status(self):
+        """Save proxy statistics and print the final pool status."""
+        if self.session_manager:
+            if self.stats_path:
+                self.session_manager.save_proxy_stats(self.stats_path)
+            
+            # Display final stats
+            final_status = self.session_manager.get_proxy_pool_status()
+            print(f"\n📊 Final proxy pool status:")
+            print(f"   Sessions completed: {final_status['sessions_completed']}")
+            print(f"   Healthy proxies: {final_status['healthy_proxies']}/{final_status['total_proxies']}")
+            
+            for health, count in final_status['health_distribution'].items():
+                if count > 0:
+                    print(f"   {health}: {count}")
+    
+    def _close_run(self, all_jobs: ResultBuffer):
+        """Close the browser and background helpers at the end of a run."""
+        if self.driver:
+            print("\n🔒 Closing browser...")
+            self._quit_driver(self.driver)
+        
+        if self.extraction is not None:
+            self._deliver_extracted(all_jobs, wait=True)
+            self.extraction.shutdown()
+        
+        pool = self.captcha_pool
+        if pool.solved_count or pool.expired_count or pool.pending():
+            print(f"🅿️ Challenged browsers: {pool.solved_count} solved, {pool.expired_count} expired, "
+                  f"{len(pool.pending())} still parked (closing)")
+        pool.shutdown()
+        self.watchdog.shutdown()
+        self._report_dead_letters()
+        
+        if self.session_manager:
+            self.session_manager.shutdown()
+    
+    def _deliver_page(self, page_num: int, jobs: List[JobRecord], all_jobs: ResultBuffer):
+        """Collect a finished page's jobs and hand them to the page callback."""
+        all_jobs.extend(jobs)
+        self.delivered_pages.add(page_num)
+        
+        if self.page_callback:
+            self.page_callback(page_num, jobs)
+        
+        print(f"  ✓ Page {page_num} complete: {len(jobs)} jobs scraped")
+    
+    def _deliver_extracted(self, all_jobs: ResultBuffer, wait: bool = False):
+        """
+        Deliver pages the extraction pipeline has finished (all of them if ``wait``).
+        
+        Pages whose worker failed or found no jobs are requeued (or
+        dead-lettered) like any other failed page. The proxy already served
+        them, so the session goes on and no backoff applies.
+        """
+        if self.extraction is None:
+            return
+        
+        for page_num, jobs, error in (self.extraction.drain() if wait else self.extraction.completed()):
+            if jobs:
+                self._deliver_page(page_num, jobs, all_jobs)
+            elif error is not None:
+                self._handle_failed_page(page_num, PageFailed(PageErrorKind.OTHER, f"extraction failed: {error}"),
+                                         self._pending_pages, self._page_attempts)
+            else:
+                self._handle_failed_page(page_num, PageFailed(PageErrorKind.EMPTY_JSON, "no jobs parsed"),
+                                         self._pending_pages, self._page_attempts)
+    
+    def _await_extraction(self, all_jobs: ResultBuffer) -> bool:
+        """Wait for the pages still being parsed; True if any came back for a retry."""
+        self._deliver_extracted(all_jobs, wait=True)
+        return bool(self._pending_pages)
+    
     def _start_new_session(self):
         """Start a new scraping session with fresh proxy."""
+        # Reuse the running browser by switching its proxy, unless the last
+        # session was burned by a CAPTCHA (its fingerprint is flagged)
+        reuse_browser = (
+            self.driver is not None
+            and self.session_manager is not None
+            and not (self.current_session and self.current_session.captcha_triggered)
+        )
+        
+        if reuse_browser:
+            self.current_session = self.session_manager.start_new_session(driver=self.driver)
+            if self.current_session and self.current_session.browser_reused:
+                print("♻️ Reusing browser with switched proxy")
+                self.human_behavior = HumanBehaviorSimulator(self.driver, headless=self.headless)
+                return
+        
         # Clean up previous session
         if self.driver:
-            try:
-                self.driver.quit()
-            except:
-                pass
+            self._quit_driver(self.driver)
             self.driver = None
             self.human_behavior = None
         
         # Start new session
-        if self.session_manager:
+        if self.session_manager and not reuse_browser:
             self.current_session = self.session_manager.start_new_session()
         
         if self.current_session:
@@ -569,9 +788,9 @@ class IndeedScraperV3:
             self.driver = self._init_driver(self.current_session)
             
             # Initialize human behavior simulator
-            self.human_behavior = HumanBehaviorSimulator(self.driver)
+            self.human_behavior = HumanBehaviorSimulator(self.driver, headless=self.headless)
         else:
             # Fallback: no session manager or no proxies
             print("🚀 Starting browser without proxy session...")
             self.driver = self._init_driver()
-            self.human_behavior = HumanBehaviorSimulator(self.driver) if self.driver else None
+            self.human_behavior = HumanBehaviorSimulator(self.driver, headless=self.headless) if self.driver else None
@@ -4,15 +4,27 @@ Session-Based Proxy Management System
 Manages proxy sessions with health tracking, rotation, and anti-detection features.
 """
 
+import os
+import socket
 import time
+import math
 import random
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import threading
 from proxy_auth_manager import ProxyAuthManager
+from proxy_health import ProxyHealthChecker, ProbeResult, DEFAULT_CHECK_URL
+from proxy_index import ProxyIndex
+from proxy_leases import ProxyLeaseManager
+from rate_limiter import RateLimiter
+from pacing import AdaptivePacer
+from proxy_stats_table import (
+    ProxyStatsTable, REACHABLE_UNKNOWN, MIN_SUCCESS_RATE, MAX_CONSECUTIVE_FAILURES,
+    DEFAULT_COOLDOWN_SECONDS
+)
 
 
 class ProxyHealth(Enum):
@@ -24,20 +36,83 @@ class ProxyHealth(Enum):
     BLACKLISTED = 1 # Permanently banned/unusable
 
 
-@dataclass
+def _column_property(name: str, cast):
+    """Expose a numeric stats column as a read/write attribute."""
+    def getter(self):
+        return cast(self._table.columns[name][self._row])
+    
+    def setter(self, value):
+        self._table.columns[name][self._row] = value
+    
+    return property(getter, setter)
+
+
+def _timestamp_property(name: str):
+    """Expose an epoch-seconds column as Optional[datetime]."""
+    def getter(self) -> Optional[datetime]:
+        value = self._table.columns[name][self._row]
+        return None if math.isnan(value) else datetime.fromtimestamp(value)
+    
+    def setter(self, value: Optional[datetime]):
+        self._table.columns[name][self._row] = value.timestamp() if value else math.nan
+    
+    return property(getter, setter)
+
+
 class ProxyStats:
-    """Statistics and health tracking for a proxy."""
-    success_count: int = 0
-    failure_count: int = 0
-    captcha_count: int = 0
-    avg_response_time: float = 0.0
-    last_used: Optional[datetime] = None
-    last_failure: Optional[datetime] = None
-    consecutive_failures: int = 0
-    health_score: ProxyHealth = ProxyHealth.EXCELLENT
-    total_sessions: int = 0
-    successful_sessions: int = 0
-    cooldown_until: Optional[datetime] = None
+    """
+    Statistics and health tracking for a proxy.
+    
+    A thin view onto one row of a ProxyStatsTable; constructing it without a
+    table gives a standalone single-row table.
+    """
+    __slots__ = ('_table', '_row')
+    
+    success_count = _column_property("success_count", int)
+    failure_count = _column_property("failure_count", int)
+    captcha_count = _column_property("captcha_count", int)
+    avg_response_time = _column_property("avg_response_time", float)
+    last_used = _timestamp_property("last_used")
+    last_failure = _timestamp_property("last_failure")
+    consecutive_failures = _column_property("consecutive_failures", int)
+    total_sessions = _column_property("total_sessions", int)
+    successful_sessions = _column_property("successful_sessions", int)
+    cooldown_until = _timestamp_property("cooldown_until")
+    last_probe = _timestamp_property("last_probe")
+    cooldown_seconds = _column_property("cooldown_seconds", float)
+    request_rate = _column_property("request_rate", float)
+    
+    def __init__(self, table: Optional[ProxyStatsTable] = None, row: Optional[int] = None):
+        if table is None:
+            table = ProxyStatsTable(capacity=1)
+        self._table = table
+        self._row = table.add() if row is None else row
+    
+    @property
+    def health_score(self) -> "ProxyHealth":
+        return ProxyHealth(int(self._table.columns["health_code"][self._row]))
+    
+    @health_score.setter
+    def health_score(self, value: "ProxyHealth"):
+        self._table.columns["health_code"][self._row] = value.value
+    
+    @property
+    def reachable(self) -> Optional[bool]:
+        """
+        Last background probe outcome (None = not probed yet), kept for reports.
+        
+        Selection asks the prober's cache instead, whose answers expire.
+        """
+        value = int(self._table.columns["reachable"][self._row])
+        return None if value == REACHABLE_UNKNOWN else bool(value)
+    
+    @reachable.setter
+    def reachable(self, value: Optional[bool]):
+        self._table.columns["reachable"][self._row] = REACHABLE_UNKNOWN if value is None else int(value)
+    
+    def record_latency(self, latency: float):
+        """Fold a latency sample into the EWMA response time."""
+        self._table.record_latency(self._row, latency)
     
     def success_rate(self) -> float:
         """Calculate success rate percentage."""
@@ -48,15 +123,19 @@ class ProxyStats:
         """Calculate session success rate percentage."""
         return (self.successful_sessions / self.total_sessions * 100) if self.total_sessions > 0 else 100.0
     
-    def is_healthy(self) -> bool:
+    def is_healthy(self, ignore_cooldown: bool = False) -> bool:
         """Check if proxy is healthy enough to use."""
         if self.health_score == ProxyHealth.BLACKLISTED:
             return False
-        if self.cooldown_until and datetime.now() < self.cooldown_until:
+        if not ignore_cooldown and self.cooldown_until and datetime.now() < self.cooldown_until:
             return False
-        if self.consecutive_failures >= 5:
+        if self.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
             return False
-        return self.success_rate() >= 30.0  # Minimum 30% success rate
+        return self.success_rate() >= MIN_SUCCESS_RATE  # Minimum 30% success rate
+    
+    def __repr__(self) -> str:
+        return (f"ProxyStats(success={self.success_count}, failure={self.failure_count}, "
+                f"captcha={self.captcha_count}, health={self.health_score.name})")
 
 
 @dataclass 
@@ -73,6 +152,9 @@ class ProxySession:
     session_cookies: Dict = field(default_factory=dict)
     is_active: bool = True
     captcha_triggered: bool = False
+    browser_reused: bool = False  # True when the previous browser was switched to this proxy
+    on_stats_change: Optional[Callable[[Dict], None]] = field(default=None, repr=False)
+    on_end: Optional[Callable[["ProxySession", bool], None]] = field(default=None, repr=False)
     
     def __post_init__(self):
         """Initialize session with random parameters."""
@@ -101,7 +183,7 @@ class ProxySession:
         session_age = datetime.now() - self.start_time
         if session_age > timedelta(minutes=30):
             return False
-            
+        
         return True
     
     def record_page_success(self):
@@ -113,6 +195,8 @@ class ProxySession:
         # Reset consecutive failures on success
         if self.stats.consecutive_failures > 0:
             self.stats.consecutive_failures = 0
+        
+        self._notify_stats_change()
     
     def record_page_failure(self, is_captcha: bool = False):
         """Record failed page scrape."""
@@ -126,8 +210,10 @@ class ProxySession:
             self.captcha_triggered = True
             self.is_active = False
             
-            # Apply cooldown for CAPTCHA
-            self.stats.cooldown_until = datetime.now() + timedelta(hours=2)
+            # Apply the proxy's (learned) cooldown for CAPTCHA
+            self.stats.cooldown_until = datetime.now() + timedelta(seconds=self.stats.cooldown_seconds)
+        
+        self._notify_stats_change()
     
     def end_session(self, successful: bool = True):
         """End the proxy session and update stats."""
@@ -140,6 +226,14 @@ class ProxySession:
         
         # Update health score based on session performance
         self._update_health_score()
+        if self.on_end:
+            self.on_end(self, successful and not self.captcha_triggered)
+        self._notify_stats_change()
+    
+    def _notify_stats_change(self):
+        """Let the session manager re-index this proxy."""
+        if self.on_stats_change:
+            self.on_stats_change(self.proxy)
     
     def _update_health_score(self):
         """Update proxy health score based on performance."""
@@ -183,119 +277,392 @@ class ProxySession:
 class SessionManager:
     """Manages multiple proxy sessions with intelligent rotation."""
     
-    def __init__(self, proxy_file: str = "proxies.txt"):
+    def __init__(self, proxy_file: str = "proxies.txt", check_url: str = DEFAULT_CHECK_URL,
+                 probe_interval: Optional[float] = 120.0, watch_interval: Optional[float] = 10.0,
+                 lease_manager: Optional[ProxyLeaseManager] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
         self.proxy_auth_manager = ProxyAuthManager(proxy_file)
         self.proxies = self.proxy_auth_manager.proxies
+        self.stats_table = ProxyStatsTable(capacity=max(len(self.proxies), 16))
         self.proxy_stats: Dict[str, ProxyStats] = {}
         self.current_session: Optional[ProxySession] = None
         self.session_history: List[Dict] = []
         self.lock = threading.Lock()
         
+        self.proxy_index = ProxyIndex()
+        self._proxy_by_key: Dict[str, Dict] = {}
+        
+        # Cross-process coordination (optional): exclusive proxy leases,
+        # shared counters and a global per-proxy request rate
+        self.lease_manager = lease_manager
+        self.owner_id = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self._leased_key: Optional[str] = None
+        self._shared_synced_at = 0.0
+        # Shared totals already folded into local stats, per proxy
+        self._shared_baseline: Dict[str, List[int]] = {}
+        
+        # Request pacing per proxy, per domain and for the whole process,
+        # with rates adapted to observed CAPTCHAs and empty pages
+        # A supplied limiter keeps its buckets but still gets the shared per-proxy budget
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(shared=lease_manager)
+        elif lease_manager:
+            rate_limiter.attach_shared(lease_manager)
+        self.rate_limiter = rate_limiter
+        self.pacer = AdaptivePacer(self.rate_limiter)
+        
         # Initialize proxy statistics
         for proxy in self.proxies:
             proxy_key = self._get_proxy_key(proxy)
-            self.proxy_stats[proxy_key] = ProxyStats()
+            self._proxy_by_key[proxy_key] = proxy
+            self.proxy_stats[proxy_key] = self._new_stats(proxy_key)
+            self.proxy_index.add(proxy_key, self.proxy_stats[proxy_key])
+        
+        # Shared counters so far become the baseline; only later deltas are folded in
+        if self.lease_manager:
+            with self.lock:
+                self._sync_shared_stats(seed=True)
+        
+        # Probe proxies in the background; results mark stats as they arrive.
+        # Liveness is cached for twice the probe interval.
+        cache_ttl = 2 * probe_interval if probe_interval else 300.0
+        self.health_checker = ProxyHealthChecker(
+            check_url=check_url,
+            cache_ttl=cache_ttl,
+            on_result=self._apply_probe_result
+        )
+        if probe_interval:
+            self.health_checker.start(lambda: list(self.proxies), interval=probe_interval)
+        
+        # Poll proxies.txt so the pool can grow or shrink mid-run
+        self._stop_watching = threading.Event()
+        if watch_interval:
+            threading.Thread(
+                target=self._watch_proxy_file,
+                args=(watch_interval,),
+                name="proxy-file-watcher",
+                daemon=True
+            ).start()
+    
+    def _apply_probe_result(self, result: ProbeResult):
+        """Record a background probe outcome in the proxy's stats."""
+        with self.lock:
+            stats = self.proxy_stats.get(result.proxy_key)
+            if not stats:
+                return
+            
+            stats.reachable = result.reachable
+            stats.last_probe = datetime.fromtimestamp(result.checked_at)
+            
+            if result.reachable and result.latency is not None:
+                stats.record_latency(result.latency)
+            
+            self.proxy_index.update(result.proxy_key)
+        
+        if not result.reachable:
+            print(f"🚫 Proxy {result.proxy_key} failed health probe ({result.error})")
     
     def _get_proxy_key(self, proxy: Dict) -> str:
         """Generate unique key for proxy."""
         return proxy.get('server', 'unknown')
     
-    def get_healthy_proxies(self) -> List[Dict]:
-        """Get list of healthy proxies available for use."""
-        healthy = []
+    def _new_stats(self, proxy_key: str) -> ProxyStats:
+        """Allocate a stats row for a proxy in the shared table."""
+        if self.stats_table.row_of(proxy_key) is not None:
+            return ProxyStats(self.stats_table, self.stats_table.row_of(proxy_key))
+        return ProxyStats(self.stats_table, self.stats_table.add(proxy_key))
+    
+    def _on_session_end(self, session: "ProxySession", successful: bool):
+        """Let the pacer adjust the proxy's learned cooldown."""
+        self.pacer.on_session_end(session.stats, successful)
+    
+    def _on_stats_change(self, proxy: Dict):
+        """Re-index a proxy after its session updated the stats."""
+        self.proxy_index.update(self._get_proxy_key(proxy))
+    
+    def _watch_proxy_file(self, interval: float):
+        """Background loop polling the proxy file for changes."""
+        while not self._stop_watching.wait(interval):
+            try:
+                self.refresh_proxies()
+            except Exception as e:
+                print(f"⚠️ Proxy file reload failed: {e}")
+    
+    def refresh_proxies(self) -> bool:
+        """
+        Apply additions/removals from the proxy file if it changed on disk.
         
-        for proxy in self.proxies:
-            proxy_key = self._get_proxy_key(proxy)
-            stats = self.proxy_stats.get(proxy_key)
+        Runs under the session lock. The live session keeps its proxy dict and
+        stats object even if its proxy was removed; it simply won't be picked
+        again, and its stats row is only reused after the session is over.
+        Returns True when the pool changed.
+        """
+        if not self.proxy_auth_manager.proxy_file_changed():
+            return False
+        
+        with self.lock:
+            added, removed = self.proxy_auth_manager.reload_proxies()
+            # A credential change shows up as removed + added under the same
+            # server; the proxy keeps its history
+            added_keys = {self._get_proxy_key(proxy) for proxy in added}
             
-            if stats and stats.is_healthy():
-                healthy.append(proxy)
+            for proxy in removed:
+                proxy_key = self._get_proxy_key(proxy)
+                if proxy_key in added_keys:
+                    continue
+                self._proxy_by_key.pop(proxy_key, None)
+                self.proxy_stats.pop(proxy_key, None)
+                self.stats_table.remove(proxy_key)
+                self.proxy_index.remove(proxy_key)
+            
+            # Reuse rows of removed proxies, except the live session's
+            in_use = [self.current_session.stats._row] if self.current_session else []
+            self.stats_table.recycle(in_use)
+            
+            for proxy in added:
+                proxy_key = self._get_proxy_key(proxy)
+                self._proxy_by_key[proxy_key] = proxy
+                if proxy_key in self.proxy_stats:
+                    continue
+                stats = self._new_stats(proxy_key)
+                self.proxy_stats[proxy_key] = stats
+                self.proxy_index.add(proxy_key, stats)
         
-        # OPTIMIZATION: Sort by health score, success rate, AND response time (fastest first)
-        healthy.sort(key=lambda p: (
-            self.proxy_stats[self._get_proxy_key(p)].health_score.value,
-            self.proxy_stats[self._get_proxy_key(p)].success_rate(),
-            -self.proxy_stats[self._get_proxy_key(p)].avg_response_time if self.proxy_stats[self._get_proxy_key(p)].avg_response_time > 0 else 0
-        ), reverse=True)
+        if added:
+            # Forced, so changed credentials aren't answered from the old probe
+            self.health_checker.check_all(added, force=True)
         
-        return healthy
+        return bool(added or removed)
     
-    def start_new_session(self) -> Optional[ProxySession]:
-        """Start a new proxy session with best available proxy."""
+    def _is_reachable(self, proxy_key: str) -> bool:
+        """
+        Not known to be down, per the health checker's cache.
+        
+        A failed probe excludes the proxy only for the cache TTL; unlike the
+        stats' last probe outcome it never outlives its evidence.
+        """
+        return self.health_checker.is_reachable(proxy_key) is not False
+    
+    def get_healthy_proxies(self) -> List[Dict]:
+        """Get list of healthy proxies available for use, best first."""
+        # Sorted by health score, success rate and response time (fastest first)
+        return [self._proxy_by_key[key] for key in self.proxy_index.ranked()
+                if key in self._proxy_by_key and self._is_reachable(key)]
+    
+    def start_new_session(self, driver=None) -> Optional[ProxySession]:
+        """
+        Start a new proxy session with best available proxy.
+        
+        If a live driver is passed, its cookies are cleared and it is switched
+        to the selected proxy in place; check ``browser_reused`` on the returned
+        session to see whether the caller still needs to launch a new browser.
+        """
+        self.refresh_proxies()
+        
         with self.lock:
             # End current session if active
             if self.current_session and self.current_session.is_active:
                 self.current_session.end_session(successful=True)
                 self._log_session_end()
             
-            # Get healthy proxies
-            healthy_proxies = self.get_healthy_proxies()
+            self._release_lease()
+            self._sync_shared_stats()
             
-            if not healthy_proxies:
+            # Select proxy (weighted random based on health) from the index
+            proxy_key = self._select_proxy_key()
+            selected_proxy = self._proxy_by_key.get(proxy_key) if proxy_key else None
+            
+            if not selected_proxy:
                 print("⚠️  No healthy proxies available!")
                 return None
             
-            # Select proxy (weighted random based on health)
-            selected_proxy = self._select_weighted_proxy(healthy_proxies)
-            proxy_key = self._get_proxy_key(selected_proxy)
-            
             # Create new session
             session_id = f"session_{int(time.time())}_{random.randint(1000, 9999)}"
-            self.current_session = ProxySession(
+            session = self.current_session = ProxySession(
                 proxy=selected_proxy,
                 stats=self.proxy_stats[proxy_key],
-                session_id=session_id
+                session_id=session_id,
+                on_stats_change=self._on_stats_change,
+                on_end=self._on_session_end
             )
-            
-            print(f"🔄 Started new session: {session_id}")
-            print(f"   Proxy: {selected_proxy.get('server', 'unknown')}")
-            print(f"   Health: {self.proxy_stats[proxy_key].health_score.name}")
-            print(f"   Max pages: {self.current_session.max_pages}")
-            
-            return self.current_session
-    
-    def _select_weighted_proxy(self, proxies: List[Dict]) -> Dict:
-        """Select proxy using weighted random based on health scores."""
-        if len(proxies) == 1:
-            return proxies[0]
-        
-        # Calculate weights based on health scores
-        weights = []
-        for proxy in proxies:
-            proxy_key = self._get_proxy_key(proxy)
-            stats = self.proxy_stats[proxy_key]
-            weight = stats.health_score.value * (1 + stats.success_rate() / 100)
-            weights.append(weight)
+            self.pacer.apply(proxy_key, self.proxy_stats[proxy_key])
         
-        # Weighted random selection
-        total_weight = sum(weights)
-        if total_weight == 0:
-            return random.choice(proxies)
+        # Switching waits on the browser (a navigation plus up to its timeout);
+        # probe results and stats updates must not queue behind it on the lock
+        if driver is not None:
+            session.browser_reused = self.proxy_auth_manager.switch_proxy(driver, selected_proxy)
         
-        rand_val = random.uniform(0, total_weight)
-        current_weight = 0
+        print(f"🔄 Started new session: {session_id}")
+        print(f"   Proxy: {selected_proxy.get('server', 'unknown')}")
+        print(f"   Health: {session.stats.health_score.name}")
+        print(f"   Max pages: {session.max_pages}")
+        print(f"   Pace: {self.rate_limiter.get_proxy_rate(proxy_key):.1f} req/min")
         
-        for i, weight in enumerate(weights):
-            current_weight += weight
-            if rand_val <= current_weight:
-                return proxies[i]
-        
-        return proxies[-1]  # Fallback
+        return session
     
     def record_success(self):
         """Record successful page scrape for current session."""
         if self.current_session:
             self.current_session.record_page_success()
+            self.pacer.on_success(self._get_proxy_key(self.current_session.proxy), self.current_session.stats)
+            self._push_shared_stats(success=1)
+            
+            if self.lease_manager and self._leased_key:
+                self.lease_manager.renew(self._leased_key, self.owner_id)
     
-    def record_failure(self, is_captcha: bool = False):
-        """Record failed page scrape for current session."""
+    def record_failure(self, is_captcha: bool = False, empty: bool = False):
+        """
+        Record failed page scrape for current session.
+        
+        ``empty`` marks a page that loaded but carried no results, a soft
+        block signal that slows the proxy down less than a CAPTCHA.
+        """
         if self.current_session:
+            proxy_key = self._get_proxy_key(self.current_session.proxy)
+            if is_captcha:
+                # Learns from the previous cooldown before a new one is applied
+                self.pacer.on_captcha(proxy_key, self.current_session.stats)
+            elif empty:
+                self.pacer.on_empty(proxy_key, self.current_session.stats)
+            
             self.current_session.record_page_failure(is_captcha)
+            self._push_shared_stats(failure=1, captcha=int(is_captcha))
             
             if is_captcha:
                 print(f"🛡️  CAPTCHA detected! Ending session {self.current_session.session_id}")
                 self._log_session_end()
     
+    def clear_cooldown(self, proxy_key: str):
+        """
+        Lift a proxy's CAPTCHA cooldown once its challenge has been solved.
+        
+        Only this process's stats change: a cooldown already published to the
+        lease database stays there for the other workers.
+        """
+        with self.lock:
+            stats = self.proxy_stats.get(proxy_key)
+            if not stats or not stats.cooldown_until:
+                return
+            stats.cooldown_until = None
+            self.proxy_index.update(proxy_key)
+        print(f"🔓 Cooldown lifted for {proxy_key} (challenge solved)")
+    
+    def acquire_request_slot(self, url: Optional[str] = None) -> float:
+        """
+        Block until the current proxy may send another request to ``url``.
+        
+        Waits on the rate limiter's per-proxy, per-domain and global buckets;
+        with a lease manager the per-proxy budget is shared by every process
+        using the lease database. Returns the seconds waited.
+        """
+        proxy_key = self._get_proxy_key(self.current_session.proxy) if self.current_session else None
+        return self.rate_limiter.acquire(proxy_key, url)
+    
+    def try_acquire_request_slot(self, url: Optional[str] = None) -> float:
+        """Non-blocking acquire_request_slot: 0.0 if granted, else seconds to wait."""
+        proxy_key = self._get_proxy_key(self.current_session.proxy) if self.current_session else None
+        return self.rate_limiter.try_acquire(proxy_key, url)
+    
+    def _select_proxy_key(self, attempts: int = 5) -> Optional[str]:
+        """
+        Sample a healthy, reachable proxy, leasing it when running with a lease manager.
+        
+        Weighted samples that are down or that another process holds are
+        retried a few times; after that the ranked pool is walked for the
+        best usable proxy.
+        """
+        tried = set()
+        for _ in range(attempts):
+            proxy_key = self.proxy_index.sample()
+            if proxy_key is None:
+                return None
+            if proxy_key in tried:
+                continue
+            if self._claim_proxy(proxy_key):
+                return proxy_key
+            tried.add(proxy_key)
+        
+        for proxy_key in self.proxy_index.ranked():
+            if proxy_key not in tried and self._claim_proxy(proxy_key):
+                return proxy_key
+        
+        return None
+    
+    def _claim_proxy(self, proxy_key: str) -> bool:
+        """Whether a selected proxy may be used: reachable, and leased if leases are in use."""
+        if not self._is_reachable(proxy_key):
+            return False
+        if not self.lease_manager:
+            return True
+        if self.lease_manager.acquire(proxy_key, self.owner_id):
+            self._leased_key = proxy_key
+            return True
+        return False
+    
+    def _release_lease(self):
+        """Return the lease on the previous session's proxy."""
+        if self.lease_manager and self._leased_key:
+            self.lease_manager.release(self._leased_key, self.owner_id)
+            self._leased_key = None
+    
+    def _push_shared_stats(self, success: int = 0, failure: int = 0, captcha: int = 0):
+        """Publish the current session's counter deltas to other processes."""
+        if not self.lease_manager or not self.current_session:
+            return
+        
+        proxy_key = self._get_proxy_key(self.current_session.proxy)
+        cooldown_until = self.current_session.stats.cooldown_until
+        
+        with self.lock:
+            self.lease_manager.record_stats(
+                proxy_key,
+                success=success,
+                failure=failure,
+                captcha=captcha,
+                cooldown_until=cooldown_until.timestamp() if cooldown_until else None
+            )
+            # Our own deltas are already counted locally
+            baseline = self._shared_baseline.setdefault(proxy_key, [0, 0, 0])
+            baseline[0] += success
+            baseline[1] += failure
+            baseline[2] += captcha
+    
+    def _sync_shared_stats(self, seed: bool = False):
+        """
+        Fold other processes' counter deltas and cooldowns into local stats.
+        
+        Only rows changed since the last sync are read. With ``seed`` (at
+        startup) the shared totals only become the baseline: stats loaded
+        from proxy_stats.json already hold this machine's share of that
+        history, and adding it again would inflate them on every run.
+        Called with the session lock held.
+        """
+        if not self.lease_manager:
+            return
+        
+        synced_at = time.time()
+        for proxy_key, shared in self.lease_manager.get_stats_since(self._shared_synced_at).items():
+            stats = self.proxy_stats.get(proxy_key)
+            if not stats:
+                continue
+            
+            totals = [shared["success_count"], shared["failure_count"], shared["captcha_count"]]
+            baseline = totals if seed else self._shared_baseline.get(proxy_key, [0, 0, 0])
+            stats.success_count += totals[0] - baseline[0]
+            stats.failure_count += totals[1] - baseline[1]
+            stats.captcha_count += totals[2] - baseline[2]
+            self._shared_baseline[proxy_key] = totals
+            
+            if shared["cooldown_until"]:
+                cooldown_until = datetime.fromtimestamp(shared["cooldown_until"])
+                if not stats.cooldown_until or cooldown_until > stats.cooldown_until:
+                    stats.cooldown_until = cooldown_until
+            
+            self.proxy_index.update(proxy_key)
+        
+        # Small overlap so rows committed during the read aren't skipped
+        self._shared_synced_at = synced_at - 1.0
+    
     def should_rotate_session(self) -> bool:
         """Check if current session should be rotated."""
         if not self.current_session:
@@ -320,20 +687,28 @@ class SessionManager:
     
     def get_proxy_pool_status(self) -> Dict:
         """Get status of entire proxy pool."""
-        healthy = self.get_healthy_proxies()
-        
-        health_distribution = {health.name: 0 for health in ProxyHealth}
-        for stats in self.proxy_stats.values():
-            health_distribution[stats.health_score.name] += 1
+        health_distribution = {
+            ProxyHealth(code).name: count
+            for code, count in sorted(self.stats_table.health_counts().items(), reverse=True)
+        }
         
         return {
             "total_proxies": len(self.proxies),
-            "healthy_proxies": len(healthy),
+            "healthy_proxies": len(self.get_healthy_proxies()),
             "health_distribution": health_distribution,
             "sessions_completed": len(self.session_history),
             "current_session_active": self.current_session is not None and self.current_session.is_active
         }
     
+    def shutdown(self):
+        """Stop background health probing and proxy file watching, and return leases."""
+        self._stop_watching.set()
+        self.health_checker.shutdown()
+        
+        if self.lease_manager:
+            self.lease_manager.release_all(self.owner_id)
+            self._leased_key = None
+    
     def cleanup_old_sessions(self):
         """Clean up old session data to prevent memory leaks."""
         # Keep only last 100 session records
@@ -341,7 +716,16 @@ class SessionManager:
             self.session_history = self.session_history[-100:]
     
     def save_proxy_stats(self, filepath: str):
-        """Save proxy statistics to file for persistence."""
+        """
+        Save proxy statistics to file for persistence.
+        
+        ``.npz`` paths get a compact binary snapshot of the stats table;
+        anything else is written as JSON.
+        """
+        if filepath.endswith('.npz'):
+            self.stats_table.save(filepath)
+            return
+        
         data = {}
         for proxy_key, stats in self.proxy_stats.items():
             data[proxy_key] = {
@@ -352,14 +736,24 @@ class SessionManager:
                 "total_sessions": stats.total_sessions,
                 "successful_sessions": stats.successful_sessions,
                 "last_used": stats.last_used.isoformat() if stats.last_used else None,
-                "cooldown_until": stats.cooldown_until.isoformat() if stats.cooldown_until else None
+                "cooldown_until": stats.cooldown_until.isoformat() if stats.cooldown_until else None,
+                "cooldown_seconds": stats.cooldown_seconds,
+                "request_rate": None if math.isnan(stats.request_rate) else stats.request_rate
             }
         
         with open(filepath, 'w') as f:
             json.dump(data, f, indent=2)
     
     def load_proxy_stats(self, filepath: str):
-        """Load proxy statistics from file."""
+        """Load proxy statistics from a JSON file or ``.npz`` snapshot."""
+        if filepath.endswith('.npz'):
+            try:
+                for proxy_key in self.stats_table.load(filepath):
+                    self.proxy_index.update(proxy_key)
+            except (FileNotFoundError, KeyError, ValueError) as e:
+                print(f"⚠️  Could not load proxy stats: {e}")
+            return
+        
         try:
             with open(filepath, 'r') as f:
                 data = json.load(f)
@@ -372,6 +766,9 @@ class SessionManager:
                     stats.captcha_count = stats_data.get("captcha_count", 0)
                     stats.total_sessions = stats_data.get("total_sessions", 0)
                     stats.successful_sessions = stats_data.get("successful_sessions", 0)
+                    stats.cooldown_seconds = stats_data.get("cooldown_seconds", DEFAULT_COOLDOWN_SECONDS)
+                    if stats_data.get("request_rate"):
+                        stats.request_rate = stats_data["request_rate"]
                     
                     # Parse health score
                     health_name = stats_data.get("health_score", "EXCELLENT")
@@ -382,6 +779,8 @@ class SessionManager:
                         stats.last_used = datetime.fromisoformat(stats_data["last_used"])
                     if stats_data.get("cooldown_until"):
                         stats.cooldown_until = datetime.fromisoformat(stats_data["cooldown_until"])
-                        
+                    
+                    self.proxy_index.update(proxy_key)
+        
         except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
             print(f"⚠️  Could not load proxy stats: {e}")
\ No newline at end of file
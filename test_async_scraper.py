@@ -0,0 +1,164 @@
+"""
+Test Asyncio Scraper Core
+=========================
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from async_scraper import AsyncHumanBehaviorSimulator, AsyncIndeedScraper, scrape_concurrently
+from human_behavior import HumanBehaviorSimulator
+from job_record import JobRecord
+from rate_limiter import RateLimiter
+from scraper_fixtures import offline_scraper
+from test_extraction import make_page
+
+
+class RecordingDriver:
+    """Stands in for a WebDriver; records scripts it was asked to run."""
+    
+    def __init__(self):
+        self.scripts = []
+    
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        return 800
+
+
+def test_behavior_plans_interleave_on_one_loop():
+    """Two simulators waiting concurrently take the time of one, not two."""
+    plan = [("pause", 0.2), ("script", "window.scrollBy(0, 100);"), ("pause", 0.2)]
+    drivers = [RecordingDriver(), RecordingDriver()]
+    simulators = [AsyncHumanBehaviorSimulator(HumanBehaviorSimulator(driver)) for driver in drivers]
+    
+    async def run():
+        await asyncio.gather(*(simulator.run_plan(plan) for simulator in simulators))
+    
+    start = time.time()
+    asyncio.run(run())
+    elapsed = time.time() - start
+    
+    assert all(driver.scripts == ["window.scrollBy(0, 100);"] for driver in drivers)
+    assert elapsed < 0.7
+    print(f"✅ Two 0.4s plans finished together in {elapsed:.2f}s")
+
+
+def test_plans_have_no_driver_side_effects():
+    """Building a plan only draws random numbers; nothing touches the browser."""
+    driver = RecordingDriver()
+    simulator = HumanBehaviorSimulator(driver)
+    plan = simulator.plan_job_browsing(15) + simulator.plan_page_arrival()
+    
+    assert driver.scripts == []
+    assert plan and all(step[0] in ("pause", "scroll", "scroll_to", "actions", "focus", "window") for step in plan)
+    assert sum(step[1] for step in plan if step[0] == "pause") > 0
+    print(f"✅ Plan of {len(plan)} steps built without driver calls")
+
+
+class SleepyScraper(AsyncIndeedScraper):
+    """Async scraper whose pages are pure waiting."""
+    
+    async def _start_new_session_async(self):
+        self.current_session = self.session_manager.start_new_session()
+    
+    async def _scrape_page_async(self, page_number):
+        await asyncio.sleep(0.1)
+        self.session_manager.record_success()
+        return [JobRecord(title=f'Job on page {page_number}')]
+
+
+def test_scrapers_interleave_sessions():
+    """Scrapers gathered on one loop overlap their waiting."""
+    with tempfile.TemporaryDirectory() as tmp:
+        scrapers = [
+            offline_scraper(SleepyScraper, tmp, "https://www.indeed.com/jobs?q=python", 3, proxies=4,
+                            start_page=1 + 3 * i, lease_db=os.path.join(tmp, "leases.db"))
+            for i in range(3)
+        ]
+        start = time.time()
+        results = asyncio.run(scrape_concurrently(scrapers, max_threads=4))
+        elapsed = time.time() - start
+        
+        pages = [[job.title for job in jobs] for jobs in results]
+        assert pages[1] == ['Job on page 4', 'Job on page 5', 'Job on page 6']
+        assert sum(len(jobs) for jobs in results) == 9
+        assert len({scraper.current_session.proxy['server'] for scraper in scrapers}) == 3
+        assert elapsed < 9 * 0.1
+        print(f"✅ 9 pages over 3 concurrent scrapers in {elapsed:.2f}s")
+
+
+
+class PageDriver:
+    """Serves a result page for every URL."""
+    
+    def __init__(self):
+        self.page_source = ""
+        self.title = ""
+    
+    def get(self, url):
+        page = int(url.split("start=")[1]) // 10 + 1 if "start=" in url else 1
+        self.page_source = make_page(page)
+        self.title = f"python jobs - page {page}"
+    
+    def execute_script(self, script, *args):
+        return None
+
+
+class OffLoopScraper(AsyncIndeedScraper):
+    """Real async page steps over PageDriver, noting the threads session stats are recorded on."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.record_threads = []
+    
+    async def _start_new_session_async(self):
+        self.current_session = self.session_manager.start_new_session()
+        self.driver = PageDriver()
+    
+    def _wait_for_job_elements(self):
+        return True
+    
+    def _record_page_success(self):
+        self.record_threads.append(threading.current_thread())
+        super()._record_page_success()
+
+
+class ThreadRecordingLimiter(RateLimiter):
+    """RateLimiter noting the threads asking it for request slots."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = []
+    
+    def try_acquire(self, proxy_key=None, url=None):
+        self.threads.append(threading.current_thread())
+        return super().try_acquire(proxy_key, url)
+
+
+def test_page_bookkeeping_runs_off_the_loop():
+    """Rate limiting, stats recording and page callbacks run in the executor, not on the event loop."""
+    with tempfile.TemporaryDirectory() as tmp:
+        callback_threads = []
+        limiter = ThreadRecordingLimiter()
+        scraper = offline_scraper(
+            OffLoopScraper, tmp, "https://www.indeed.com/jobs?q=python", 2, proxies=1,
+            rate_limiter=limiter,
+            page_callback=lambda page, jobs: callback_threads.append(threading.current_thread())
+        )
+        jobs = asyncio.run(scraper.scrape_all_pages_async())
+        
+        assert len(jobs) == 6 and sorted({job.scraped_from_page for job in jobs}) == [1, 2]
+        threads = scraper.record_threads + callback_threads + limiter.threads
+        assert len(threads) >= 6
+        assert threading.main_thread() not in threads
+        print(f"✅ {len(threads)} bookkeeping calls ran on executor threads")
+
+
+if __name__ == "__main__":
+    test_behavior_plans_interleave_on_one_loop()
+    test_plans_have_no_driver_side_effects()
+    test_scrapers_interleave_sessions()
+    test_page_bookkeeping_runs_off_the_loop()
@@ -0,0 +1,161 @@
+"""
+Test CAPTCHA Attention Pool and Page Requeue
+============================================
+"""
+
+import tempfile
+import time
+
+from captcha_pool import CaptchaAttentionPool
+from job_record import JobRecord
+from page_errors import PageErrorKind, PageFailed
+from scraper_fixtures import offline_scraper
+from scraper_v3 import IndeedScraperV3
+
+
+class FakeDriver:
+    def __init__(self, challenged: bool = True):
+        self.challenged = challenged
+        self.closed = False
+    
+    def quit(self):
+        self.closed = True
+
+
+def test_pool_tracks_solved_and_expired_browsers():
+    """Solved browsers are reported and closed; unsolved ones expire."""
+    solved = []
+    pool = CaptchaAttentionPool(
+        lambda driver: driver.challenged,
+        solve_timeout=0.3,
+        poll_interval=0.05,
+        max_parked=2,
+        on_solved=solved.append
+    )
+    manual, stuck, overflow = FakeDriver(), FakeDriver(), FakeDriver()
+    
+    assert pool.park(manual, "10.0.0.1:8000", 3, "https://www.indeed.com/jobs?start=20")
+    assert pool.park(stuck, "10.0.0.2:8000", 4, "https://www.indeed.com/jobs?start=30")
+    assert not pool.park(overflow, "10.0.0.3:8000", 5, "https://www.indeed.com/jobs?start=40")
+    assert overflow.closed
+    
+    manual.challenged = False
+    time.sleep(0.6)
+    
+    assert [entry.page_number for entry in solved] == [3]
+    assert manual.closed and stuck.closed
+    assert (pool.solved_count, pool.expired_count) == (1, 1)
+    assert pool.pending() == []
+    pool.shutdown()
+    print("✅ Parked browsers solved/expired in the background")
+
+
+def test_headless_browsers_are_closed_unless_a_solver_can_help():
+    """Without a window or a solver nobody can clear the challenge."""
+    closed = FakeDriver()
+    pool = CaptchaAttentionPool(lambda driver: driver.challenged, poll_interval=0.05, headless=True)
+    assert not pool.park(closed, "10.0.0.1:8000", 2, "https://www.indeed.com/jobs?start=10")
+    assert closed.closed and pool.pending() == []
+    
+    solved = []
+    solvable = FakeDriver()
+    pool = CaptchaAttentionPool(
+        lambda driver: driver.challenged,
+        poll_interval=0.05,
+        solver=lambda driver: setattr(driver, "challenged", False),
+        on_solved=solved.append,
+        headless=True
+    )
+    assert pool.park(solvable, "10.0.0.1:8000", 2, "https://www.indeed.com/jobs?start=10")
+    time.sleep(0.3)
+    assert [entry.page_number for entry in solved] == [2] and solvable.closed
+    pool.shutdown()
+    print("✅ Headless browsers parked only when a solver is set")
+
+
+def test_solved_challenge_lifts_the_proxy_cooldown():
+    """The scraper clears the challenged proxy's cooldown once the parked browser is solved."""
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = offline_scraper(IndeedScraperV3, tmp, "https://www.indeed.com/jobs?q=python", 1, proxies=1)
+        manager = scraper.session_manager
+        scraper.current_session = manager.start_new_session()
+        proxy_key = scraper.current_session.proxy['server']
+        manager.record_failure(is_captcha=True)
+        assert manager.proxy_stats[proxy_key].cooldown_until is not None
+        
+        pool = scraper.captcha_pool
+        pool.poll_interval = 0.05
+        pool.close_driver = None
+        driver = FakeDriver()
+        assert pool.park(driver, proxy_key, 1, scraper.base_url)
+        driver.challenged = False
+        time.sleep(0.3)
+        
+        assert pool.solved_count == 1 and driver.closed
+        assert manager.proxy_stats[proxy_key].cooldown_until is None
+        pool.shutdown()
+        manager.shutdown()
+        print("✅ Solving the challenge lifted the proxy cooldown")
+
+
+class ChallengedScraper(IndeedScraperV3):
+    """Scraper whose first ``challenges`` visits to page 2 hit a challenge."""
+    
+    def __init__(self, *args, challenges: int = 1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.challenges = challenges
+        self.visits = []
+        self.sessions_started = 0
+    
+    def _start_new_session(self):
+        self.sessions_started += 1
+        self.current_session = self.session_manager.start_new_session()
+    
+    def _scrape_page(self, page_number):
+        self.visits.append(page_number)
+        if page_number == 2 and self.visits.count(2) <= self.challenges:
+            self.session_manager.record_failure(is_captcha=True)
+            raise PageFailed(PageErrorKind.CAPTCHA)
+        self.session_manager.record_success()
+        return [JobRecord(title=f'Job on page {page_number}')]
+
+
+def test_challenged_page_is_requeued():
+    """A challenged page is retried first on the next session, in order."""
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = []
+        scraper = offline_scraper(
+            ChallengedScraper, tmp, "https://www.indeed.com/jobs?q=python", 3, proxies=2,
+            page_callback=lambda page, jobs: pages.append(page), retry_backoff=0.01
+        )
+        jobs = scraper.scrape_all_pages()
+        
+        assert scraper.visits == [1, 2, 2, 3]
+        assert pages == [1, 2, 3]
+        assert len(jobs) == 3
+        assert scraper.sessions_started == 2
+        print(f"✅ Visits with requeue: {scraper.visits}")
+
+
+def test_challenges_retry_at_once_past_max_page_attempts():
+    """Challenged pages skip the backoff and have their own, higher attempt limit."""
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = offline_scraper(
+            ChallengedScraper, tmp, "https://www.indeed.com/jobs?q=python", 3, proxies=6,
+            challenges=3, max_page_attempts=3, retry_backoff=30.0
+        )
+        start = time.time()
+        jobs = scraper.scrape_all_pages()
+        
+        assert time.time() - start < 10
+        assert scraper.visits == [1, 2, 2, 2, 2, 3]
+        assert len(jobs) == 3 and not scraper.dead_letters
+        print(f"✅ Page challenged 3 times retried without backoff: {scraper.visits}")
+
+
+if __name__ == "__main__":
+    test_pool_tracks_solved_and_expired_browsers()
+    test_headless_browsers_are_closed_unless_a_solver_can_help()
+    test_solved_challenge_lifts_the_proxy_cooldown()
+    test_challenged_page_is_requeued()
+    test_challenges_retry_at_once_past_max_page_attempts()
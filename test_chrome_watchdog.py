@@ -0,0 +1,89 @@
+"""
+Test Chrome Process Watchdog
+============================
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from chrome_watchdog import ChromeWatchdog, DriverLimits
+from process_metrics import is_running
+
+
+def spawn_fake_chrome() -> subprocess.Popen:
+    """A sleeping process whose command line looks like a browser's."""
+    return subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)", "--fake-chrome"])
+
+
+class HungDriver:
+    """Stands in for a driver whose quit() never returns."""
+    
+    def __init__(self, process: subprocess.Popen):
+        self.browser_pid = process.pid
+        self.page_load_timeout = None
+    
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+    
+    def quit(self):
+        time.sleep(30)
+
+
+def test_limits_and_hung_quit():
+    """Over-limit browsers are reported; a hung quit() still kills the browser."""
+    with tempfile.TemporaryDirectory() as tmp:
+        process = spawn_fake_chrome()
+        try:
+            watchdog = ChromeWatchdog(DriverLimits(max_rss_mb=1, quit_timeout=0.5), pidfile_dir=tmp)
+            driver = HungDriver(process)
+            watchdog.register(driver)
+            
+            assert driver.page_load_timeout == watchdog.limits.page_load_timeout
+            assert len(os.listdir(tmp)) == 1
+            assert watchdog.check(driver).startswith("RSS")
+            
+            start = time.time()
+            watchdog.quit(driver)
+            process.wait(timeout=5)
+            
+            assert time.time() - start < 5
+            assert not is_running(process.pid)
+            assert os.listdir(tmp) == []
+            print(f"✅ Hung browser killed in {time.time() - start:.1f}s")
+        finally:
+            process.kill()
+            process.wait()
+
+
+def test_orphans_of_dead_processes_are_killed():
+    """Browsers recorded by an exited scraper process are cleaned up at startup."""
+    with tempfile.TemporaryDirectory() as tmp:
+        dead_owner = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead_owner.wait()
+        orphan = spawn_fake_chrome()
+        survivor = spawn_fake_chrome()
+        try:
+            with open(os.path.join(tmp, f"{dead_owner.pid}-1.pids"), 'w') as f:
+                f.write(f"{dead_owner.pid}\n{orphan.pid}")
+            with open(os.path.join(tmp, f"{os.getpid()}-2.pids"), 'w') as f:
+                f.write(f"{os.getpid()}\n{survivor.pid}")
+            
+            assert ChromeWatchdog(pidfile_dir=tmp).kill_orphans() == 1
+            orphan.wait(timeout=5)
+            
+            assert not is_running(orphan.pid)
+            assert is_running(survivor.pid)
+            assert os.listdir(tmp) == [f"{os.getpid()}-2.pids"]
+            print("✅ Orphaned browser killed, live owner's browser kept")
+        finally:
+            for process in (orphan, survivor):
+                process.kill()
+                process.wait()
+
+
+if __name__ == "__main__":
+    test_limits_and_hung_quit()
+    test_orphans_of_dead_processes_are_killed()
@@ -0,0 +1,95 @@
+"""
+Test Columnar Job Export
+========================
+"""
+
+import os
+import tempfile
+from datetime import date
+
+import pytest
+
+from columnar_export import ParquetJobWriter, available, job_columns, query_partition
+from extraction import extract_jobs_from_html
+from job_record import JobRecord
+from test_extraction import make_page
+
+
+def test_jobs_become_typed_columns():
+    """Records (and rows of older exports) become typed, nullable columns."""
+    jobs = [
+        JobRecord(title='Dev', salary='$55 - $75 an hour', salary_period='hour',
+                  salary_min=55.0, salary_max=75.0, salary_currency='USD',
+                  salary_annual_min=114400.0, salary_annual_max=156000.0,
+                  job_type='Contract', scraped_from_page=2),
+        # Rows of older exports, with sentinels and only the salary text
+        {'title': 'Lead', 'salary': 'Not mentioned', 'salary_period': 'Not mentioned',
+         'job_type': 'Not mentioned'},
+        {'title': 'Analyst', 'salary': '$95k–$125k', 'salary_period': 'year'},
+    ]
+    columns = job_columns(jobs, page_number=3)
+    assert columns['salary_min'] == [55.0, None, 95000.0] and columns['salary_max'] == [75.0, None, 125000.0]
+    assert columns['salary_annual_max'] == [156000.0, None, None]
+    assert columns['salary_currency'] == ['USD', None, 'USD']
+    assert columns['salary_period'] == ['hour', None, 'year']
+    assert columns['job_type'] == ['Contract', None, None]
+    assert columns['scraped_from_page'] == [2, 3, 3]
+    assert columns['company'] == [None, None, None]
+    
+    assert query_partition("https://www.indeed.com/jobs?q=Python+Developer&l=New+York%2C+NY&start=20") \
+        == "python-developer-new-york-ny"
+    assert query_partition("https://www.indeed.com/jobs") == "all"
+    print("✅ Jobs converted to typed, nullable columns")
+
+
+@pytest.mark.skipif(not available(), reason="Parquet export needs pyarrow")
+def test_pages_are_written_as_row_groups():
+    """Each page is one row group in a run_date/query partition."""
+    import pyarrow.parquet as pq
+    import pandas as pd
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        url = "https://www.indeed.com/jobs?q=python&l=Remote"
+        with ParquetJobWriter.for_search(tmp, url, run_date=date(2026, 1, 31)) as writer:
+            for page in range(1, 4):
+                writer.write_page(page, extract_jobs_from_html(make_page(page, job_count=5)))
+            writer.write_page(4, [])
+        
+        assert os.path.dirname(writer.path).endswith(os.path.join("run_date=2026-01-31", "query=python-remote"))
+        assert pq.ParquetFile(writer.path).metadata.num_row_groups == 3
+        
+        df = pd.read_parquet(tmp)
+        assert len(df) == writer.rows_written == 15
+        assert df['salary_min'].dtype == 'float64' and df['salary_min'].iloc[0] == 90000.0
+        assert df['salary_annual_max'].iloc[0] == 120000.0
+        assert isinstance(df['job_type'].dtype, pd.CategoricalDtype)
+        assert sorted(df['scraped_from_page'].unique()) == [1, 2, 3]
+        print(f"✅ {len(df)} rows in {writer.row_groups} row groups at {writer.path}")
+
+
+@pytest.mark.skipif(not available(), reason="Parquet export needs pyarrow")
+def test_files_roll_over_so_a_crash_keeps_finished_files():
+    """With row_groups_per_file, finished files are readable before close()."""
+    import pyarrow.parquet as pq
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = ParquetJobWriter(tmp, "python", run_date=date(2026, 1, 31), row_groups_per_file=2)
+        for page in range(1, 6):
+            writer.write_page(page, extract_jobs_from_html(make_page(page, job_count=3)))
+        
+        # The run "crashes" here: pages 1-4 are in two closed files, page 5 in the open one
+        assert len(writer.paths) == 3
+        closed = [pq.ParquetFile(path).metadata for path in writer.paths[:2]]
+        assert [metadata.num_row_groups for metadata in closed] == [2, 2]
+        assert sum(metadata.num_rows for metadata in closed) == 12
+        
+        writer.close()
+        assert pq.ParquetFile(writer.paths[2]).metadata.num_rows == 3
+        print(f"✅ {writer.row_groups} pages rolled over {len(writer.paths)} files")
+
+
+if __name__ == "__main__":
+    test_jobs_become_typed_columns()
+    if available():
+        test_pages_are_written_as_row_groups()
+        test_files_roll_over_so_a_crash_keeps_finished_files()
@@ -27,9 +27,9 @@ def test_complete_system():
     if jobs:
         print(f"📝 Sample jobs:")
         for i, job in enumerate(jobs[:3]):
-            print(f"   {i+1}. {job.get('title', 'N/A')} at {job.get('company', 'N/A')}")
-            print(f"      Location: {job.get('location', 'N/A')}")
-            print(f"      Salary: {job.get('salary', 'N/A')}")
+            print(f"   {i+1}. {job.title or 'N/A'} at {job.company or 'N/A'}")
+            print(f"      Location: {job.location or 'N/A'}")
+            print(f"      Salary: {job.salary or 'N/A'}")
             print()
 
 if __name__ == "__main__":
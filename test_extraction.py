@@ -0,0 +1,117 @@
+"""
+Test Job Extraction Pipeline
+============================
+"""
+
+import json
+import tempfile
+import time
+
+from extraction import ExtractionPipeline, extract_jobs_from_html, extract_payload
+from page_errors import PageErrorKind
+from scraper_fixtures import offline_scraper
+from scraper_v3 import IndeedScraperV3
+
+
+def make_page(page_number: int, job_count: int = 3) -> str:
+    """Minimal result page with the provider data Indeed embeds."""
+    results = [
+        {
+            'jobkey': f'p{page_number}j{i}',
+            'title': f'Python Developer {i}',
+            'company': 'Acme',
+            'formattedLocation': 'Remote',
+            'extractedSalary': {'min': 90000, 'max': 120000, 'type': 'yearly'},
+            'jobTypes': ['Full-time'],
+            'formattedRelativeTime': '2 days ago',
+            'snippet': '<ul><li>Build &amp; ship</li></ul>'
+        }
+        for i in range(job_count)
+    ]
+    data = {'metaData': {'mosaicProviderJobCardsModel': {'results': results}}}
+    return (
+        "<html><head><script>"
+        f'window.mosaic.providerData["mosaic-provider-jobcards"]={json.dumps(data)};'
+        "</script></head><body>" + "<div>filler</div>" * 1000 + "</body></html>"
+    )
+
+
+def test_extract_jobs_from_payload():
+    """The payload cut on the browser thread parses like the full page."""
+    html = make_page(1)
+    payload = extract_payload(html)
+    
+    assert payload is not None and len(payload) < len(html) / 3
+    assert extract_jobs_from_html(payload) == extract_jobs_from_html(html)
+    
+    job = extract_jobs_from_html(payload)[0]
+    assert job.salary == '$90,000 - $120,000'
+    assert job.salary_period == 'year'
+    assert job.summary == 'Build & ship'
+    assert job.url == 'https://www.indeed.com/viewjob?jk=p1j0'
+    
+    assert extract_payload("<html>Just a moment...</html>") is None
+    print(f"✅ Payload {len(payload)} of {len(html)} chars parsed identically")
+
+
+def test_pipeline_delivers_in_order_with_backpressure():
+    """Pages come back in submission order; submit blocks past max_pending."""
+    pipeline = ExtractionPipeline(max_workers=2, max_pending=2)
+    try:
+        start = time.time()
+        for page in range(1, 7):
+            pipeline.submit(page, extract_payload(make_page(page, job_count=page)))
+            running = [future for _, future in pipeline.pending if not future.done()]
+            assert len(running) <= 2
+        
+        delivered = list(pipeline.completed()) + list(pipeline.drain())
+        assert [page for page, _, _ in delivered] == [1, 2, 3, 4, 5, 6]
+        assert [len(jobs) for _, jobs, _ in delivered] == [1, 2, 3, 4, 5, 6]
+        assert all(error is None for _, _, error in delivered)
+        assert all(job.scraped_from_page == page for page, jobs, _ in delivered for job in jobs)
+        assert len(pipeline) == 0
+        print(f"✅ 6 pages extracted in worker processes in {time.time() - start:.2f}s")
+    finally:
+        pipeline.shutdown()
+
+
+class QueuedScraper(IndeedScraperV3):
+    """Pages are parsed by the pipeline; page 2 arrives garbled once, page 3 always."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.visits = []
+    
+    def _start_new_session(self):
+        self.current_session = self.session_manager.start_new_session()
+    
+    def _scrape_page(self, page_number):
+        self.visits.append(page_number)
+        html = make_page(page_number)
+        if page_number == 3 or (page_number == 2 and self.visits.count(2) == 1):
+            html = html.replace('"results": [', '"results": [garbled')
+        _, jobs = self._collect_jobs(page_number, html)
+        self.session_manager.record_success()
+        return jobs
+
+
+def test_pages_failing_extraction_are_retried():
+    """A page the workers parse to nothing is requeued, then dead-lettered."""
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = []
+        scraper = offline_scraper(
+            QueuedScraper, tmp, "https://www.indeed.com/jobs?q=python", 4, extraction_workers=1,
+            page_callback=lambda page, jobs: pages.append(page), retry_backoff=0.01
+        )
+        jobs = scraper.scrape_all_pages()
+    
+    assert sorted(pages) == [1, 2, 4] and len(jobs) == 9
+    assert scraper.visits.count(2) == 2 and scraper.visits.count(3) == 2
+    assert [(letter.page_number, letter.kind) for letter in scraper.dead_letters] == [(3, PageErrorKind.EMPTY_JSON)]
+    print(f"✅ Visits with extraction retries: {scraper.visits}")
+
+
+if __name__ == "__main__":
+    test_extract_jobs_from_payload()
+    test_pipeline_delivers_in_order_with_backpressure()
+    test_pages_failing_extraction_are_retried()
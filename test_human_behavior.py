@@ -0,0 +1,105 @@
+"""
+Test Batched Human Behavior Plans
+=================================
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from chrome_driver_manager import BACKGROUND_TAB_ARGUMENTS, HEADLESS_ARGUMENTS
+from human_behavior import HumanBehaviorSimulator, MAX_BATCH_SECONDS, SCROLL_ROUTINE
+from proxy_auth_manager import ProxyAuthManager
+
+
+class CountingDriver:
+    """Stands in for a WebDriver; counts every command sent to it."""
+    
+    def __init__(self):
+        self.commands = []
+    
+    def execute_script(self, script, *args):
+        self.commands.append("execute_script")
+        return [1280, 800]
+    
+    def execute_async_script(self, script, *args):
+        self.commands.append("execute_async_script")
+        # The routine would wait out its timers in the page
+        time.sleep(sum(op[2] for op in args[0]) / 1000)
+
+
+def test_compiled_plan_keeps_timing_with_fewer_commands():
+    """Batches replace per-scroll commands without changing total wait time."""
+    random.seed(7)
+    simulator = HumanBehaviorSimulator(CountingDriver())
+    original_commands = compiled_commands = 0
+    
+    for _ in range(50):
+        plan = simulator.plan_job_browsing_fast(15) + simulator.plan_page_arrival()
+        compiled = simulator.compile_plan(plan)
+        
+        original_wait = sum(simulator.step_duration(step) for step in plan)
+        compiled_wait = sum(simulator.step_duration(step) for step in compiled)
+        assert abs(original_wait - compiled_wait) < 0.01 * len(plan)
+        assert all(step[2] <= MAX_BATCH_SECONDS for step in compiled if step[0] == "batch")
+        
+        original_commands += sum(1 for step in plan if step[0] != "pause")
+        compiled_commands += sum(1 for step in compiled if step[0] != "pause")
+    
+    assert compiled_commands * 5 <= original_commands
+    print(f"✅ {original_commands} driver steps compiled to {compiled_commands}")
+
+
+def test_run_plan_sends_one_command_per_batch():
+    """A scroll phase is one execute_async_script call taking the phase's time."""
+    driver = CountingDriver()
+    simulator = HumanBehaviorSimulator(driver)
+    plan = simulator._scroll_steps(600, speed='fast') + [("pause", 0.1)] + simulator._scroll_steps(-200, speed='fast')
+    expected = sum(simulator.step_duration(step) for step in plan)
+    
+    start = time.time()
+    simulator.run_plan(plan)
+    elapsed = time.time() - start
+    
+    assert driver.commands == ["execute_async_script"]
+    assert abs(elapsed - expected) < 0.1
+    assert "requestAnimationFrame" in SCROLL_ROUTINE
+    print(f"✅ {len(plan)} steps ran as one command in {elapsed:.2f}s")
+
+
+def test_headless_profile():
+    """Headless simulators never touch the window; headless options carry the lean profile."""
+    random.seed(3)
+    simulator = HumanBehaviorSimulator(CountingDriver(), headless=True)
+    plans = [simulator.plan_session_break() for _ in range(200)]
+    plans += [simulator._plan_distraction() for _ in range(200)]
+    assert not any(step[0] == "window" for plan in plans for step in plan)
+    
+    simulator.execute_step(("window", "minimize"))
+    assert simulator.driver.commands == []
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        proxy_file = os.path.join(tmp, "proxies.txt")
+        open(proxy_file, 'w').close()
+        manager = ProxyAuthManager(proxy_file, extension_cache_dir=tmp)
+        proxy = manager.parse_proxy_line("10.0.0.1:8000:user:pass")
+        headless = manager.setup_chrome_options(proxy, headless=True).arguments
+        headed = manager.setup_chrome_options(proxy).arguments
+        headed_tabs = manager.setup_chrome_options(proxy, background_tabs=True).arguments
+        headless_tabs = manager.setup_chrome_options(proxy, headless=True, background_tabs=True).arguments
+    
+    assert all(argument in headless for argument in HEADLESS_ARGUMENTS)
+    assert not any(argument in headed for argument in HEADLESS_ARGUMENTS)
+    # Multi-tab browsers keep background tabs unthrottled with a window too
+    assert all(argument in headed_tabs for argument in BACKGROUND_TAB_ARGUMENTS)
+    assert '--disable-gpu' not in headed_tabs
+    assert sorted(headless_tabs) == sorted(headless)
+    assert any(argument.startswith('--load-extension=') for argument in headless)
+    print(f"✅ Headless profile adds {len(HEADLESS_ARGUMENTS)} Chrome arguments, no window steps")
+
+
+if __name__ == "__main__":
+    test_compiled_plan_keeps_timing_with_fewer_commands()
+    test_run_plan_sends_one_command_per_batch()
+    test_headless_profile()
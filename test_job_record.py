@@ -0,0 +1,94 @@
+"""
+Test Typed Job Records
+======================
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from job_record import FIELDS, JobRecord, read_jsonl, write_csv, write_jsonl
+
+
+RESULT = {
+    'jobkey': 'abc123',
+    'title': 'Python Developer',
+    'company': 'Acme',
+    'formattedLocation': 'Remote',
+    'extractedSalary': {'min': 90000, 'max': 120000, 'type': 'yearly'},
+    'jobTypes': ['Full-time'],
+    'formattedRelativeTime': '2 days ago',
+    'snippet': '<ul><li>Build &amp; ship\n  services</li></ul>',
+}
+
+
+def test_records_decode_without_sentinels():
+    """providerData entries decode to records; missing values are None."""
+    job = JobRecord.from_result(RESULT)
+    assert job.url == "https://www.indeed.com/viewjob?jk=abc123" and job.job_key == 'abc123'
+    assert job.salary == '$90,000 - $120,000' and job.salary_annual_max == 120000.0
+    assert job.job_type == 'Full-time' and job.summary == 'Build & ship services'
+    
+    bare = JobRecord.from_result({'jobkey': 'x'})
+    assert bare.title is None and bare.salary is None and bare.job_type is None and bare.summary is None
+    
+    # Rows of older exports: sentinels, CSV text numbers, salary text only
+    old = JobRecord.from_dict({'title': 'Lead', 'company': 'Not mentioned', 'summary': 'No description',
+                               'salary': '$95k–$125k', 'scraped_from_page': '2', 'extra': 'ignored'})
+    assert old.company is None and old.summary is None and old.scraped_from_page == 2
+    assert (old.salary_min, old.salary_max, old.salary_currency) == (95000.0, 125000.0, 'USD')
+    assert JobRecord.from_dict({'salary_min': '55.0', 'salary_max': float('nan')}).salary_min == 55.0
+    
+    assert not hasattr(job, '__dict__')
+    print("✅ Records decoded with None for missing values")
+
+
+def test_jsonl_and_csv_round_trip():
+    """Records written as JSONL come back equal; CSV has a header and empty cells for None."""
+    jobs = [JobRecord.from_result(dict(RESULT, jobkey=f'k{i}')) for i in range(3)]
+    jobs[1].company = None
+    for page, job in enumerate(jobs, 1):
+        job.scraped_from_page = page
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "results.jsonl")
+        assert write_jsonl(jobs[:2], path) == 2
+        assert write_jsonl(jobs[2:], path, append=True) == 1
+        assert list(read_jsonl(path)) == jobs
+        with open(path, encoding='utf-8') as f:
+            assert json.loads(f.readlines()[1])['company'] is None
+    
+    buffer = io.StringIO()
+    assert write_csv(jobs, buffer) == 3
+    lines = buffer.getvalue().splitlines()
+    assert lines[0] == ','.join(FIELDS) and len(lines) == 4
+    assert lines[2].split(',')[1] == ''
+    print("✅ JSONL and CSV round trip")
+
+
+def test_records_are_smaller_than_dicts():
+    """A slotted record takes less memory than the dict it replaces."""
+    count = 10_000
+    
+    def measure(build):
+        tracemalloc.start()
+        items = [build(i) for i in range(count)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del items
+        return size
+    
+    record_bytes = measure(lambda i: JobRecord(title=f'Job {i}', scraped_from_page=i))
+    dict_bytes = measure(lambda i: JobRecord(title=f'Job {i}', scraped_from_page=i).to_dict())
+    assert record_bytes < dict_bytes
+    assert sys.getsizeof(JobRecord()) < sys.getsizeof(JobRecord().to_dict())
+    print(f"✅ {count} records: {record_bytes // 1024} KiB vs {dict_bytes // 1024} KiB as dicts")
+
+
+if __name__ == "__main__":
+    test_records_decode_without_sentinels()
+    test_jsonl_and_csv_round_trip()
+    test_records_are_smaller_than_dicts()
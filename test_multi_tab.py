@@ -0,0 +1,107 @@
+"""
+Test Multi-Tab Scraper
+======================
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from urllib.parse import parse_qs, urlparse
+
+from mock_indeed import render_results_page
+from multi_tab import MultiTabScraper
+from process_metrics import process_tree, tree_rss_mb
+from rate_limiter import RateLimiter
+from scraper_fixtures import offline_scraper
+
+
+class TabbedDriver:
+    """Stands in for a WebDriver with several windows, each showing a URL."""
+    
+    def __init__(self):
+        self.window_handles = ["tab-0"]
+        self.current_window_handle = "tab-0"
+        self.urls = {}
+        self.visits = []
+        self.switch_to = self
+    
+    def new_window(self, kind):
+        handle = f"tab-{len(self.window_handles)}"
+        self.window_handles.append(handle)
+        self.current_window_handle = handle
+    
+    def window(self, handle):
+        self.current_window_handle = handle
+    
+    def get(self, url):
+        self.urls[self.current_window_handle] = url
+        self.visits.append((self.current_window_handle, url))
+    
+    @property
+    def page_source(self):
+        params = parse_qs(urlparse(self.urls[self.current_window_handle]).query)
+        return render_results_page(params['q'][0], int(params['start'][0]), jobs_per_page=5)
+    
+    def quit(self):
+        pass
+
+
+class UnlimitedRateLimiter(RateLimiter):
+    def try_acquire(self, proxy_key, url=None):
+        return 0.0
+
+
+class FakeTabScraper(MultiTabScraper):
+    LOAD_WAIT = (0.01, 0.02)
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.browsers_started = 0
+    
+    def _start_new_session(self):
+        self.current_session = self.session_manager.start_new_session()
+        self.current_session.max_pages = 100
+        if not self.driver:
+            self.browsers_started += 1
+            self.driver = TabbedDriver()
+
+
+def test_tabs_share_one_browser():
+    """Two searches paginate in two tabs of one browser, interleaved."""
+    with tempfile.TemporaryDirectory() as tmp:
+        urls = ["http://127.0.0.1/jobs?q=python", "http://127.0.0.1/jobs?q=golang"]
+        scraper = offline_scraper(FakeTabScraper, tmp, urls, 3, proxies=1, rate_limiter=UnlimitedRateLimiter())
+        driver_holder = []
+        scraper._close_run = lambda all_jobs: driver_holder.append(scraper.driver)
+        results = scraper.scrape_all_tabs()
+        
+        driver = driver_holder[0]
+        assert scraper.browsers_started == 1
+        assert driver.window_handles == ["tab-0", "tab-1"]
+        assert [len(results[url]) for url in urls] == [15, 15]
+        assert {job.scraped_from_page for job in results[urls[1]]} == {1, 2, 3}
+        assert all('Golang' in job.title for job in results[urls[1]])
+        
+        tabs_in_order = [handle for handle, _ in driver.visits]
+        assert tabs_in_order[:2] == ["tab-0", "tab-1"]
+        print(f"✅ {len(driver.visits)} pages over 2 tabs: {tabs_in_order}")
+
+
+def test_process_tree_metrics():
+    """A child process shows up in its parent's tree and adds to its memory."""
+    child = subprocess.Popen([sys.executable, "-c", "import time; x = bytearray(50 * 1024 * 1024); time.sleep(5)"])
+    try:
+        import time
+        time.sleep(0.5)
+        assert child.pid in process_tree([os.getpid()])
+        assert tree_rss_mb([child.pid]) > 40
+        print(f"✅ Child tree RSS {tree_rss_mb([child.pid]):.0f} MB")
+    finally:
+        child.kill()
+        child.wait()
+
+
+if __name__ == "__main__":
+    test_tabs_share_one_browser()
+    test_process_tree_metrics()
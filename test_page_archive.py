@@ -0,0 +1,68 @@
+"""
+Test Raw Page Archive
+=====================
+"""
+
+import os
+import tempfile
+import time
+from dataclasses import replace
+
+from extraction import extract_jobs_from_html, extract_payload
+from page_archive import PageArchive, reparse, search_key
+from test_extraction import make_page
+
+
+SEARCH = "https://www.indeed.com/jobs?q=python&l=Remote"
+
+
+def test_payloads_are_compressed_and_deduplicated():
+    """Identical payloads share one blob; the index finds pages by search and time."""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PageArchive(tmp, codec="gzip", segment_max_bytes=200)
+        now = time.time()
+        
+        for page in range(1, 4):
+            url = f"{SEARCH}&start={(page - 1) * 10}"
+            archive.store(url, page, extract_payload(make_page(page, job_count=10)), fetched_at=now - 3600)
+        # Page 1 fetched again unchanged, and a second search
+        archive.store(f"{SEARCH}&start=0", 1, extract_payload(make_page(1, job_count=10)), fetched_at=now)
+        archive.store("https://www.indeed.com/jobs?q=java&start=0", 1,
+                      extract_payload(make_page(7)), fetched_at=now)
+        
+        stats = archive.stats()
+        assert stats["pages"] == 5 and stats["unique_payloads"] == 4 and stats["searches"] == 2
+        assert stats["stored_bytes"] < stats["raw_bytes"] / 3
+        # Small segments roll over
+        assert len([name for name in os.listdir(tmp) if name.startswith("segment-")]) > 1
+        
+        python_pages = archive.pages("q=python")
+        assert [page.page_number for page in python_pages] == [1, 2, 3, 1]
+        assert [page.page_number for page in archive.pages("q=python", latest=True)] == [2, 3, 1]
+        assert [page.query for page in archive.pages(since=now - 60)] == [search_key(SEARCH), "q=java"]
+        assert search_key(f"{SEARCH}&start=20") == "l=Remote&q=python"
+        
+        assert archive.load(python_pages[1].digest) == extract_payload(make_page(2, job_count=10))
+        print(f"✅ {stats['pages']} pages in {stats['unique_payloads']} blobs, "
+              f"{stats['compression_ratio']}x compressed")
+
+
+def test_reparse_matches_live_extraction():
+    """Re-extraction over the archive (in worker processes) yields the scraped jobs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PageArchive(tmp)
+        expected = []
+        for page in range(1, 9):
+            html = make_page(page, job_count=page)
+            archive.store(f"{SEARCH}&start={(page - 1) * 10}", page, extract_payload(html))
+            expected.extend(replace(job, scraped_from_page=page) for job in extract_jobs_from_html(html))
+        
+        pages = archive.pages(latest=True)
+        assert reparse(archive, pages, workers=2, batch_size=3) == expected
+        assert reparse(archive, pages, workers=1) == expected
+        print(f"✅ Reparsed {len(pages)} pages into {len(expected)} jobs")
+
+
+if __name__ == "__main__":
+    test_payloads_are_compressed_and_deduplicated()
+    test_reparse_matches_live_extraction()
@@ -0,0 +1,87 @@
+"""
+Test Page Failure Retries and Dead Letters
+==========================================
+"""
+
+import tempfile
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from page_errors import PageErrorKind, PageFailed, backoff_delay, classify_error
+from job_record import JobRecord
+from scraper_fixtures import offline_scraper
+from scraper_v3 import IndeedScraperV3
+
+
+def test_errors_are_classified():
+    """Driver errors map to the failure kinds the retry policy works with."""
+    cases = [
+        (TimeoutException("timeout: Timed out receiving message from renderer"), PageErrorKind.NAVIGATION_TIMEOUT),
+        (WebDriverException("unknown error: net::ERR_PROXY_CONNECTION_FAILED"), PageErrorKind.PROXY_AUTH),
+        (WebDriverException("unknown error: net::ERR_TUNNEL_CONNECTION_FAILED"), PageErrorKind.PROXY_AUTH),
+        (WebDriverException("unknown error: session deleted because of page crash"), PageErrorKind.RENDERER_CRASH),
+        (WebDriverException("invalid session id"), PageErrorKind.RENDERER_CRASH),
+        (WebDriverException("unknown error: net::ERR_TIMED_OUT"), PageErrorKind.NAVIGATION_TIMEOUT),
+        (PageFailed(PageErrorKind.EMPTY_JSON), PageErrorKind.EMPTY_JSON),
+        (ValueError("something else"), PageErrorKind.OTHER),
+    ]
+    for error, kind in cases:
+        assert classify_error(error) == kind, (error, classify_error(error))
+    
+    delays = [backoff_delay(attempt, base=2.0, cap=10.0) for attempt in range(1, 6)]
+    assert 1.5 <= delays[0] <= 2.5
+    assert 3.0 <= delays[1] <= 5.0
+    assert max(delays) <= 10.0
+    print(f"✅ {len(cases)} errors classified; backoff {[round(d, 1) for d in delays]}")
+
+
+class FlakyScraper(IndeedScraperV3):
+    """Page 2 times out once; page 3 never gets through its proxy."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.visits = []
+        self.sessions_started = 0
+    
+    def _start_new_session(self):
+        self.sessions_started += 1
+        self.current_session = self.session_manager.start_new_session()
+    
+    def _scrape_page(self, page_number):
+        self.visits.append(page_number)
+        if page_number == 2 and self.visits.count(2) == 1:
+            self.session_manager.record_failure()
+            raise self._page_failure(TimeoutException("timeout: Timed out receiving message from renderer"))
+        if page_number == 3:
+            self.session_manager.record_failure()
+            raise self._page_failure(WebDriverException("unknown error: net::ERR_PROXY_CONNECTION_FAILED"))
+        self.session_manager.record_success()
+        return [JobRecord(title=f'Job on page {page_number}')]
+
+
+def test_failed_pages_retry_on_fresh_sessions_then_dead_letter():
+    """Each failure ends the session; a page out of attempts is dead-lettered."""
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = []
+        scraper = offline_scraper(
+            FlakyScraper, tmp, "https://www.indeed.com/jobs?q=python", 4,
+            page_callback=lambda page, jobs: pages.append(page), retry_backoff=0.01
+        )
+        jobs = scraper.scrape_all_pages()
+        
+        assert scraper.visits == [1, 2, 2, 3, 3, 3, 4]
+        assert pages == [1, 2, 4]
+        assert len(jobs) == 3
+        assert scraper.sessions_started == 5
+        
+        assert len(scraper.dead_letters) == 1
+        letter = scraper.dead_letters[0]
+        assert (letter.page_number, letter.kind, letter.attempts) == (3, PageErrorKind.PROXY_AUTH, 3)
+        assert "start=20" in letter.url
+        assert letter.to_dict()["kind"] == "proxy_auth"
+        print(f"✅ Visits with retries: {scraper.visits}; dead letter: page {letter.page_number}")
+
+
+if __name__ == "__main__":
+    test_errors_are_classified()
+    test_failed_pages_retry_on_fresh_sessions_then_dead_letter()
@@ -0,0 +1,98 @@
+"""
+Test Next-Page Prefetch
+=======================
+"""
+
+import tempfile
+
+from prefetch import COLLECT_SCRIPT, START_SCRIPT, PagePrefetcher
+from scraper_fixtures import offline_scraper
+from scraper_v3 import IndeedScraperV3
+from test_extraction import make_page
+from extraction import extract_payload
+
+
+class PrefetchingDriver:
+    """Stands in for a WebDriver whose in-page fetch returns a results page."""
+    
+    def __init__(self):
+        self.started = []
+        self.visited = []
+        self.title = "python jobs"
+        self.page_source = "<html>rendered page</html>"
+    
+    def get(self, url):
+        self.visited.append(url)
+    
+    def execute_script(self, script, *args):
+        if script == START_SCRIPT:
+            self.started.append(args[0])
+    
+    def execute_async_script(self, script, *args):
+        assert script == COLLECT_SCRIPT
+        page_number = int(args[0].split("start=")[1].split("&")[0]) // 10 + 1
+        return extract_payload(make_page(page_number, job_count=4))
+
+
+def test_prefetcher_round_trip():
+    """start() then collect() hands back the fetched page's payload once."""
+    driver = PrefetchingDriver()
+    prefetcher = PagePrefetcher(driver)
+    
+    assert prefetcher.collect() is None
+    assert prefetcher.start("https://www.indeed.com/jobs?q=python&start=10")
+    payload = prefetcher.collect()
+    
+    assert payload.startswith('window.mosaic.providerData')
+    assert prefetcher.collect() is None
+    print("✅ Prefetch payload collected")
+
+
+class StaticScraper(IndeedScraperV3):
+    def _wait_for_job_elements(self):
+        raise AssertionError("prefetched pages should not wait for rendering")
+
+
+def test_scraper_uses_prefetched_page():
+    """The next page is fetched during the dwell and its jobs used on arrival."""
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = offline_scraper(StaticScraper, tmp, "https://www.indeed.com/jobs?q=python", 3,
+                                  proxies=1, prefetch_next=True)
+        scraper.current_session = scraper.session_manager.start_new_session()
+        scraper.driver = PrefetchingDriver()
+        
+        scraper._upcoming_page = 2
+        scraper._finish_prefetch(scraper._start_prefetch())
+        assert list(scraper._prefetched) == [2]
+        
+        jobs = scraper._scrape_page(2)
+        
+        assert scraper.driver.started == [scraper._build_page_url(2)]
+        assert scraper.driver.visited == [scraper._build_page_url(2)]
+        assert len(jobs) == 4 and all(job.scraped_from_page == 2 for job in jobs)
+        assert scraper._prefetched == {}
+        print(f"✅ Page 2 served from prefetch with {len(jobs)} jobs")
+
+
+def test_prefetches_are_dropped_with_their_session():
+    """A prefetched page not visited before the session ends is not kept."""
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = offline_scraper(StaticScraper, tmp, "https://www.indeed.com/jobs?q=python", 3,
+                                  proxies=1, prefetch_next=True)
+        scraper.current_session = scraper.session_manager.start_new_session()
+        scraper.driver = PrefetchingDriver()
+        
+        scraper._upcoming_page = 3
+        scraper._finish_prefetch(scraper._start_prefetch())
+        assert list(scraper._prefetched) == [3]
+        
+        # Page 2 fails, so the session ends before page 3 is visited
+        scraper._end_session(successful=False)
+        assert scraper._prefetched == {}
+        print("✅ Unvisited prefetch dropped at session end")
+
+
+if __name__ == "__main__":
+    test_prefetcher_round_trip()
+    test_scraper_uses_prefetched_page()
+    test_prefetches_are_dropped_with_their_session()
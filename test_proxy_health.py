@@ -0,0 +1,159 @@
+"""
+Test Proxy Health Probing Against a Local Stand-in Proxy
+========================================================
+"""
+
+import base64
+import os
+import socketserver
+import tempfile
+import threading
+import time
+
+from proxy_health import ProxyHealthChecker, site_check_url
+from session_manager import SessionManager
+
+
+USERNAME = "probe_user"
+PASSWORD = "probe_pass"
+
+
+class StandInProxyHandler(socketserver.StreamRequestHandler):
+    """Answers CONNECT like an authenticating HTTP proxy, without going upstream."""
+    
+    def handle(self):
+        headers = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b"\r\n", b"\n"):
+                break
+            headers.append(line.decode('latin-1').strip())
+        
+        expected = base64.b64encode(f"{USERNAME}:{PASSWORD}".encode()).decode()
+        authorized = f"Proxy-Authorization: Basic {expected}" in headers
+        
+        if headers and headers[0].startswith("CONNECT") and authorized:
+            self.wfile.write(b"HTTP/1.1 200 Connection established\r\n\r\n")
+        else:
+            self.wfile.write(b"HTTP/1.1 407 Proxy Authentication Required\r\n\r\n")
+
+
+def start_stand_in_proxy():
+    """Start the stand-in proxy on a free local port."""
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), StandInProxyHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port() -> int:
+    """Find a local port with nothing listening on it."""
+    with socketserver.TCPServer(("127.0.0.1", 0), socketserver.BaseRequestHandler) as server:
+        return server.server_address[1]
+
+
+def make_proxy(port: int, username: str = USERNAME, password: str = PASSWORD) -> dict:
+    return {
+        'host': '127.0.0.1',
+        'port': port,
+        'username': username,
+        'password': password,
+        'requires_auth': True,
+        'server': f"127.0.0.1:{port}"
+    }
+
+
+def test_connect_probe():
+    """Probe reachable, wrongly authenticated and dead proxies."""
+    server = start_stand_in_proxy()
+    port = server.server_address[1]
+    checker = ProxyHealthChecker(check_url="https://www.indeed.com", timeout=2.0)
+    
+    try:
+        good = checker.probe(make_proxy(port))
+        assert good.reachable and good.latency is not None
+        print(f"✅ Reachable proxy probed in {good.latency * 1000:.1f} ms")
+        
+        bad_auth = checker.probe(make_proxy(port, password="wrong"))
+        assert not bad_auth.reachable and bad_auth.error == "HTTP 407"
+        print("✅ Wrong credentials detected")
+        
+        dead = checker.probe(make_proxy(free_port()))
+        assert not dead.reachable
+        print(f"✅ Dead proxy detected ({dead.error})")
+        
+        # Cached results are served without probing again
+        future = checker.check(make_proxy(port))
+        assert future.result(timeout=5).reachable
+        assert checker.check(make_proxy(port)).done()
+        assert checker.is_reachable(f"127.0.0.1:{port}") is True
+    finally:
+        checker.shutdown()
+        server.shutdown()
+
+
+def test_session_manager_skips_unreachable():
+    """Unreachable proxies are never offered by SessionManager."""
+    server = start_stand_in_proxy()
+    other_server = start_stand_in_proxy()
+    port = server.server_address[1]
+    other_port = other_server.server_address[1]
+    dead_port = free_port()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        proxy_file = os.path.join(tmp, "proxies.txt")
+        with open(proxy_file, 'w') as f:
+            f.write(f"127.0.0.1:{port}:{USERNAME}:{PASSWORD}\n")
+            f.write(f"127.0.0.1:{other_port}:{USERNAME}:wrong\n")
+            f.write(f"127.0.0.1:{dead_port}\n")
+        
+        manager = SessionManager(proxy_file, check_url="https://www.indeed.com", probe_interval=0.5)
+        try:
+            deadline = time.time() + 10
+            while time.time() < deadline:
+                if all(stats.reachable is not None for stats in manager.proxy_stats.values()):
+                    break
+                time.sleep(0.05)
+            
+            healthy = [p['server'] for p in manager.get_healthy_proxies()]
+            assert healthy == [f"127.0.0.1:{port}"]
+            print(f"✅ Healthy proxies after probing: {healthy}")
+        finally:
+            manager.shutdown()
+            server.shutdown()
+            other_server.shutdown()
+
+
+def test_failed_probes_expire_with_the_cache():
+    """A proxy that failed a probe is selectable again once the result expires."""
+    dead_port = free_port()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        proxy_file = os.path.join(tmp, "proxies.txt")
+        with open(proxy_file, 'w') as f:
+            f.write(f"127.0.0.1:{dead_port}\n")
+        
+        manager = SessionManager(proxy_file, check_url=site_check_url("https://www.indeed.com/jobs?q=python"),
+                                 probe_interval=None, watch_interval=None)
+        try:
+            assert manager.health_checker.check_url == "https://www.indeed.com/"
+            manager.health_checker.cache_ttl = 0.5
+            proxy_key = f"127.0.0.1:{dead_port}"
+            assert not manager.health_checker.check(manager.proxies[0]).result(timeout=10).reachable
+            assert manager.get_healthy_proxies() == []
+            assert manager.start_new_session() is None
+            
+            # The stats keep the outcome, but only the prober's cache decides
+            time.sleep(0.6)
+            assert manager.proxy_stats[proxy_key].reachable is False
+            assert [p['server'] for p in manager.get_healthy_proxies()] == [proxy_key]
+            assert manager.start_new_session().proxy['server'] == proxy_key
+            print("✅ Unreachable proxy re-admitted after its probe result expired")
+        finally:
+            manager.shutdown()
+
+
+if __name__ == "__main__":
+    test_connect_probe()
+    test_session_manager_skips_unreachable()
+    test_failed_probes_expire_with_the_cache()
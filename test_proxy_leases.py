@@ -0,0 +1,165 @@
+"""
+Test Shared Proxy Leases (cross-process coordination)
+=====================================================
+"""
+
+import os
+import tempfile
+import time
+
+from proxy_leases import ProxyLeaseManager
+from rate_limiter import RateLimiter
+from session_manager import SessionManager
+
+
+def test_leases_are_exclusive_and_expire():
+    """Only one owner holds a proxy until it releases or the lease expires."""
+    with tempfile.TemporaryDirectory() as tmp:
+        leases = ProxyLeaseManager(os.path.join(tmp, "leases.db"))
+        
+        assert leases.acquire("10.0.0.1:8000", "proc-a", ttl=0.3)
+        assert not leases.acquire("10.0.0.1:8000", "proc-b")
+        assert leases.acquire("10.0.0.1:8000", "proc-a", ttl=0.3)
+        assert leases.get_holder("10.0.0.1:8000") == "proc-a"
+        
+        time.sleep(0.4)
+        assert leases.get_holder("10.0.0.1:8000") is None
+        assert leases.acquire("10.0.0.1:8000", "proc-b")
+        
+        leases.release("10.0.0.1:8000", "proc-a")
+        assert leases.get_holder("10.0.0.1:8000") == "proc-b"
+        leases.release_all("proc-b")
+        assert leases.get_holder("10.0.0.1:8000") is None
+        print("✅ Leases exclusive, renewable and time-bounded")
+
+
+def test_global_rate_limit():
+    """The per-proxy bucket allows a burst, then asks callers to wait."""
+    with tempfile.TemporaryDirectory() as tmp:
+        leases = ProxyLeaseManager(os.path.join(tmp, "leases.db"), requests_per_minute=60, burst=2)
+        
+        assert leases.try_acquire_request("10.0.0.1:8000") == 0.0
+        assert leases.try_acquire_request("10.0.0.1:8000") == 0.0
+        wait = leases.try_acquire_request("10.0.0.1:8000")
+        assert 0.5 < wait <= 1.0
+        
+        # Other proxies have their own budget
+        assert leases.try_acquire_request("10.0.0.2:8000") == 0.0
+        print(f"✅ Third request told to wait {wait:.2f}s")
+
+
+def test_managers_share_pool_through_leases():
+    """Two managers never pick the same proxy and see each other's CAPTCHAs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        proxy_file = os.path.join(tmp, "proxies.txt")
+        with open(proxy_file, 'w') as f:
+            f.write("10.0.0.1:8000:user:pass\n10.0.0.2:8000:user:pass\n")
+        
+        db_path = os.path.join(tmp, "leases.db")
+        managers = [
+            SessionManager(proxy_file, probe_interval=None, watch_interval=None,
+                           lease_manager=ProxyLeaseManager(db_path))
+            for _ in range(2)
+        ]
+        try:
+            first = managers[0].start_new_session()
+            second = managers[1].start_new_session()
+            assert first.proxy['server'] != second.proxy['server']
+            
+            # A third process finds nothing to lease
+            third = SessionManager(proxy_file, probe_interval=None, watch_interval=None,
+                                   lease_manager=ProxyLeaseManager(db_path))
+            assert third.start_new_session() is None
+            third.shutdown()
+            
+            managers[0].record_success()
+            managers[0].record_failure(is_captcha=True)
+            
+            # The CAPTCHA cooldown reaches the other process on its next rotation
+            managers[0].shutdown()
+            managers[1].start_new_session()
+            shared = managers[1].proxy_stats[first.proxy['server']]
+            assert shared.success_count == 1
+            assert shared.captcha_count == 1
+            assert shared.cooldown_until is not None
+            assert managers[1].current_session.proxy['server'] == second.proxy['server']
+            print("✅ Leases and CAPTCHA cooldowns shared between managers")
+        finally:
+            for manager in managers:
+                manager.shutdown()
+
+
+def test_shared_history_is_not_counted_twice():
+    """A new process takes the shared totals as its baseline and folds in only later deltas."""
+    with tempfile.TemporaryDirectory() as tmp:
+        proxy_file = os.path.join(tmp, "proxies.txt")
+        with open(proxy_file, 'w') as f:
+            f.write("10.0.0.1:8000:user:pass\n")
+        db_path = os.path.join(tmp, "leases.db")
+        
+        def manager():
+            return SessionManager(proxy_file, probe_interval=None, watch_interval=None,
+                                  lease_manager=ProxyLeaseManager(db_path))
+        
+        earlier = manager()
+        earlier.start_new_session()
+        earlier.record_success()
+        earlier.record_failure(is_captcha=True)
+        earlier.shutdown()
+        
+        # Restarted with its saved stats: the shared history is not added on top
+        stats_path = os.path.join(tmp, "proxy_stats.json")
+        earlier.save_proxy_stats(stats_path)
+        restarted = manager()
+        restarted.load_proxy_stats(stats_path)
+        stats = restarted.proxy_stats["10.0.0.1:8000"]
+        assert (stats.success_count, stats.captcha_count) == (1, 1)
+        assert stats.cooldown_until is not None
+        
+        # Later deltas from other processes still arrive
+        ProxyLeaseManager(db_path).record_stats("10.0.0.1:8000", success=2)
+        with restarted.lock:
+            restarted._sync_shared_stats()
+        assert stats.success_count == 3
+        restarted.shutdown()
+        print("✅ Shared history seeded as baseline; only new deltas folded in")
+
+
+
+def test_supplied_rate_limiter_keeps_the_shared_budget():
+    """A caller's rate limiter plus a lease database still enforces the cross-process proxy budget."""
+    with tempfile.TemporaryDirectory() as tmp:
+        proxy_file = os.path.join(tmp, "proxies.txt")
+        with open(proxy_file, 'w') as f:
+            f.write("10.0.0.1:8000:user:pass\n")
+        
+        db_path = os.path.join(tmp, "leases.db")
+        limiter = RateLimiter(per_proxy_rpm=60, global_rpm=6000, burst=100)
+        manager = SessionManager(proxy_file, probe_interval=None, watch_interval=None, rate_limiter=limiter,
+                                 lease_manager=ProxyLeaseManager(db_path, requests_per_minute=60, burst=2))
+        other = ProxyLeaseManager(db_path, requests_per_minute=60, burst=2)
+        try:
+            assert manager.rate_limiter is limiter and limiter.shared is manager.lease_manager
+            manager.start_new_session()
+            
+            # Another process spends the proxy's shared burst first
+            assert other.try_acquire_request("10.0.0.1:8000") == 0.0
+            assert other.try_acquire_request("10.0.0.1:8000") == 0.0
+            assert manager.try_acquire_request_slot("https://www.indeed.com/jobs") > 0
+            
+            try:
+                limiter.attach_shared(ProxyLeaseManager(os.path.join(tmp, "elsewhere.db")))
+                assert False, "a second lease database must be refused"
+            except ValueError:
+                pass
+            print("✅ Supplied rate limiter enforces the shared per-proxy budget")
+        finally:
+            manager.shutdown()
+
+
+if __name__ == "__main__":
+    test_leases_are_exclusive_and_expire()
+    test_global_rate_limit()
+    test_managers_share_pool_through_leases()
+    test_shared_history_is_not_counted_twice()
+    test_supplied_rate_limiter_keeps_the_shared_budget()
@@ -0,0 +1,279 @@
+"""
+Test Proxy Pool Management (hot reload)
+=======================================
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from proxy_auth_manager import SWITCH_PAGE, SWITCH_URL, ProxyAuthManager
+from proxy_index import ProxyIndex
+from proxy_stats_table import ProxyStatsTable
+from session_manager import ProxyHealth, ProxyStats, SessionManager
+
+
+def write_proxies(path: str, lines):
+    """Rewrite the proxy file, bumping its mtime so the change is seen."""
+    with open(path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def make_manager(proxy_file: str) -> SessionManager:
+    return SessionManager(proxy_file, probe_interval=None, watch_interval=None)
+
+
+def test_hot_reload_diff_applies():
+    """Additions and removals are applied without touching the live session."""
+    with tempfile.TemporaryDirectory() as tmp:
+        proxy_file = os.path.join(tmp, "proxies.txt")
+        write_proxies(proxy_file, ["10.0.0.1:8000:user:pass", "10.0.0.2:8000:user:pass"])
+        
+        manager = make_manager(proxy_file)
+        try:
+            proxies_list = manager.proxies
+            session = manager.start_new_session()
+            live_key = session.proxy['server']
+            live_stats = session.stats
+            live_stats.success_count = 3
+            
+            other_key = "10.0.0.2:8000" if live_key == "10.0.0.1:8000" else "10.0.0.1:8000"
+            write_proxies(proxy_file, [f"{other_key}:user:pass", "10.0.0.3:8000"])
+            
+            assert manager.refresh_proxies()
+            assert manager.proxies is proxies_list
+            assert sorted(manager.proxy_stats) == sorted([other_key, "10.0.0.3:8000"])
+            assert [p['server'] for p in manager.proxies] == [other_key, "10.0.0.3:8000"]
+            
+            # The live session still records into its own stats object
+            manager.record_success()
+            assert live_stats.success_count == 4
+            assert session.is_active
+            print(f"✅ Reloaded pool: {[p['server'] for p in manager.proxies]}")
+            
+            # Unchanged file is a no-op
+            assert not manager.refresh_proxies()
+        finally:
+            manager.shutdown()
+
+
+def test_credential_change_keeps_proxy_history():
+    """New credentials for a known server replace its proxy dict but keep its stats."""
+    with tempfile.TemporaryDirectory() as tmp:
+        proxy_file = os.path.join(tmp, "proxies.txt")
+        write_proxies(proxy_file, ["10.0.0.1:8000:user:old", "10.0.0.2:8000:user:pass"])
+        
+        manager = make_manager(proxy_file)
+        try:
+            stats = manager.proxy_stats["10.0.0.1:8000"]
+            stats.success_count = 12
+            stats.captcha_count = 1
+            
+            write_proxies(proxy_file, ["10.0.0.1:8000:user:new", "10.0.0.2:8000:user:pass"])
+            assert manager.refresh_proxies()
+            
+            assert manager.proxy_stats["10.0.0.1:8000"] is stats
+            assert (stats.success_count, stats.captcha_count) == (12, 1)
+            assert manager._proxy_by_key["10.0.0.1:8000"]['password'] == "new"
+            assert manager.stats_table.row_of("10.0.0.1:8000") is not None
+            assert "10.0.0.1:8000" in manager.proxy_index.ranked()
+            print("✅ Credential change kept the proxy's history")
+        finally:
+            manager.shutdown()
+
+
+def test_reload_churn_reuses_stats_rows():
+    """Rows of removed proxies are reused, except the one the live session still holds."""
+    with tempfile.TemporaryDirectory() as tmp:
+        proxy_file = os.path.join(tmp, "proxies.txt")
+        write_proxies(proxy_file, ["10.0.0.1:8000", "10.0.0.2:8000"])
+        
+        manager = make_manager(proxy_file)
+        try:
+            session = manager.start_new_session()
+            session.stats.success_count = 7
+            
+            for generation in range(50):
+                write_proxies(proxy_file, [f"10.1.{generation}.{i}:8000" for i in range(2)])
+                assert manager.refresh_proxies()
+                # Reused rows start from fresh stats
+                for stats in manager.proxy_stats.values():
+                    assert stats.success_count == 0 and stats.cooldown_until is None
+                    stats.success_count = 3
+                    stats.cooldown_until = datetime.now() + timedelta(hours=1)
+            
+            table = manager.stats_table
+            assert len(table) == 2
+            assert table.size <= 5
+            # The removed live proxy's row was never handed to another proxy
+            assert session.stats.success_count == 7
+            
+            print(f"✅ 100 proxies churned through {table.size} stats rows")
+        finally:
+            manager.shutdown()
+
+
+def test_index_selection_and_cooldown():
+    """Weighted sampling skips unhealthy proxies and re-admits after cooldown."""
+    index = ProxyIndex()
+    pool = {f"10.0.{i // 256}.{i % 256}:8000": ProxyStats() for i in range(5000)}
+    for key, stats in pool.items():
+        index.add(key, stats)
+    assert index.healthy_count() == 5000
+    
+    keys = list(pool)
+    blacklisted, cooling, slow = keys[0], keys[1], keys[2]
+    pool[blacklisted].health_score = ProxyHealth.BLACKLISTED
+    index.update(blacklisted)
+    pool[cooling].cooldown_until = datetime.now() + timedelta(seconds=0.2)
+    index.update(cooling)
+    pool[slow].success_count, pool[slow].failure_count = 1, 1
+    pool[slow].health_score = ProxyHealth.FAIR
+    index.update(slow)
+    
+    assert index.healthy_count() == 4998
+    rng = random.Random(7)
+    start = time.time()
+    picks = {index.sample(rng) for _ in range(20000)}
+    elapsed = time.time() - start
+    assert blacklisted not in picks and cooling not in picks
+    assert keys[0] != index.ranked(limit=1)[0]
+    assert index.ranked()[-1] == slow
+    print(f"✅ 20k samples from a 5k pool in {elapsed * 1000:.0f} ms")
+    
+    time.sleep(0.25)
+    assert index.healthy_count() == 4999
+    
+    index.remove(keys[3])
+    assert index.healthy_count() == 4998
+    assert keys[3] not in {index.sample(rng) for _ in range(20000)}
+
+
+def test_stats_table_vectorized_and_snapshot():
+    """Vectorized health matches ProxyStats.is_healthy and snapshots round-trip."""
+    table = ProxyStatsTable()
+    rng = random.Random(3)
+    views = {}
+    for i in range(2000):
+        key = f"10.1.{i // 256}.{i % 256}:8000"
+        stats = ProxyStats(table, table.add(key))
+        stats.success_count = rng.randint(0, 20)
+        stats.failure_count = rng.randint(0, 20)
+        stats.consecutive_failures = rng.randint(0, 6)
+        stats.health_score = rng.choice(list(ProxyHealth))
+        stats.reachable = rng.choice([None, True, False])
+        if rng.random() < 0.2:
+            stats.cooldown_until = datetime.now() + timedelta(hours=1)
+        views[key] = stats
+    
+    mask = table.healthy_mask()
+    for key, stats in views.items():
+        assert bool(mask[table.row_of(key)]) == stats.is_healthy()
+    print(f"✅ Vectorized health check agrees on {len(views)} proxies ({int(mask.sum())} healthy)")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "proxy_stats.npz")
+        table.save(path)
+        
+        restored = ProxyStatsTable()
+        for key in views:
+            restored.add(key)
+        assert sorted(restored.load(path)) == sorted(views)
+        for key, stats in views.items():
+            copy = ProxyStats(restored, restored.row_of(key))
+            assert copy.success_count == stats.success_count
+            assert copy.health_score == stats.health_score
+            assert copy.reachable == stats.reachable
+            assert copy.cooldown_until == stats.cooldown_until
+        print(f"✅ Snapshot size: {os.path.getsize(path)} bytes for {len(views)} proxies")
+
+
+class SwitchingDriver:
+    """Stands in for a browser running the proxy extension."""
+    
+    def __init__(self, manager: SessionManager):
+        self.manager = manager
+        self.urls = []
+        self.title = ""
+        self.applied = None
+        self.lock_held = False
+    
+    def delete_all_cookies(self):
+        pass
+    
+    def get(self, url):
+        self.lock_held |= self.manager.lock.locked()
+        self.urls.append(url)
+        self.title = "extension:abcdef" if url.startswith(SWITCH_URL) else "proxy switch"
+    
+    def execute_script(self, script, *args):
+        self.lock_held |= self.manager.lock.locked()
+        if "switchProxy" in script:
+            self.applied = f"{args[0]['host']}:{args[0]['port']}"
+        return self.applied
+
+
+def test_live_switch_runs_outside_the_lock_without_credentials_in_urls():
+    """Proxies are switched through the extension page, after the lock is released."""
+    with tempfile.TemporaryDirectory() as tmp:
+        proxy_file = os.path.join(tmp, "proxies.txt")
+        write_proxies(proxy_file, ["10.0.0.1:8000:user:s3cret-pass"])
+        manager = make_manager(proxy_file)
+        driver = SwitchingDriver(manager)
+        manager.proxy_auth_manager._driver_tokens[driver] = "token"
+        
+        session = manager.start_new_session(driver=driver)
+        assert session.browser_reused
+        assert not driver.lock_held
+        assert driver.urls == [f"{SWITCH_URL}id?token=token", f"chrome-extension://abcdef/{SWITCH_PAGE}"]
+        assert not any("s3cret" in url or "user" in url for url in driver.urls)
+        
+        # The extension id is looked up once per browser
+        manager.start_new_session(driver=driver)
+        assert driver.urls[2:] == [f"chrome-extension://abcdef/{SWITCH_PAGE}"]
+        print(f"✅ Switched via the extension page: {driver.urls[1]}")
+
+
+
+def test_extensions_outlive_their_proxy_until_swept():
+    """Removed proxies keep their (shared) extension; only old, unused ones are swept."""
+    with tempfile.TemporaryDirectory() as tmp:
+        proxy_file = os.path.join(tmp, "proxies.txt")
+        cache = os.path.join(tmp, "extensions")
+        write_proxies(proxy_file, ["10.0.0.1:8000:user:pass", "10.0.0.2:8000:user:pass"])
+        manager = ProxyAuthManager(proxy_file, extension_cache_dir=cache)
+        first, second = (manager.create_auth_extension(proxy) for proxy in manager.proxies)
+        
+        # Hot reload drops proxy 1 while a browser may still run on its extension
+        write_proxies(proxy_file, ["10.0.0.2:8000:user:pass"])
+        manager.reload_proxies()
+        manager.remove_proxy(manager.proxies[0])
+        assert os.path.isdir(first) and os.path.isdir(second)
+        
+        # A week later, another process sweeps what nobody used since
+        week_ago = time.time() - 8 * 24 * 3600
+        os.utime(first, (week_ago, week_ago))
+        os.utime(second, (week_ago, week_ago))
+        other = ProxyAuthManager(proxy_file, extension_cache_dir=cache)
+        assert not os.path.exists(first) and not os.path.exists(second)
+        assert os.listdir(cache) == []
+        
+        # The process that used them never sweeps its own
+        fresh = other.create_auth_extension(other.proxies[0])
+        os.utime(fresh, (week_ago, week_ago))
+        assert other.sweep_extension_cache() == 0 and os.path.isdir(fresh)
+        print("✅ Extensions kept through hot reload, swept only when stale and unused")
+
+
+if __name__ == "__main__":
+    test_hot_reload_diff_applies()
+    test_credential_change_keeps_proxy_history()
+    test_reload_churn_reuses_stats_rows()
+    test_index_selection_and_cooldown()
+    test_stats_table_vectorized_and_snapshot()
+    test_live_switch_runs_outside_the_lock_without_credentials_in_urls()
+    test_extensions_outlive_their_proxy_until_swept()
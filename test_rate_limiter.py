@@ -0,0 +1,121 @@
+"""
+Test Token-Bucket Rate Limiter
+==============================
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from pacing import AdaptivePacer
+from rate_limiter import RateLimiter, TokenBucket
+from session_manager import ProxySession, ProxyStats
+
+
+def test_token_bucket_burst_and_refill():
+    """A bucket allows its burst, then refills at the configured rate."""
+    bucket = TokenBucket(rate=20.0, burst=2)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    
+    wait = bucket.try_acquire()
+    assert 0 < wait <= 0.05
+    time.sleep(wait + 0.01)
+    assert bucket.try_acquire() == 0.0
+    
+    bucket.set_rate(1.0)
+    assert bucket.try_acquire() > 0.5
+    print("✅ Bucket burst, refill and rate change")
+
+
+def test_limiter_applies_every_bucket():
+    """The per-proxy bucket paces one proxy while another proxy goes through."""
+    limiter = RateLimiter(per_proxy_rpm=60, per_domain_rpm=6000, global_rpm=6000, burst=1)
+    url = "https://www.indeed.com/jobs?q=python"
+    
+    assert limiter.try_acquire("10.0.0.1:8000", url) == 0.0
+    assert limiter.try_acquire("10.0.0.1:8000", url) > 0.5
+    time.sleep(0.02)  # let the fast global/domain buckets refill
+    assert limiter.try_acquire("10.0.0.2:8000", url) == 0.0
+    
+    # A refused request consumes nothing from the other buckets
+    tight = RateLimiter(per_proxy_rpm=6000, per_domain_rpm=60, global_rpm=6000, burst=1)
+    assert tight.try_acquire("10.0.0.1:8000", url) == 0.0
+    assert tight.try_acquire("10.0.0.2:8000", url) > 0.5
+    assert tight.proxy_bucket("10.0.0.2:8000").tokens == 1
+    print("✅ Proxy, domain and global buckets combined")
+
+
+def test_concurrent_workers_share_global_rate():
+    """Threads acquiring from one limiter never exceed the global rate."""
+    limiter = RateLimiter(per_proxy_rpm=60000, per_domain_rpm=60000, global_rpm=1200, burst=1)
+    granted = []
+    
+    def worker(proxy_key: str):
+        for _ in range(3):
+            limiter.acquire(proxy_key, "https://www.indeed.com/jobs")
+            granted.append(time.monotonic())
+    
+    threads = [threading.Thread(target=worker, args=(f"10.0.0.{i}:8000",)) for i in range(4)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    # 12 requests at 20/s with a burst of 1 need at least 11 refill intervals
+    elapsed = max(granted) - start
+    assert len(granted) == 12
+    assert elapsed >= 11 / 20 - 0.02
+    print(f"✅ 12 requests across 4 workers took {elapsed:.2f}s")
+
+
+def test_adaptive_pacing_aimd_and_cooldowns():
+    """Rates climb on success, halve on CAPTCHAs; repeat offenders get longer cooldowns."""
+    limiter = RateLimiter(per_proxy_rpm=10, global_rpm=100)
+    pacer = AdaptivePacer(limiter, increase_rpm=1.0)
+    stats = ProxyStats()
+    key = "10.0.0.1:8000"
+    
+    for _ in range(4):
+        pacer.on_success(key, stats)
+    assert stats.request_rate == 14.0
+    assert limiter.get_proxy_rate(key) == 14.0
+    assert pacer.global_rpm == 104.0
+    
+    pacer.on_empty(key, stats)
+    assert abs(stats.request_rate - 14.0 * 0.85) < 1e-9
+    
+    # First challenge: rate halves, cooldown keeps its default length
+    rate_before = stats.request_rate
+    pacer.on_captcha(key, stats)
+    assert stats.request_rate == rate_before / 2
+    assert pacer.global_rpm == 104.0 * 0.75
+    assert stats.cooldown_seconds == 7200
+    
+    session = ProxySession(proxy={'server': key}, stats=stats, session_id="s1")
+    session.record_page_failure(is_captcha=True)
+    assert stats.cooldown_until > datetime.now() + timedelta(seconds=7100)
+    
+    # Challenged again right after the cooldown ended: learn a longer one
+    stats.cooldown_until = datetime.now() - timedelta(minutes=5)
+    pacer.on_captcha(key, stats)
+    assert stats.cooldown_seconds == 14400
+    
+    # Clean sessions shrink it back, never below the floor
+    for _ in range(100):
+        pacer.on_session_end(stats, successful=True)
+    assert stats.cooldown_seconds == pacer.min_cooldown
+    
+    # Rates stay within bounds
+    for _ in range(20):
+        pacer.on_captcha(key, stats)
+    assert stats.request_rate == pacer.min_rpm
+    print("✅ AIMD pacing and learned cooldowns")
+
+
+if __name__ == "__main__":
+    test_token_bucket_burst_and_refill()
+    test_limiter_applies_every_bucket()
+    test_concurrent_workers_share_global_rate()
+    test_adaptive_pacing_aimd_and_cooldowns()
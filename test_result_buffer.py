@@ -0,0 +1,58 @@
+"""
+Test Compact Result Buffer
+==========================
+"""
+
+from job_record import JobRecord
+from result_buffer import ResultBuffer, benchmark, cardinality
+
+
+def make_record(i: int) -> JobRecord:
+    return JobRecord(title=f'Job {i}', company=f'Company {i % 3}', location='Remote',
+                     salary_min=50000.0 + i if i % 2 else None, job_type='Full-time',
+                     job_key=f'k{i}', url=f'https://www.indeed.com/viewjob?jk=k{i}',
+                     scraped_from_page=i // 10 + 1)
+
+
+def test_buffer_round_trips_records():
+    """Records come back equal; repeated values are stored once."""
+    records = [make_record(i) for i in range(25)]
+    records.append(JobRecord(title='Odd one', url='https://example.com/job/1'))
+    records.append(JobRecord())
+    buffer = ResultBuffer(records[:10])
+    buffer.extend(records[10:])
+    
+    assert len(buffer) == len(records) and list(buffer) == records
+    assert buffer[0] == records[0] and buffer[-1] == records[-1]
+    assert buffer[:3] == records[:3] and buffer[24:] == records[24:]
+    assert buffer[-2].url == 'https://example.com/job/1' and buffer[-1].scraped_from_page is None
+    assert buffer.distinct('company') == 3 and buffer.distinct('location') == 1
+    assert len(buffer.urls) == 1  # view URLs are rebuilt from the job key
+    try:
+        buffer[len(records)]
+        assert False, "index past the end"
+    except IndexError:
+        pass
+    
+    # Values are interned, so separate buffers share one copy
+    other = ResultBuffer([JobRecord(company=''.join(['Company ', '1']))])
+    assert other.categories['company'].values[1] is buffer.categories['company'].values[2]
+    assert not ResultBuffer()
+    print(f"✅ {len(buffer)} records round trip through the buffer")
+
+
+def test_buffer_uses_less_memory_than_records():
+    """Mock pages held in the buffer take a fraction of the dict/record memory."""
+    sizes = benchmark(jobs=2000, jobs_per_page=100)
+    assert sizes['buffer'] < sizes['records'] < sizes['dicts']
+    assert sizes['buffer'] < sizes['dicts'] / 2
+    # Savings measured against realistic dictionary sizes, not a few repeated names
+    distinct = cardinality(jobs=2000, jobs_per_page=100)
+    assert distinct['company'] > 300 and distinct['location'] > 20
+    print(f"✅ 2000 jobs: {sizes['dicts'] // 1024} KiB as dicts, {sizes['records'] // 1024} KiB as records, "
+          f"{sizes['buffer'] // 1024} KiB buffered")
+
+
+if __name__ == "__main__":
+    test_buffer_round_trips_records()
+    test_buffer_uses_less_memory_than_records()
@@ -0,0 +1,78 @@
+"""
+Test Structured Salary Parsing
+==============================
+"""
+
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from extraction import extract_jobs_from_html
+from salary import normalize_csv_files, normalize_frame, parse_salary_text, salary_fields
+
+
+def page_with(results):
+    data = {'metaData': {'mosaicProviderJobCardsModel': {'results': results}}}
+    return f'<script>window.mosaic.providerData["mosaic-provider-jobcards"]={json.dumps(data)};</script>'
+
+
+def test_salary_fields_from_job_json():
+    """extractedSalary numbers are kept; the snippet text is the fallback."""
+    assert salary_fields({'extractedSalary': {'min': 110000, 'max': 125000, 'type': 'YEARLY'}}) == {
+        'salary_min': 110000.0, 'salary_max': 125000.0, 'salary_currency': 'USD',
+        'salary_period': 'year', 'salary_annual_min': 110000.0, 'salary_annual_max': 125000.0,
+    }
+    hourly = salary_fields({'salarySnippet': {'text': '$25 - $30 an hour', 'currency': 'USD'}})
+    assert (hourly['salary_min'], hourly['salary_period'], hourly['salary_annual_max']) == (25.0, 'hour', 62400.0)
+    assert salary_fields({'salarySnippet': {'text': 'Up to $4,000 a month'}})['salary_annual_max'] == 48000.0
+    assert salary_fields({})['salary_min'] is None
+    
+    assert parse_salary_text("$95k–$125k a year") == (95000.0, 125000.0, 'USD')
+    assert parse_salary_text("£30,000 - £40,000 a year") == (30000.0, 40000.0, 'GBP')
+    assert parse_salary_text("From $20 an hour") == (20.0, 20.0, 'USD')
+    assert parse_salary_text("Competitive") == (None, None, None)
+    
+    # Jobs with only a salarySnippet used to come out without a salary
+    jobs = extract_jobs_from_html(page_with([
+        {'jobkey': 'a', 'title': 'Dev', 'salarySnippet': {'text': '$55 - $75 an hour'}},
+        {'jobkey': 'b', 'title': 'Lead', 'extractedSalary': {'min': 95000, 'max': 125000, 'type': 'yearly'}},
+    ]))
+    assert jobs[0].salary == '$55 - $75 an hour' and jobs[0].salary_period == 'hour'
+    assert jobs[0].salary_annual_min == 114400.0
+    assert jobs[1].salary == '$95,000 - $125,000' and jobs[1].salary_max == 125000.0
+    print("✅ Structured salaries from extractedSalary and salarySnippet")
+
+
+def test_vectorized_normalizer_matches_row_parser():
+    """normalize_frame agrees with the per-row parser, and CSVs are rewritten in chunks."""
+    texts = ['$55 - $75 an hour', 'Up to $80,000 a year', 'Not mentioned', '$95k–$125k',
+             '£30,000 - £40,000 a year', '$1.5K a month', 'Competitive', '$200 a day']
+    df = pd.DataFrame({'title': [f'Job {i}' for i in range(len(texts))], 'salary': texts,
+                       'salary_period': ['hour', 'year'] + ['Not mentioned'] * (len(texts) - 2)})
+    normalized = normalize_frame(df)
+    
+    for text, (_, row) in zip(texts, normalized.iterrows()):
+        low, high, currency = parse_salary_text(text)
+        assert (None if pd.isna(row['salary_min']) else row['salary_min']) == low, text
+        assert (None if pd.isna(row['salary_max']) else row['salary_max']) == high, text
+        assert (None if pd.isna(row['salary_currency']) else row['salary_currency']) == currency, text
+    assert list(normalized['salary_period'].fillna('')) == ['hour', 'year', '', '', 'year', 'month', '', 'day']
+    assert list(normalized['salary_annual_max'].fillna(-1)) == [156000.0, 80000.0, -1, -1, 40000.0, 18000.0, -1, 52000.0]
+    assert normalized['salary_min'].dtype == 'float64'
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "results_20260101_000000.csv")
+        pd.concat([df] * 50).to_csv(path, index=False)
+        written = normalize_csv_files([path], chunksize=64)
+        result = pd.read_csv(written[0])
+        assert len(result) == 50 * len(texts)
+        assert result['salary_annual_min'].iloc[0] == 114400.0
+        assert normalize_csv_files(written) == []  # already normalized files are skipped
+    print(f"✅ Vectorized normalizer agrees with the row parser on {len(texts)} formats")
+
+
+if __name__ == "__main__":
+    test_salary_fields_from_job_json()
+    test_vectorized_normalizer_matches_row_parser()
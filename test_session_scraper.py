@@ -27,7 +27,7 @@ def test_session_scraper():
     print(f"📊 Total jobs scraped: {len(jobs)}")
     
     if jobs:
-        print(f"📝 Sample job: {jobs[0].get('title', 'N/A')} at {jobs[0].get('company', 'N/A')}")
+        print(f"📝 Sample job: {jobs[0].title or 'N/A'} at {jobs[0].company or 'N/A'}")
 
 if __name__ == "__main__":
     test_session_scraper()
\ No newline at end of file
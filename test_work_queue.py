@@ -0,0 +1,177 @@
+"""
+Test Distributed Work Queue (leases, heartbeats, retries)
+=========================================================
+"""
+
+import os
+import sqlite3
+import tempfile
+import time
+
+from job_record import JobRecord
+from page_errors import PageFailed, PageErrorKind
+from scraper_fixtures import offline_scraper
+from scraper_v3 import IndeedScraperV3
+from work_queue import TaskQueue, run_worker
+
+
+def test_lease_lifecycle():
+    """Tasks are split, leased exclusively, streamed and completed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = TaskQueue(os.path.join(tmp, "queue.db"))
+        task_ids = queue.enqueue_search("https://www.indeed.com/jobs?q=python", pages=12, pages_per_task=5)
+        assert len(task_ids) == 3
+        
+        first = queue.lease("worker-a")
+        second = queue.lease("worker-b")
+        assert (first.start_page, first.end_page) == (1, 5)
+        assert (second.start_page, second.end_page) == (6, 10)
+        
+        # Only the lease owner may stream results or complete
+        assert not queue.add_page_results(first.id, "worker-b", first.url, 1, [JobRecord(title='x')])
+        assert queue.add_page_results(first.id, "worker-a", first.url, 1, [JobRecord(title='Dev')])
+        assert queue.add_page_results(first.id, "worker-a", first.url, 1, [JobRecord(title='Dev v2')])
+        assert queue.heartbeat(first.id, "worker-a")
+        assert not queue.complete(first.id, "worker-b")
+        assert queue.complete(first.id, "worker-a")
+        
+        assert [job.title for job in queue.iter_results()] == ['Dev v2']
+        status = queue.get_status()
+        assert status['done'] == 1 and status['leased'] == 1 and status['pending'] == 1
+        print(f"✅ Queue status: {status}")
+
+
+def test_expired_lease_is_retried_until_max_attempts():
+    """A dead worker's task is re-leased, then failed after max_attempts."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = TaskQueue(os.path.join(tmp, "queue.db"), max_attempts=2)
+        queue.enqueue_search("https://www.indeed.com/jobs?q=python", pages=3, pages_per_task=5)
+        
+        task = queue.lease("dead-worker", visibility_timeout=0.05)
+        assert queue.lease("worker-b") is None
+        time.sleep(0.1)
+        
+        retry = queue.lease("worker-b", visibility_timeout=0.05)
+        assert retry.id == task.id and retry.attempts == 2
+        assert not queue.heartbeat(task.id, "dead-worker")
+        time.sleep(0.1)
+        
+        assert queue.lease("worker-c") is None
+        assert queue.get_status()['failed'] == 1
+        print("✅ Expired leases retried, then failed after max attempts")
+
+
+def test_fail_requeues_task():
+    """Errors put the task back for another worker."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = TaskQueue(os.path.join(tmp, "queue.db"))
+        queue.enqueue_search("https://www.indeed.com/jobs?q=python", pages=2)
+        task = queue.lease("worker-a")
+        assert queue.fail(task.id, "worker-a", "driver crashed")
+        assert queue.lease("worker-b").id == task.id
+
+
+class QueueTaskScraper(IndeedScraperV3):
+    """Page 2 never loads; with steal_lease, another worker takes the task during page 1."""
+    
+    visits = []
+    steal_lease = None
+    
+    def _start_new_session(self):
+        self.current_session = self.session_manager.start_new_session()
+    
+    def _scrape_page(self, page_number):
+        self.visits.append(page_number)
+        if self.steal_lease:
+            self.steal_lease()
+            time.sleep(0.3)
+        if page_number == 2:
+            self.session_manager.record_failure()
+            raise PageFailed(PageErrorKind.NAVIGATION_TIMEOUT, "timed out")
+        self.session_manager.record_success()
+        return [JobRecord(title=f'Job on page {page_number}')]
+
+
+def test_worker_fails_tasks_with_dead_letters():
+    """A task whose pages were dead-lettered is retried, then failed, never completed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "queue.db")
+        TaskQueue(db_path).enqueue_search("https://www.indeed.com/jobs?q=python", pages=3)
+        QueueTaskScraper.visits = []
+        
+        run_worker(db_path, worker_id="worker-a", scraper_factory=lambda *args, **kwargs: offline_scraper(
+            QueueTaskScraper, tmp, *args, retry_backoff=0.01, max_page_attempts=2, **kwargs))
+        
+        queue = TaskQueue(db_path)
+        assert queue.get_status()['failed'] == 1 and queue.get_status().get('done', 0) == 0
+        with sqlite3.connect(db_path) as conn:
+            error = conn.execute("SELECT last_error FROM tasks").fetchone()[0]
+        assert error == "dead-lettered pages: 2 (navigation_timeout)"
+        assert QueueTaskScraper.visits.count(1) == queue.max_attempts
+        print(f"✅ Task with dead letters failed after {queue.max_attempts} attempts: {error}")
+
+
+def test_worker_stops_when_lease_is_lost():
+    """Once the heartbeat finds the task re-leased, the scraper stops between pages."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "queue.db")
+        TaskQueue(db_path).enqueue_search("https://www.indeed.com/jobs?q=python", pages=3)
+        
+        def steal_lease():
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("UPDATE tasks SET lease_owner = 'worker-b', lease_expires = ?", (time.time() + 60,))
+        
+        QueueTaskScraper.visits = []
+        QueueTaskScraper.steal_lease = staticmethod(steal_lease)
+        try:
+            run_worker(db_path, worker_id="worker-a", visibility_timeout=0.3,
+                       scraper_factory=lambda *args, **kwargs: offline_scraper(QueueTaskScraper, tmp, *args, **kwargs))
+        finally:
+            QueueTaskScraper.steal_lease = None
+        
+        assert QueueTaskScraper.visits == [1]
+        assert TaskQueue(db_path).get_status()['leased'] == 1
+        print("✅ Worker stopped after losing its lease")
+
+
+
+class ProxylessScraper(QueueTaskScraper):
+    """Runs out of healthy proxies after page 1."""
+    
+    def _start_new_session(self):
+        self.current_session = self.session_manager.start_new_session() if not self.visits else None
+    
+    def _pages_for_session(self, pending_pages):
+        return 1
+
+
+def test_worker_fails_tasks_stopped_without_proxies():
+    """A run that stops early (no healthy proxies) leaves its task failed, not done."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "queue.db")
+        TaskQueue(db_path).enqueue_search("https://www.indeed.com/jobs?q=python", pages=3)
+        scrapers = []
+        
+        def factory(*args, **kwargs):
+            ProxylessScraper.visits = []
+            scrapers.append(offline_scraper(ProxylessScraper, tmp, *args, **kwargs))
+            return scrapers[-1]
+        
+        run_worker(db_path, worker_id="worker-a", scraper_factory=factory)
+        
+        queue = TaskQueue(db_path)
+        assert queue.get_status()['failed'] == 1 and queue.get_status().get('done', 0) == 0
+        with sqlite3.connect(db_path) as conn:
+            error = conn.execute("SELECT last_error FROM tasks").fetchone()[0]
+        assert error == "unscraped pages: 2, 3"
+        assert scrapers[-1].unfinished_pages == [2, 3] and scrapers[-1].delivered_pages == {1}
+        print(f"✅ Task stopped without proxies failed: {error}")
+
+
+if __name__ == "__main__":
+    test_lease_lifecycle()
+    test_expired_lease_is_retried_until_max_attempts()
+    test_fail_requeues_task()
+    test_worker_fails_tasks_with_dead_letters()
+    test_worker_stops_when_lease_is_lost()
+    test_worker_fails_tasks_stopped_without_proxies()
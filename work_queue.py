@@ -0,0 +1,366 @@
+"""
+Distributed Work Queue
+======================
+Coordinator/worker mode for running scrapers across several processes or machines.
+
+The coordinator splits search URLs into page-range tasks stored in a SQLite
+broker. Workers lease tasks with a visibility timeout, heartbeat while they
+scrape and stream each page's jobs back into the shared results table. A
+lease that is not renewed (dead worker) becomes visible again and is retried
+by another worker until ``max_attempts`` is reached.
+
+Usage:
+    python work_queue.py enqueue --db queue.db --url "<search url>" --pages 50
+    python work_queue.py worker --db queue.db --proxies proxies.txt
+    python work_queue.py status --db queue.db
+    python work_queue.py export --db queue.db --out output/results.jsonl
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+from job_record import JobRecord, write_csv, write_jsonl
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    start_page INTEGER NOT NULL,
+    end_page INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, lease_expires);
+CREATE TABLE IF NOT EXISTS results (
+    task_id INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    jobs_json TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (task_id, page)
+);
+"""
+
+
+@dataclass
+class Task:
+    """A leased range of result pages for one search URL."""
+    id: int
+    url: str
+    start_page: int
+    end_page: int
+    attempts: int
+    
+    @property
+    def page_count(self) -> int:
+        return self.end_page - self.start_page + 1
+
+
+class TaskQueue:
+    """SQLite-backed task broker with lease/heartbeat semantics."""
+    
+    def __init__(self, db_path: str, max_attempts: int = 3):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction that takes the database lock up front."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    # ----- Coordinator side -----
+    
+    def enqueue_search(self, url: str, pages: int, pages_per_task: int = 5) -> List[int]:
+        """Split a search URL's pages into tasks; returns the new task ids."""
+        now = time.time()
+        task_ids = []
+        with self._transaction() as conn:
+            for start in range(1, pages + 1, pages_per_task):
+                end = min(start + pages_per_task - 1, pages)
+                cursor = conn.execute(
+                    "INSERT INTO tasks (url, start_page, end_page, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (url, start, end, now, now)
+                )
+                task_ids.append(cursor.lastrowid)
+        return task_ids
+    
+    def get_status(self) -> Dict[str, int]:
+        """Task counts by status plus number of result pages stored."""
+        with closing(self._connect()) as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+            counts["result_pages"] = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return counts
+    
+    def iter_results(self) -> Iterator[JobRecord]:
+        """Yield every stored job in task/page order."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT jobs_json FROM results ORDER BY task_id, page")
+            for (jobs_json,) in rows:
+                for job in json.loads(jobs_json):
+                    yield JobRecord.from_dict(job)
+    
+    # ----- Worker side -----
+    
+    def lease(self, worker_id: str, visibility_timeout: float = 300.0) -> Optional[Task]:
+        """
+        Lease the oldest available task.
+        
+        Tasks whose lease expired are available again. Tasks that already used
+        all their attempts are marked failed instead of being handed out.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', lease_owner = NULL, updated_at = ?, "
+                "last_error = COALESCE(last_error, 'lease expired') "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            row = conn.execute(
+                "SELECT id, url, start_page, end_page, attempts FROM tasks "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if not row:
+                return None
+            
+            task = Task(*row)
+            task.attempts += 1
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = ?, updated_at = ? WHERE id = ?",
+                (worker_id, now + visibility_timeout, task.attempts, now, task.id)
+            )
+        return task
+    
+    def heartbeat(self, task_id: int, worker_id: str, visibility_timeout: float = 300.0) -> bool:
+        """Extend a lease; False if the worker no longer owns the task."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (now + visibility_timeout, now, task_id, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    def add_page_results(self, task_id: int, worker_id: str, url: str, page: int, jobs: List[JobRecord]) -> bool:
+        """Stream one page of results; a retried page replaces the earlier attempt."""
+        jobs_json = json.dumps([job.to_dict() for job in jobs], ensure_ascii=False)
+        with self._transaction() as conn:
+            owner = conn.execute(
+                "SELECT lease_owner FROM tasks WHERE id = ? AND status = 'leased'", (task_id,)
+            ).fetchone()
+            if not owner or owner[0] != worker_id:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO results (task_id, page, url, jobs_json, worker, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (task_id, page, url, jobs_json, worker_id, time.time())
+            )
+        return True
+    
+    def complete(self, task_id: int, worker_id: str) -> bool:
+        """Mark a leased task done; False if the lease was lost."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', lease_owner = NULL, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (time.time(), task_id, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    def fail(self, task_id: int, worker_id: str, error: str) -> bool:
+        """Release a task after an error, for retry or as failed when out of attempts."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (self.max_attempts, error, time.time(), task_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+
+class _Heartbeat:
+    """Background thread renewing a task lease until stopped."""
+    
+    def __init__(self, queue: TaskQueue, task: Task, worker_id: str, visibility_timeout: float):
+        self.lease_lost = False
+        # Called (from the heartbeat thread) once the lease is lost
+        self.on_lost: Optional[Callable[[], None]] = None
+        self._stop = threading.Event()
+        
+        def beat():
+            while not self._stop.wait(visibility_timeout / 3):
+                try:
+                    if not queue.heartbeat(task.id, worker_id, visibility_timeout):
+                        self.lease_lost = True
+                        print(f"⚠️ Lost lease on task {task.id}")
+                        if self.on_lost:
+                            self.on_lost()
+                        return
+                except sqlite3.Error as e:
+                    print(f"⚠️ Heartbeat failed for task {task.id}: {e}")
+        
+        self._thread = threading.Thread(target=beat, name=f"heartbeat-{task.id}", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(db_path: str, proxy_file: str = "proxies.txt", worker_id: Optional[str] = None,
+               visibility_timeout: float = 300.0, poll_interval: float = 5.0,
+               exit_when_idle: bool = True, lease_db: Optional[str] = None,
+               headless: bool = False, archive_dir: Optional[str] = None,
+               scraper_factory: Optional[Callable] = None):
+    """
+    Lease and scrape tasks until the queue is drained (or forever).
+    
+    A task with dead-lettered or unscraped pages is failed (and retried
+    while it has attempts left) rather than completed. ``scraper_factory`` is called
+    like IndeedScraperV3 (the default) to build each task's scraper.
+    """
+    from scraper_v3 import IndeedScraperV3
+    scraper_factory = scraper_factory or IndeedScraperV3
+    
+    queue = TaskQueue(db_path)
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    print(f"👷 Worker {worker_id} polling {db_path}")
+    
+    while True:
+        task = queue.lease(worker_id, visibility_timeout)
+        if not task:
+            if exit_when_idle:
+                print("✅ No tasks left, worker exiting")
+                return
+            time.sleep(poll_interval)
+            continue
+        
+        print(f"\n📦 Task {task.id}: pages {task.start_page}-{task.end_page} (attempt {task.attempts})")
+        heartbeat = _Heartbeat(queue, task, worker_id, visibility_timeout)
+        
+        def stream_page(page: int, jobs: List[JobRecord]):
+            queue.add_page_results(task.id, worker_id, task.url, page, jobs)
+        
+        try:
+            scraper = scraper_factory(
+                task.url,
+                task.page_count,
+                proxy_file,
+                start_page=task.start_page,
+                page_callback=stream_page,
+                lease_db=lease_db,
+                headless=headless,
+                archive_dir=archive_dir
+            )
+            # Stop between pages once another worker may own the task
+            heartbeat.on_lost = scraper.stop
+            if heartbeat.lease_lost:
+                scraper.stop()
+            scraper.scrape_all_pages()
+            heartbeat.stop()
+            
+            if heartbeat.lease_lost:
+                print(f"⚠️ Task {task.id} was re-leased elsewhere; results kept for the new owner")
+            elif scraper.dead_letters:
+                pages = ", ".join(f"{letter.page_number} ({letter.kind.value})" for letter in scraper.dead_letters)
+                print(f"❌ Task {task.id} left pages unscraped: {pages}")
+                queue.fail(task.id, worker_id, f"dead-lettered pages: {pages}")
+            elif scraper.unfinished_pages:
+                # The run stopped early (e.g. no healthy proxies) without raising
+                pages = ", ".join(map(str, scraper.unfinished_pages))
+                print(f"❌ Task {task.id} stopped before pages {pages}")
+                queue.fail(task.id, worker_id, f"unscraped pages: {pages}")
+            elif not queue.complete(task.id, worker_id):
+                print(f"⚠️ Task {task.id} was re-leased elsewhere; results kept for the new owner")
+        except Exception as e:
+            heartbeat.stop()
+            print(f"❌ Task {task.id} failed: {e}")
+            queue.fail(task.id, worker_id, str(e))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed Indeed scraping queue")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    enqueue = subparsers.add_parser("enqueue", help="Split a search into tasks")
+    enqueue.add_argument("--db", required=True)
+    enqueue.add_argument("--url", required=True)
+    enqueue.add_argument("--pages", type=int, required=True)
+    enqueue.add_argument("--pages-per-task", type=int, default=5)
+    
+    worker = subparsers.add_parser("worker", help="Lease and scrape tasks")
+    worker.add_argument("--db", required=True)
+    worker.add_argument("--proxies", default="proxies.txt")
+    worker.add_argument("--visibility-timeout", type=float, default=300.0)
+    worker.add_argument("--forever", action="store_true", help="Keep polling when the queue is empty")
+    worker.add_argument("--lease-db", help="Shared proxy lease database for workers on this host")
+    worker.add_argument("--headless", action="store_true", help="Run Chrome headless (no display server)")
+    worker.add_argument("--archive", help="Directory to archive each page's raw job JSON in")
+    
+    status = subparsers.add_parser("status", help="Show task counts")
+    status.add_argument("--db", required=True)
+    
+    export = subparsers.add_parser("export", help="Write all results to a JSONL (or .csv) file")
+    export.add_argument("--db", required=True)
+    export.add_argument("--out", required=True)
+    
+    args = parser.parse_args()
+    
+    if args.command == "enqueue":
+        task_ids = TaskQueue(args.db).enqueue_search(args.url, args.pages, args.pages_per_task)
+        print(f"✅ Enqueued {len(task_ids)} tasks")
+    elif args.command == "worker":
+        run_worker(args.db, args.proxies, visibility_timeout=args.visibility_timeout,
+                   exit_when_idle=not args.forever, lease_db=args.lease_db,
+                   headless=args.headless, archive_dir=args.archive)
+    elif args.command == "status":
+        print(json.dumps(TaskQueue(args.db).get_status(), indent=2))
+    elif args.command == "export":
+        results = TaskQueue(args.db).iter_results()
+        if args.out.endswith(".csv"):
+            count = write_csv(results, args.out)
+        else:
+            count = write_jsonl(results, args.out)
+        print(f"✅ Exported {count} jobs to {args.out}")
+
+
+if __name__ == "__main__":
+    main()